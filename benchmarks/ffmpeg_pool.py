@@ -0,0 +1,84 @@
+"""Time to first packet of a cold FFmpegOpusAudio/FFmpegPCMAudio against a process
+taken from the FFmpegPool. Without an input a 3 minute Opus test file is generated.
+
+Usage:
+    python benchmarks/ffmpeg_pool.py [input url or path] [runs]
+"""
+
+# Standard library imports.
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Third party imports.
+import discord
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from music_bot.common.ffmpeg import FFmpegPool  # noqa: E402
+
+
+########################################################################################
+def first_packet(source: discord.AudioSource, started: float) -> float:
+    """Read a source until its first packet.
+
+    Args:
+        source (discord.AudioSource): Source to read.
+        started (float): perf_counter value the source was asked for at.
+
+    Returns:
+        float: Milliseconds to the first packet.
+    """
+    if not source.read():
+        raise RuntimeError("Source produced no audio.")
+
+    elapsed = (time.perf_counter() - started) * 1000
+    source.cleanup()
+
+    return elapsed
+
+
+########################################################################################
+async def main() -> None:
+    """Run the benchmark."""
+    url = sys.argv[1] if len(sys.argv) > 1 else ""
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    if not url:
+        url = os.path.join(tempfile.mkdtemp(), "tone.opus")
+        subprocess.run(
+            ["ffmpeg", "-loglevel", "error", "-f", "lavfi", "-i", "sine=d=180"]
+            + ["-ac", "2", "-c:a", "libopus", url],
+            check=True,
+        )
+
+    pool = FFmpegPool(size=1)
+    results = {}
+    for kind, cold in (
+        ("opus", lambda: discord.FFmpegOpusAudio(url, codec="opus")),
+        ("pcm", lambda: discord.FFmpegPCMAudio(url)),
+    ):
+        cold_times, pooled_times = [], []
+        for _ in range(runs):
+            cold_times.append(first_packet(cold(), time.perf_counter()))
+
+            pool.fill(kind)
+            # Let the spawned process finish initialising, as it would between songs.
+            await asyncio.sleep(0.5)
+            started = time.perf_counter()
+            source = pool.acquire(kind)
+            source.start(url)  # type: ignore
+            pooled_times.append(first_packet(source, started))  # type: ignore
+
+        results[kind] = (statistics.median(cold_times), statistics.median(pooled_times))
+
+    pool.shutdown()
+    for kind, (cold_ms, pooled_ms) in results.items():
+        print(f"{kind:<6} cold {cold_ms:8.1f} ms   pooled {pooled_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,79 @@
+"""Microbenchmark of the PCM volume stage: frames per second on a single core for
+discord.py's audioop based PCMVolumeTransformer against the NumPy GainTransformer.
+A 20ms frame has to be produced every 20ms, so 50 frames/s is one real-time stream.
+
+Usage:
+    python benchmarks/gain_stage.py [frames]
+"""
+
+# Standard library imports.
+import os
+import sys
+import time
+
+# Third party imports.
+import discord
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from music_bot.common.gain import FRAME_SAMPLES, GainTransformer  # noqa: E402
+
+
+########################################################################################
+class ToneSource(discord.AudioSource):
+    """Endless PCM source repeating a single frame of noise."""
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        self.frame = rng.integers(
+            -20000, 20000, FRAME_SAMPLES, dtype=np.int16
+        ).tobytes()
+
+    def read(self) -> bytes:
+        return self.frame
+
+
+########################################################################################
+def measure(source: discord.AudioSource, frames: int, ramp: bool = False) -> float:
+    """Read frames from a volume stage.
+
+    Args:
+        source (discord.AudioSource): Volume stage to read from.
+        frames (int): Number of frames to read.
+        ramp (bool, optional): Change the volume every 10 frames. Defaults to False.
+
+    Returns:
+        float: Frames read per second of CPU time.
+    """
+    start = time.process_time()
+    for frame in range(frames):
+        if ramp and frame % 10 == 0:
+            source.volume = 0.3 if source.volume > 0.5 else 1.5  # type: ignore
+
+        source.read()
+
+    return frames / (time.process_time() - start)
+
+
+########################################################################################
+def main() -> None:
+    """Run the benchmark."""
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    cases = {
+        "PCMVolumeTransformer 0.5": discord.PCMVolumeTransformer(ToneSource(), 0.5),
+        "GainTransformer 0.5": GainTransformer(ToneSource(), 0.5),
+        "GainTransformer 1.8 (limiting)": GainTransformer(ToneSource(), 1.8),
+    }
+    for name, source in cases.items():
+        rate = measure(source, frames)
+        print(f"{name:<36}{rate:>12,.0f} frames/s {rate / 50:>8,.0f} streams/core")
+
+    rate = measure(GainTransformer(ToneSource(), 1.0), frames, ramp=True)
+    print(
+        f"{'GainTransformer ramping':<36}{rate:>12,.0f} frames/s {rate / 50:>8,.0f} streams/core"
+    )
+
+
+if __name__ == "__main__":
+    main()
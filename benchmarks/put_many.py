@@ -0,0 +1,100 @@
+"""Time to queue a playlist with one awaited put per song, the way _load used to,
+against a single SongQueue.put_many batch. A consumer waits on the queue the whole
+time, like the player task, and on_change counts its calls where the AudioState would
+reschedule its prefetches. Both runs are repeated with the queue journal enabled, and
+the median of five runs is reported.
+
+Usage:
+    python benchmarks/put_many.py [sizes...]
+"""
+
+# Standard library imports.
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from music_bot.common.classes import Song, SongQueue  # noqa: E402
+from music_bot.common.journal import QueueJournal  # noqa: E402
+
+
+########################################################################################
+def make_items(count: int) -> list:
+    """Build videos resources as returned for a playlist.
+
+    Args:
+        count (int): Number of songs.
+
+    Returns:
+        list: The resources.
+    """
+    return [
+        {"id": f"{index:011d}", "snippet": {"title": f"Song number {index}"}}
+        for index in range(count)
+    ]
+
+
+########################################################################################
+async def load(items: list, batch: bool, journal: str) -> tuple:
+    """Queue a playlist while a consumer waits for the first song.
+
+    Args:
+        items (list): Videos resources to queue.
+        batch (bool): Queue them with put_many instead of one put per song.
+        journal (str): Journal file, "" to run without a journal.
+
+    Returns:
+        tuple: Milliseconds taken and the number of on_change calls.
+    """
+    changes = []
+    queue = SongQueue(
+        on_change=lambda: changes.append(None),
+        journal=QueueJournal(journal) if journal else None,
+    )
+    consumer = asyncio.get_running_loop().create_task(queue.get())
+    await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    if batch:
+        queue.put_many(items, Song)
+    else:
+        for item in items:
+            await queue.put(Song(item))
+
+    elapsed = (time.perf_counter() - started) * 1000
+    await consumer
+    if journal:
+        queue.journal.close()  # type: ignore
+        os.remove(journal)
+
+    return elapsed, len(changes)
+
+
+########################################################################################
+async def main() -> None:
+    """Run the benchmark."""
+    sizes = [int(size) for size in sys.argv[1:]] or [100, 1000, 5000]
+    runs = 5
+    journal = os.path.join(tempfile.mkdtemp(), "queue.jsonl")
+    print(f"{'songs':>6}  {'journal':<7} {'put loop':>12} {'put_many':>12}  on_change")
+    for size in sizes:
+        items = make_items(size)
+        for path in ("", journal):
+            loop_runs, batch_runs = [], []
+            for _ in range(runs):
+                loop_runs.append(await load(items, False, path))
+                batch_runs.append(await load(items, True, path))
+
+            loop_ms, loop_changes = sorted(loop_runs)[runs // 2]
+            batch_ms, batch_changes = sorted(batch_runs)[runs // 2]
+            print(
+                f"{size:>6}  {'yes' if path else 'no':<7} {loop_ms:>9.1f} ms "
+                f"{batch_ms:>9.1f} ms  {loop_changes} -> {batch_changes}"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,150 @@
+"""Positional queue operations on a plain deque, the way the queue used to be stored,
+against the indexed SongQueue. Each operation works at the middle of a queue of the
+given size, where a deque is slowest: reading a song, listing a page of 15, removing a
+song, moving a song to the front and inserting a song.
+
+Usage:
+    python benchmarks/song_queue.py [sizes...]
+"""
+
+# Standard library imports.
+import collections
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from music_bot.common.classes import Song, SongQueue  # noqa: E402
+
+# Songs listed per page by the queue command.
+PAGE = 15
+
+
+########################################################################################
+def make_song(index: int) -> Song:
+    """Build a song as queued from a playlist page.
+
+    Args:
+        index (int): Song number.
+
+    Returns:
+        Song: The song, requested by one of ten members.
+    """
+    return Song(
+        {"id": f"{index:011d}", "snippet": {"title": f"Song number {index}"}},
+        requester=index % 10,
+    )
+
+
+########################################################################################
+def per_op(operation, runs: int) -> float:
+    """Time an operation.
+
+    Args:
+        operation (Callable[[], None]): The operation, leaving the queue the same size.
+        runs (int): Times to run it.
+
+    Returns:
+        float: Microseconds per run.
+    """
+    started = time.perf_counter()
+    for _ in range(runs):
+        operation()
+
+    return (time.perf_counter() - started) / runs * 1e6
+
+
+########################################################################################
+def bench_deque(songs: list, runs: int) -> dict:
+    """Time the operations on a deque.
+
+    Args:
+        songs (list): Songs to queue.
+        runs (int): Times to run each operation.
+
+    Returns:
+        dict: Operation -> microseconds per run.
+    """
+    queue = collections.deque(songs)
+    middle = len(queue) // 2
+    spare = make_song(-1)
+
+    def remove():
+        del queue[middle]
+        queue.append(spare)
+
+    def move():
+        song = queue[middle]
+        del queue[middle]
+        queue.appendleft(song)
+
+    def insert():
+        queue.insert(middle, spare)
+        queue.pop()
+
+    return {
+        "index": per_op(lambda: queue[middle], runs),
+        "page": per_op(
+            lambda: list(itertools.islice(queue, middle, middle + PAGE)), runs
+        ),
+        "remove": per_op(remove, runs),
+        "move": per_op(move, runs),
+        "insert": per_op(insert, runs),
+    }
+
+
+########################################################################################
+def bench_song_queue(songs: list, runs: int) -> dict:
+    """Time the operations on a SongQueue.
+
+    Args:
+        songs (list): Songs to queue.
+        runs (int): Times to run each operation.
+
+    Returns:
+        dict: Operation -> microseconds per run.
+    """
+    queue = SongQueue()
+    for song in songs:
+        queue.put_nowait(song)
+
+    middle = len(queue) // 2
+    spare = make_song(-1)
+
+    def remove():
+        queue.remove(middle)
+        queue.put_nowait(spare)
+
+    def insert():
+        queue.insert(middle, spare)
+        queue.remove(-1)
+
+    return {
+        "index": per_op(lambda: queue[middle], runs),
+        "page": per_op(lambda: queue[middle : middle + PAGE], runs),
+        "remove": per_op(remove, runs),
+        "move": per_op(lambda: queue.move(middle, 0), runs),
+        "insert": per_op(insert, runs),
+    }
+
+
+########################################################################################
+def main() -> None:
+    """Run the benchmark."""
+    sizes = [int(size) for size in sys.argv[1:]] or [100, 10_000, 100_000]
+    print(f"{'size':>7}  {'operation':<9} {'deque':>10} {'SongQueue':>10}  (us/op)")
+    for size in sizes:
+        songs = [make_song(index) for index in range(size)]
+        runs = max(min(200_000 // size, 2000), 200)
+        plain = bench_deque(songs, runs)
+        indexed = bench_song_queue(songs, runs)
+        for operation, micros in plain.items():
+            print(
+                f"{size:>7}  {operation:<9} {micros:>10.2f} {indexed[operation]:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Memory held by a 1,000-song session when each source keeps the full youtube_dl info
+dict, against keeping only the compact TrackInfo record. The info dicts are synthetic
+but shaped like real extract_info output for a YouTube video: about 20 formats, 40
+thumbnails and automatic captions in 100 languages.
+
+Usage:
+    python benchmarks/track_info.py [songs]
+"""
+
+# Standard library imports.
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from music_bot.common.track import TrackInfo  # noqa: E402
+
+
+########################################################################################
+def make_info(index: int) -> dict:
+    """Build an info dict shaped like youtube_dl output.
+
+    Args:
+        index (int): Song number, used to make every string unique.
+
+    Returns:
+        dict: The info dict.
+    """
+    video_id = f"{index:011d}"
+    stream = (
+        f"https://rr1---sn-abc.googlevideo.com/videoplayback?expire=1700000000&id={video_id}&"
+        + "x" * 900
+    )
+    headers = {
+        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) " + video_id,
+        "Accept-Charset": "ISO-8859-1,utf-8;q=0.7,*;q=0.7",
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Encoding": "gzip, deflate",
+        "Accept-Language": "en-us,en;q=0.5",
+    }
+    formats = [
+        {
+            "asr": 48000,
+            "filesize": 3_000_000 + number,
+            "format_id": str(100 + number),
+            "format_note": "tiny",
+            "fps": None,
+            "height": None,
+            "quality": number,
+            "tbr": 130.5,
+            "url": f"{stream}&itag={number}",
+            "width": None,
+            "ext": "webm",
+            "vcodec": "none",
+            "acodec": "opus",
+            "abr": 130.5,
+            "downloader_options": {"http_chunk_size": 10485760},
+            "container": "webm_dash",
+            "format": f"{100 + number} - audio only (tiny)",
+            "protocol": "https",
+            "http_headers": dict(headers),
+        }
+        for number in range(20)
+    ]
+    return {
+        "id": video_id,
+        "title": f"Song number {index}",
+        "formats": formats,
+        "thumbnails": [
+            {
+                "url": f"https://i.ytimg.com/vi/{video_id}/hq{number}.jpg?sqp="
+                + "y" * 80,
+                "height": 94 + number,
+                "width": 168 + number,
+                "resolution": f"{168 + number}x{94 + number}",
+                "id": str(number),
+            }
+            for number in range(40)
+        ],
+        "automatic_captions": {
+            f"l{language}": [
+                {
+                    "ext": ext,
+                    "url": f"https://www.youtube.com/api/timedtext?v={video_id}&lang={language}&fmt={ext}&"
+                    + "z" * 200,
+                }
+                for ext in ("json3", "srv1", "srv2", "srv3", "ttml", "vtt")
+            ]
+            for language in range(100)
+        },
+        "subtitles": {},
+        "description": f"Description of song {index}. " * 60,
+        "upload_date": "20200101",
+        "uploader": f"Uploader {index}",
+        "uploader_id": f"UC{index:022d}",
+        "uploader_url": f"http://www.youtube.com/channel/UC{index:022d}",
+        "channel_id": f"UC{index:022d}",
+        "channel_url": f"https://www.youtube.com/channel/UC{index:022d}",
+        "duration": 215,
+        "view_count": 1_000_000 + index,
+        "average_rating": None,
+        "age_limit": 0,
+        "webpage_url": f"https://www.youtube.com/watch?v={video_id}",
+        "categories": ["Music"],
+        "tags": ["music", "song", f"tag{index}"],
+        "is_live": None,
+        "like_count": 10_000 + index,
+        "channel": f"Channel {index}",
+        "extractor": "youtube",
+        "webpage_url_basename": "watch",
+        "extractor_key": "Youtube",
+        "playlist": None,
+        "playlist_index": None,
+        "thumbnail": f"https://i.ytimg.com/vi_webp/{video_id}/maxresdefault.webp",
+        "display_id": video_id,
+        "requested_subtitles": None,
+        "format_id": "251",
+        "url": stream,
+        "ext": "webm",
+        "acodec": "opus",
+        "abr": 130.5,
+        "asr": 48000,
+        "http_headers": dict(headers),
+        "format": "251 - audio only (tiny)",
+        "protocol": "https",
+        "fulltitle": f"Song number {index}",
+    }
+
+
+########################################################################################
+def measure(songs: int, compact: bool) -> int:
+    """Measure the memory retained by a session's worth of track metadata.
+
+    Args:
+        songs (int): Number of songs in the session.
+        compact (bool): Keep TrackInfo records instead of the info dicts.
+
+    Returns:
+        int: Bytes retained.
+    """
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = []
+    for index in range(songs):
+        info = make_info(index)
+        kept.append(TrackInfo.from_dict(info) if compact else info)
+        del info
+
+    retained = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return retained
+
+
+########################################################################################
+def main() -> None:
+    """Run the benchmark."""
+    songs = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    full = measure(songs, compact=False)
+    compact = measure(songs, compact=True)
+    print(f"{songs} songs")
+    print(f"info dicts  {full / 2**20:10.1f} MiB  {full / songs / 1024:8.1f} KiB/song")
+    print(
+        f"TrackInfo   {compact / 2**20:10.1f} MiB  {compact / songs / 1024:8.1f} KiB/song"
+    )
+    print(f"reduction   {full / compact:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,37 @@
 # Standard library imports.
+import time
+
+# Taken before anything else is imported so the import phase is timed too.
+STARTED = time.perf_counter()
+
+# pylint: disable=wrong-import-position
+# Standard library imports.
 import asyncio
+import importlib
 import logging
 import sys
 
 # Third party imports.
 import discord
-import googleapiclient.discovery
 
 from music_bot.client import PuckBotClient
+from music_bot.common.cache import StreamCache, TrackCache
 from music_bot.common.classes import Formatter, YTDLSource
+from music_bot.common.extractor import ExtractorPool
+from music_bot.common.ffmpeg import FFmpegPool
+from music_bot.common.loudness import LoudnessAnalyzer
+from music_bot.common.startup import StartupTimer
+from music_bot.common.store import LoudnessStore
+from music_bot.common.tracing import tracer
 from music_bot.common.utils import get_config, init_argparse
 
 ########################################################################################
 #                                 Script entrypoint.                                   #
 ########################################################################################
 if __name__ == "__main__":
+    startup_timer = StartupTimer(STARTED)
+    startup_timer.mark("imports")
+
     # Gather command line args.
     argparser = init_argparse()
 
@@ -41,6 +58,7 @@ if __name__ == "__main__":
     streamHandler.setLevel(config["log_level"])
     streamHandler.setFormatter(Formatter())
     logger.addHandler(streamHandler)
+    startup_timer.mark("config")
 
     # Initialize intents for Discord.
     intents = discord.Intents.default()
@@ -56,22 +74,80 @@ if __name__ == "__main__":
     )
     bot.config = config
     bot.logger = logger
-    bot.youtube = googleapiclient.discovery.build(
-        bot.config["api_service_name"],
-        bot.config["api_version"],
-        developerKey=config["developer_key"],
+    bot.startup_timer = startup_timer
+    YTDLSource.extractor = ExtractorPool(
+        YTDLSource.YTDL_OPTIONS,
+        workers=config.get("extractor_workers", 0),
+        timeout=config.get("extractor_timeout", 30.0),
+        max_tasks=config.get("extractor_max_tasks", 50),
     )
+    YTDLSource.streams = StreamCache(
+        max_entries=config.get("stream_cache_size", 256),
+        margin=config.get("stream_cache_margin", 60.0),
+    )
+    if config.get("ffmpeg_pool_size", 1) > 0:
+        YTDLSource.ffmpeg_pool = FFmpegPool(
+            size=config.get("ffmpeg_pool_size", 1),
+            idle_timeout=config.get("ffmpeg_pool_idle", 120.0),
+        )
+    if config.get("loudness_normalize", True):
+        YTDLSource.loudness = LoudnessAnalyzer(
+            LoudnessStore(config.get("cache_db", "./cache/puckbot.sqlite3")),
+            target=config.get("loudness_target", -14.0),
+            workers=config.get("loudness_workers", 1),
+            run_blocking=bot.run_blocking,
+        )
+    if config.get("track_cache_bytes", 1 << 30) > 0:
+        # Tracks are measured for loudness from their cached copy.
+        YTDLSource.tracks = TrackCache(
+            config.get("track_cache_dir", "./cache/tracks"),
+            max_bytes=config.get("track_cache_bytes", 1 << 30),
+            on_stored=YTDLSource.loudness.schedule if YTDLSource.loudness else None,
+            run_blocking=bot.run_blocking,
+        )
+    tracer.configure(
+        config.get("trace_file", "./cache/traces.jsonl"),
+        max_spans=config.get("trace_spans", 5000),
+    )
+    startup_timer.mark("client")
 
     # https://googleapis.github.io/google-api-python-client/docs/epy/index.html
 
     # TODO
     # https://gist.github.com/vbe0201/ade9b80f2d3b64643d854938d40a0a2d
     # https://medium.com/pythonland/build-a-discord-bot-in-python-that-plays-music-and-send-gifs-856385e605a1
+    async def timed(name: str, awaitable) -> None:
+        """Await a background warm up job and record how long it took.
+
+        Args:
+            name (str): Name of the job in the startup report.
+            awaitable (Awaitable): The job.
+        """
+        started = time.perf_counter()
+        await awaitable
+        startup_timer.record(name, time.perf_counter() - started)
+
+    async def warm_up():
+        """Do the start up work nothing waits on while the gateway connects, so the
+        first command and the first song do not pay for it.
+        """
+        await asyncio.gather(
+            timed("extractor workers", YTDLSource.extractor.warm_up()),
+            timed("youtube api", bot.run_blocking(getattr, bot, "youtube")),
+            timed(
+                "gain stage",
+                bot.run_blocking(importlib.import_module, "music_bot.common.gain"),
+            ),
+        )
+
     async def main():
         """Main bot entrypoint."""
         async with bot:
             # bot.loop.create_task(background_task())
             await bot.load_extensions("./music_bot/cogs")
+            startup_timer.mark("extensions")
+
+            bot.create_background_task(warm_up())
 
             for cog_name in bot.cogs:
                 logger.info(f"Cog - {cog_name}")
@@ -103,7 +179,16 @@ if __name__ == "__main__":
             # await YTDLSource.test()
             # bot.get_song(song_url="https://www.youtube.com/watch?v=sxAszMMHhDM")
             # sys.exit()
-            await bot.start(config["token"])
+            try:
+                await bot.start(config["token"])
+
+            finally:
+                YTDLSource.extractor.shutdown()
+                if YTDLSource.ffmpeg_pool is not None:
+                    YTDLSource.ffmpeg_pool.shutdown()
+                if YTDLSource.loudness is not None:
+                    YTDLSource.loudness.store.close()
+                tracer.close()
 
     # Run the bot.
     asyncio.run(main())
@@ -1,15 +1,32 @@
 # Standard library imports.
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import functools
 import logging
 import os
-import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, AsyncIterator, Coroutine, Union
 
 # Third party imports.
 import discord
-import googleapiclient.discovery
 from discord.ext import commands
 
-from music_bot.common.classes import CaseInsensitiveDict
-from music_bot.common.exceptions import PuckBotClientError
+from music_bot.common.classes import CaseInsensitiveDict, SingleFlight
+from music_bot.common.exceptions import PuckBotClientError, QuotaError
+from music_bot.common.journal import QueueJournal
+from music_bot.common.quota import QuotaTracker
+from music_bot.common.startup import StartupTimer
+from music_bot.common.store import PlaylistStore, QuotaStore, ResumeStore
+from music_bot.common.tracing import tracer
+
+if TYPE_CHECKING:
+    # Third party imports.
+    import googleapiclient.discovery
+    import googleapiclient.http
 
 
 class PuckBotClient(commands.Bot):
@@ -18,6 +35,27 @@ class PuckBotClient(commands.Bot):
     def __init__(self, *args, **kwargs):
         super(PuckBotClient, self).__init__(*args, **kwargs)
 
+        # httplib2.Http objects are not thread safe, so each executor worker gets its
+        # own through thread local storage.
+        self.__executor = None
+        self.__flights = SingleFlight()
+        self.__local = threading.local()
+        self.__quota = None
+        self.__resume_points = None
+        self.__startup_timer = None
+        self.__store = None
+        self.__tasks = set()
+        self.__youtube = None
+        self.__youtube_lock = threading.Lock()
+
+        # Channel playlist catalog cache. The raw result pages are kept alongside the
+        # title -> id mapping so their ETags can be used for conditional refreshes.
+        self.__playlists = CaseInsensitiveDict()
+        self.__playlist_pages = {}
+        self.__playlists_fetched = 0.0
+        self.__playlists_lock = asyncio.Lock()
+        self.__playlist_cache_stats = {"hits": 0, "misses": 0, "not_modified": 0}
+
     ####################################################################################
     #                                  Properties                                      #
     ####################################################################################
@@ -34,6 +72,34 @@ class PuckBotClient(commands.Bot):
     def config(self, config: dict):
         self.__config = config
 
+    ####################################################################################
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Bounded executor used to run blocking YouTube API requests off the event
+        loop. Created on first use so the worker count can come from the config.
+
+        Returns:
+            ThreadPoolExecutor: YouTube API executor.
+        """
+        if self.__executor is None:
+            self.__executor = ThreadPoolExecutor(
+                max_workers=self.config.get("api_workers", 4),
+                thread_name_prefix="youtube-api",
+            )
+
+        return self.__executor
+
+    ####################################################################################
+    @property
+    def flights(self) -> SingleFlight:
+        """In-flight YouTube requests keyed by playlist or video id, shared between
+        concurrent identical requests.
+
+        Returns:
+            SingleFlight: In-flight YouTube requests.
+        """
+        return self.__flights
+
     ####################################################################################
     @property
     def logger(self) -> logging.Logger:
@@ -48,14 +114,107 @@ class PuckBotClient(commands.Bot):
     def logger(self, logger: logging.Logger):
         self.__logger = logger
 
+    ####################################################################################
+    @property
+    def playlist_cache_stats(self) -> dict:
+        """Playlist catalog cache counters. Hits cost no API calls, misses refresh the
+        catalog, and not_modified counts refreshed pages answered with a 304.
+
+        Returns:
+            dict: Playlist catalog cache counters.
+        """
+        return dict(self.__playlist_cache_stats)
+
+    ####################################################################################
+    @property
+    def quota(self) -> QuotaTracker:
+        """YouTube API quota tracker. Created on first use from the quota_* config.
+
+        Returns:
+            QuotaTracker: YouTube API quota tracker.
+        """
+        if self.__quota is None:
+            self.__quota = QuotaTracker(
+                budget=self.config.get("quota_daily_budget", 10000),
+                reserve=self.config.get("quota_reserve", 0.1),
+                max_delay=self.config.get("quota_max_delay", 30.0),
+                burst=self.config.get("quota_burst", 50),
+                store=QuotaStore(
+                    self.config.get("cache_db", "./cache/puckbot.sqlite3")
+                ),
+                run_blocking=self.run_blocking,
+            )
+
+        return self.__quota
+
+    ####################################################################################
+    @property
+    def resume_points(self) -> ResumeStore:
+        """On-disk resume points of the songs being played. Opened on first use at the
+        cache_db path.
+
+        Returns:
+            ResumeStore: Resume points per guild.
+        """
+        if self.__resume_points is None:
+            self.__resume_points = ResumeStore(
+                self.config.get("cache_db", "./cache/puckbot.sqlite3")
+            )
+
+        return self.__resume_points
+
+    ####################################################################################
+    @property
+    def startup_timer(self) -> Union[StartupTimer, None]:
+        """Timer reporting the startup phases once the gateway is ready.
+
+        Returns:
+            Union[StartupTimer, None]: The startup timer, or None if not timed.
+        """
+        return self.__startup_timer
+
+    @startup_timer.setter
+    def startup_timer(self, startup_timer: StartupTimer):
+        self.__startup_timer = startup_timer
+
+    ####################################################################################
+    @property
+    def store(self) -> PlaylistStore:
+        """On-disk cache of playlist items. Opened on first use at the cache_db path.
+
+        Returns:
+            PlaylistStore: Playlist item cache.
+        """
+        if self.__store is None:
+            self.__store = PlaylistStore(
+                self.config.get("cache_db", "./cache/puckbot.sqlite3")
+            )
+
+        return self.__store
+
     ####################################################################################
     @property
     def youtube(self) -> googleapiclient.discovery.Resource:
-        """YouTube API Resource object
+        """YouTube API Resource object, built on first use. It is built from the
+        discovery document bundled with google-api-python-client, so building it never
+        fetches the document over the network.
 
         Returns:
             googleapiclient.discovery.Resource: YouTube API object.
         """
+        with self.__youtube_lock:
+            if self.__youtube is None:
+                # Third party imports.
+                import googleapiclient.discovery  # pylint: disable=import-outside-toplevel
+
+                self.__youtube = googleapiclient.discovery.build(
+                    self.config["api_service_name"],
+                    self.config["api_version"],
+                    developerKey=self.config["developer_key"],
+                    cache_discovery=False,
+                    static_discovery=True,
+                )
+
         return self.__youtube
 
     @youtube.setter
@@ -65,40 +224,78 @@ class PuckBotClient(commands.Bot):
     ####################################################################################
     #                                   Methods                                        #
     ####################################################################################
-    def get_playlists(self) -> CaseInsensitiveDict:
+    async def get_playlists(self) -> CaseInsensitiveDict:
         """Query YouTube for all public playlists for the proided channel ID. Further
         details on response structure are found in the API documentation:
         https://developers.google.com/youtube/v3/docs/playlists/list
 
+        The catalog is cached for playlist_cache_ttl seconds. Once expired, each page
+        is re-requested with its ETag so unchanged pages come back as an empty 304.
+
         Returns:
             CaseInsensitiveDict: Dict conaining all playlist names and YouTube link.
         """
+        async with self.__playlists_lock:
+            age = time.monotonic() - self.__playlists_fetched
+            if self.__playlists_fetched and age < self.config.get(
+                "playlist_cache_ttl", 300
+            ):
+                self.__playlist_cache_stats["hits"] += 1
+                return self.__playlists.copy()
+
+            self.__playlist_cache_stats["misses"] += 1
+            try:
+                await self._refresh_playlists()
+
+            except QuotaError as err:
+                # Serve the stale catalog rather than failing while quota is low.
+                if not self.__playlists_fetched:
+                    raise
+
+                self.logger.warning(f"Serving stale playlist catalog: {err}")
+
+            return self.__playlists.copy()
+
+    ####################################################################################
+    async def _refresh_playlists(self) -> None:
+        """Refresh the playlist catalog cache, reusing unchanged pages."""
         done = False
         next_token = ""
+        pages = {}
         playlists = []
         while not done:
-            results = (
-                self.youtube.playlists()  # type: ignore
-                .list(
+            cached = self.__playlist_pages.get(next_token)
+            results = await self.execute(
+                self.youtube.playlists().list(  # type: ignore
                     channelId=self.config["channel_id"],
-                    maxResults=10,
+                    maxResults=50,
                     pageToken=next_token,
                     part="snippet,contentDetails,id,status",
-                )
-                .execute()
+                ),
+                etag=cached["etag"] if cached else None,
             )
-            playlists = playlists + results["items"]
-            if "nextPageToken" in results:
-                next_token = results["nextPageToken"]
+            if results is None:
+                self.__playlist_cache_stats["not_modified"] += 1
+                results = cached
+
+            pages[next_token] = results
+            playlists.extend(results["items"])  # type: ignore
+            if "nextPageToken" in results:  # type: ignore
+                next_token = results["nextPageToken"]  # type: ignore
             else:
                 done = True
 
-        return CaseInsensitiveDict(
+        self.__playlist_pages = pages
+        self.__playlists = CaseInsensitiveDict(
             **{playlist["snippet"]["title"]: playlist["id"] for playlist in playlists}
         )
+        self.__playlists_fetched = time.monotonic()
+        self.logger.debug(f"Playlist cache refreshed: {self.playlist_cache_stats}")
 
     ####################################################################################
-    def get_playlist_songs(self, playlist: str = "", playlist_id: str = "") -> list:
+    async def get_playlist_songs(
+        self, playlist: str = "", playlist_id: str = ""
+    ) -> list:
         """Query YouTube for all songs in a provided public playlist. Further details
         on response structure are found in the API documentation:
         https://developers.google.com/youtube/v3/docs/playlistItems/list
@@ -113,43 +310,156 @@ class PuckBotClient(commands.Bot):
         Returns:
             list: List containing information of all retreived songs.
         """
+        songs = []
+        async for items in self.iter_playlist_songs(playlist, playlist_id):
+            songs.extend(items)
+
+        return songs
+
+    ####################################################################################
+    async def iter_playlist_songs(
+        self, playlist: str = "", playlist_id: str = ""
+    ) -> AsyncIterator[list]:
+        """Stream the songs of a playlist one page (up to 50 items) at a time, so callers
+        can start using the first page before the last one has arrived.
+
+        Args:
+            playlist (str, optional): A playlist title. Defaults to "".
+            playlist_id (str, optional): A playlist id. Defaults to "".
+
+        Raises:
+            PuckBotClientError: Raised if neither a title nor an id is provided.
+            Exception: Raised if invalid playlist provided.
+
+        Yields:
+            list: The songs on the next page of the playlist.
+        """
         # If playlist_id was not provided, attempt to get from provided playlist name.
         if not playlist_id:
             if not playlist:
                 raise PuckBotClientError("Must provide a playlist title or id.\n")
 
             try:
-                playlists = self.get_playlists()
+                playlists = await self.get_playlists()
 
             except Exception as err:
                 raise Exception(f"Error getting songs for playlist: {err}\n") from err
 
             playlist_id = playlists[playlist]
 
+        # Serve from the on-disk cache when possible. Stale entries are still served
+        # immediately and refreshed in the background once streaming is done, only a
+        # playlist that has never been cached has to wait on YouTube.
+        key = ("playlist", playlist_id)
+        refreshed = await self.run_blocking(self.store.refreshed, playlist_id)
+        if refreshed is None:
+            # Identical requests share the one already in flight and then read the
+            # result back from the store.
+            pending = self.flights.get(key)
+            if pending is not None and await asyncio.shield(pending):
+                refreshed = await self.run_blocking(self.store.refreshed, playlist_id)
+
+        if refreshed is None:
+            done = self.flights.claim(key)
+            success = False
+            try:
+                async for items in self.iter_refresh_playlist(playlist_id):
+                    yield items
+
+                success = True
+
+            finally:
+                done.set_result(success)
+
+            return
+
+        pages = await self.run_blocking(self.store.pages, playlist_id)
+        for page in sorted(pages):
+            yield await self.run_blocking(self.store.page_items, playlist_id, page)
+
+        if time.time() - refreshed >= self.config.get("playlist_store_ttl", 600):
+            self.create_background_task(
+                self.flights.do(
+                    key, functools.partial(self.refresh_playlist, playlist_id)
+                )
+            )
+
+    ########################################################################################
+    async def refresh_playlist(self, playlist_id: str) -> bool:
+        """Incrementally refresh the cached items of a playlist.
+
+        Args:
+            playlist_id (str): YouTube playlist id.
+
+        Returns:
+            bool: True once the refresh has finished.
+        """
+        async for _ in self.iter_refresh_playlist(playlist_id):
+            pass
+
+        return True
+
+    ########################################################################################
+    async def iter_refresh_playlist(self, playlist_id: str) -> AsyncIterator[list]:
+        """Incrementally refresh the cached items of a playlist, yielding each page as
+        it is resolved. Every page is requested with the ETag it was cached with, pages
+        answered with a 304 are read back from the store and only changed pages are
+        rewritten.
+
+        Args:
+            playlist_id (str): YouTube playlist id.
+
+        Yields:
+            list: The songs on the next page of the playlist.
+        """
+        cached_pages = await self.run_blocking(self.store.pages, playlist_id)
         done = False
         next_token = ""
-        songs = []
+        page = 0
         while not done:
-            results = (
-                self.youtube.playlistItems()  # type: ignore
-                .list(
-                    maxResults=25,
+            cached = cached_pages.get(page)
+            if cached and cached["page_token"] != next_token:
+                cached = None
+
+            results = await self.execute(
+                self.youtube.playlistItems().list(  # type: ignore
+                    maxResults=50,
                     pageToken=next_token,
                     part="snippet,contentDetails,id,status",
                     playlistId=playlist_id,
-                )
-                .execute()
+                ),
+                etag=cached["etag"] if cached else None,
             )
-            songs = songs + results["items"]
-            if "nextPageToken" in results:
-                next_token = results["nextPageToken"]
+            if results is None:
+                items = await self.run_blocking(
+                    self.store.page_items, playlist_id, page
+                )
+                following = cached["next_token"]  # type: ignore
+            else:
+                items = results["items"]
+                following = results.get("nextPageToken")
+                await self.run_blocking(
+                    self.store.replace_page,
+                    playlist_id,
+                    page,
+                    next_token,
+                    following,
+                    results["etag"],
+                    items,
+                )
+
+            yield items
+
+            if following:
+                next_token = following
+                page += 1
             else:
                 done = True
 
-        return songs
+        await self.run_blocking(self.store.finish_refresh, playlist_id, page + 1)
 
     ########################################################################################
-    def get_song(self, song_url: str = "") -> list:
+    async def get_song(self, song_url: str = "") -> list:
         """Get a song from a video url.
 
         Args:
@@ -162,24 +472,219 @@ class PuckBotClient(commands.Bot):
         Returns:
             list: A list of one item, the requested song.
         """
-        # TODO: make sure I'm getting url properly when this is called
         if not song_url:
             raise PuckBotClientError("Must provide a song url.\n")
 
-        result = self.config["video_regex"].search(song_url)
-        if result:
-            results = (
-                self.youtube.videos()  # type: ignore
-                .list(
-                    part="snippet,contentDetails,id,status",
-                    id=result.group("video_id"),
+        return await self.get_songs([song_url])
+
+    ########################################################################################
+    async def get_songs(self, songs: list) -> list:
+        """Get many songs from video urls or ids. The ids are gathered into batches of
+        up to 50 per videos().list call, so queueing 40 songs costs a single request.
+        Further details on response structure are found in the API documentation:
+        https://developers.google.com/youtube/v3/docs/videos/list
+
+        Args:
+            songs (list): YouTube video urls or ids.
+
+        Raises:
+            PuckBotClientError: Raised if a video id could not be extracted.
+
+        Returns:
+            list: The requested songs in the order given. Videos YouTube did not return,
+                such as deleted or private ones, are left out.
+        """
+        video_ids = []
+        for song in songs:
+            result = self.config["video_regex"].search(song)
+            if result:
+                video_ids.append(result.group("video_id"))
+            elif self.config["video_id_regex"].match(song):
+                video_ids.append(song)
+            else:
+                raise PuckBotClientError(f"Could not extract video id from {song}.\n")
+
+        # Videos already being looked up by another request are shared with it.
+        found = await self.flights.do_many(
+            (("video", video_id) for video_id in video_ids), self._fetch_videos
+        )
+
+        return [
+            found[("video", video_id)]
+            for video_id in video_ids
+            if found[("video", video_id)] is not None
+        ]
+
+    ########################################################################################
+    async def _fetch_videos(self, keys: list) -> dict:
+        """Look up videos in batches of up to 50 ids per videos().list call.
+
+        Args:
+            keys (list): ("video", video id) request keys.
+
+        Returns:
+            dict: Request key -> videos resource for every video YouTube returned.
+        """
+        video_ids = [video_id for _, video_id in keys]
+        batches = await asyncio.gather(
+            *(
+                self.execute(
+                    self.youtube.videos().list(  # type: ignore
+                        part="snippet,contentDetails,id,status",
+                        id=",".join(video_ids[start : start + 50]),
+                        maxResults=50,
+                    )
                 )
-                .execute()
+                for start in range(0, len(video_ids), 50)
             )
+        )
+
+        return {
+            ("video", item["id"]): item for batch in batches for item in batch["items"]
+        }
+
+    ########################################################################################
+    async def execute(
+        self, request: googleapiclient.http.HttpRequest, etag: Union[str, None] = None
+    ) -> Union[dict, None]:
+        """Execute a YouTube API request on the API executor so the gateway heartbeat
+        and voice threads keep running while it is in flight.
+
+        Args:
+            request (googleapiclient.http.HttpRequest): The request to execute.
+            etag (Union[str, None], optional): ETag of a previous response. When given
+                the request is made conditional with If-None-Match. Defaults to None.
+
+        Raises:
+            QuotaError: Raised if the daily quota budget cannot cover the request.
+
+        Returns:
+            Union[dict, None]: The decoded response body, or None if the resource has
+                not changed since the provided etag.
+        """
+        with tracer.span("quota", method=request.methodId):
+            await self.quota.acquire(request.methodId)
+
+        if etag:
+            request.headers["If-None-Match"] = etag
+
+        loop = asyncio.get_running_loop()
+
+        # Executor jobs do not inherit the caller's context, so it is carried over for
+        # the request to be traced under the caller's span.
+        return await loop.run_in_executor(
+            self.executor,
+            contextvars.copy_context().run,
+            self._execute_request,
+            request,
+        )
+
+    ########################################################################################
+    def _execute_request(
+        self, request: googleapiclient.http.HttpRequest
+    ) -> Union[dict, None]:
+        """Execute a request on the calling worker thread with that worker's own HTTP
+        object.
+
+        Args:
+            request (googleapiclient.http.HttpRequest): The request to execute.
+
+        Raises:
+            googleapiclient.errors.HttpError: Raised on any non 304 error response.
+
+        Returns:
+            Union[dict, None]: The decoded response body, or None on a 304.
+        """
+        # Third party imports.
+        import googleapiclient.errors  # pylint: disable=import-outside-toplevel
+        import googleapiclient.http  # pylint: disable=import-outside-toplevel
+
+        http = getattr(self.__local, "http", None)
+        if http is None:
+            http = self.__local.http = googleapiclient.http.build_http()
+
+        with tracer.span("api", method=request.methodId) as span:
+            try:
+                return request.execute(
+                    http=http, num_retries=self.config.get("api_retries", 2)
+                )
+
+            except googleapiclient.errors.HttpError as err:
+                if err.resp.status == 304:
+                    span.attributes["not_modified"] = True
+                    return None
+
+                raise
+
+    ########################################################################################
+    def create_background_task(self, coro: Coroutine) -> asyncio.Task:
+        """Run a coroutine in the background, keeping a reference to it until it is
+        done and logging it if it fails.
+
+        Args:
+            coro (Coroutine): The coroutine to run.
+
+        Returns:
+            asyncio.Task: The background task.
+        """
+        task = asyncio.create_task(coro)
+        self.__tasks.add(task)
+        task.add_done_callback(self._background_task_done)
+
+        return task
 
-            return results["items"]
+    ########################################################################################
+    def _background_task_done(self, task: asyncio.Task) -> None:
+        """Forget a finished background task and log its failure, if any.
+
+        Args:
+            task (asyncio.Task): The finished task.
+        """
+        self.__tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.warning(f"Background task failed: {task.exception()}")
+
+    ########################################################################################
+    async def run_blocking(self, func, *args):
+        """Run a blocking callable, such as a store query, on the API executor.
+
+        Args:
+            func (Callable): The blocking callable.
+            *args: Positional arguments for the callable.
+
+        Returns:
+            Any: Whatever the callable returns.
+        """
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(
+            self.executor,
+            contextvars.copy_context().run,
+            functools.partial(func, *args),
+        )
+
+    ########################################################################################
+    async def close(self) -> None:
+        """Override commands.Bot close method to also release the API executor."""
+        await super().close()
+
+        for task in self.__tasks:
+            task.cancel()
+
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            self.__executor = None
+
+        if self.__store is not None:
+            self.__store.close()
+            self.__store = None
 
-        raise PuckBotClientError("Could not extract video id from url.\n")
+        if self.__resume_points is not None:
+            self.__resume_points.close()
+            self.__resume_points = None
+
+        if self.__quota is not None and self.__quota.store is not None:
+            self.__quota.store.close()
 
     ########################################################################################
     async def load_extensions(self, cog_path: str) -> None:
@@ -199,23 +704,39 @@ class PuckBotClient(commands.Bot):
                 cog_package = cog_path[2:].replace("/", ".")
                 await self.load_extension(f"{cog_package}.{filename[:-3]}")
 
+    ####################################################################################
+    async def setup_hook(self) -> None:
+        """Override discord.Client setup_hook method. Called once logged in, before
+        connecting to the gateway.
+        """
+        if self.startup_timer is not None:
+            self.startup_timer.mark("login")
+
     ####################################################################################
     async def on_ready(self) -> None:
         """Override discord.Client on_ready method.  Called when the client is done
         preparing the data received from Discord. Usually after login is successful
         and the Client.guilds and co. are filled up.
         """
-        guild = discord.utils.get(self.guilds, name=self.config["guild"])
-        if not guild:
-            sys.exit(f"Could not connect to guild {self.config['guild']}")
-
-        print(
-            f"{self.user} is connected to the following guild:\n"
-            f"{guild.name}(id: {guild.id})"
+        if self.startup_timer is not None and not self.startup_timer.finished:
+            self.logger.info(self.startup_timer.finish("gateway"))
+
+        self.logger.info(f"{self.user} is connected to {len(self.guilds)} guilds:")
+        for guild in self.guilds:
+            self.logger.info(f"  ...{guild.name} (id: {guild.id})")
+
+        # Queues left by the previous run are restored once their guild plays again.
+        directory = self.config.get("queue_journal_dir", "./cache/queues")
+        waiting = (
+            await self.run_blocking(QueueJournal.waiting, directory)
+            if directory
+            else []
         )
-
-        members = "\n\t- ".join([member.name for member in guild.members])
-        print(f"Guild Members:\n\t- {members}\n")
+        if waiting:
+            self.logger.info("Queue journals waiting to be restored:")
+            for name in waiting:
+                guild = self.get_guild(int(name)) if name.isdigit() else None
+                self.logger.info(f"  ...{guild or 'unknown guild'} (id: {name})")
 
         await self.change_presence(
             activity=discord.Activity(
@@ -1,21 +1,55 @@
 # Third party imports.
+import asyncio
+import functools
+import math
 import random
 from os.path import dirname
-from typing import Union
+from typing import AsyncIterator, Union
 
 import discord
 from discord.ext import commands
 
 from music_bot.client import PuckBotClient
-from music_bot.common.classes import AudioState, Song
+from music_bot.common.classes import (
+    AudioState,
+    AudioStateRegistry,
+    Song,
+    SongQueue,
+    YTDLSource,
+)
+from music_bot.common.reaper import ResourceReaper
+from music_bot.common.tracing import tracer
 
 
 ########################################################################################
 class PuckCog(commands.Cog):
     """Cog containing commands for the Puck Discord bot."""
 
+    # Traced stages of the play pipeline, in the order a song goes through them.
+    STAGES = (
+        "load",
+        "quota",
+        "api",
+        "queued",
+        "prefetch",
+        "prefetch_wait",
+        "extract",
+        "spawn",
+        "first_packet",
+        "play",
+    )
+
+    # Songs listed per page by the queue command.
+    QUEUE_PAGE = 15
+
     def __init__(self, bot: PuckBotClient):
         self.bot = bot
+        self.audio_states = AudioStateRegistry(
+            bot, idle_timeout=bot.config.get("audio_state_idle", 600.0)
+        )
+        self.reaper = ResourceReaper(
+            bot, self.audio_states, interval=bot.config.get("reaper_interval", 60.0)
+        )
 
         self.bot.logger.debug("Finished initializing PuckCog.\n")
 
@@ -23,17 +57,17 @@ class PuckCog(commands.Cog):
     #                                  Properties                                      #
     ####################################################################################
     @property
-    def audio_state(self) -> AudioState:
-        """Current state of the playlist.
+    def audio_states(self) -> AudioStateRegistry:
+        """Playback state of every guild.
 
         Returns:
-            AudioState: Current state of the playlist.
+            AudioStateRegistry: Playback state of every guild.
         """
-        return self.__audio_state
+        return self.__audio_states
 
-    @audio_state.setter
-    def audio_state(self, audio_state: AudioState):
-        self.__audio_state = audio_state
+    @audio_states.setter
+    def audio_states(self, audio_states: AudioStateRegistry):
+        self.__audio_states = audio_states
 
     ####################################################################################
     @property
@@ -49,24 +83,44 @@ class PuckCog(commands.Cog):
     def bot(self, bot: PuckBotClient):
         self.__bot = bot
 
+    ####################################################################################
+    @property
+    def reaper(self) -> ResourceReaper:
+        """Periodic reclaimer of idle and leaked resources.
+
+        Returns:
+            ResourceReaper: Periodic reclaimer of idle and leaked resources.
+        """
+        return self.__reaper
+
+    @reaper.setter
+    def reaper(self, reaper: ResourceReaper):
+        self.__reaper = reaper
+
     ####################################################################################
     #                             Special Cog Methods                                  #
     #       More info about Cogs and their special methods can be found here:          #
     #     https://discordpy.readthedocs.io/en/stable/ext/commands/api.html#cog         #
     ####################################################################################
     async def cog_before_invoke(self, ctx: commands.Context) -> None:
-        """A special method that acts as a cog local pre-invoke hook.
+        """A special method that acts as a cog local pre-invoke hook. Attaches the
+        state of the command's guild to the context as ctx.audio_state.
 
         Args:
             ctx (commands.Context): The cog context.
         """
-        if not hasattr(self, "audio_state"):
-            self.audio_state = AudioState(self.bot, ctx)
+        ctx.audio_state = self.audio_states.ensure(ctx)  # type: ignore
+
+    ####################################################################################
+    async def cog_load(self) -> None:
+        """A special method that is called when the cog gets loaded."""
+        self.reaper.start()
 
     ####################################################################################
     async def cog_unload(self) -> None:
         """A special method that is called when the cog gets removed."""
-        self.bot.loop.create_task(self.audio_state.stop())
+        self.reaper.stop()
+        await self.audio_states.close()
 
     ####################################################################################
     #                                 Cog Listeners                                    #
@@ -74,7 +128,17 @@ class PuckCog(commands.Cog):
     @commands.Cog.listener()
     async def on_ready(self) -> None:
         """Method called once the bot is ready."""
-        print("Bot is now online!\n")
+        self.bot.logger.info("Bot is now online!")
+
+    ####################################################################################
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild) -> None:
+        """Tear down a guild's playback state once the bot is removed from it.
+
+        Args:
+            guild (discord.Guild): The guild.
+        """
+        await self.audio_states.remove(guild.id)
 
     ####################################################################################
     #                                 Bot Commands                                     #
@@ -105,25 +169,84 @@ class PuckCog(commands.Cog):
     #     ).set_footer(text="Viewing page {}/{}".format(page, pages))
     #     await ctx.send(embed=embed)
     ####################################################################################
-    @commands.command(name="add", help="Add a song or a playlist to the queue.")
-    async def add(self, ctx: commands.Context, url: str) -> None:
-        """Add a song or a playlist to the queue.
+    @commands.command(name="add", help="Add songs or playlists to the queue.")
+    async def add(self, ctx: commands.Context, *urls: str) -> None:
+        """Add songs or playlists to the queue. Consecutive song urls or ids are resolved
+        together in batched requests.
 
         Args:
             ctx (commands.Context): The command context.
-            url (str): Url to load into the queue.
+            urls (str): Urls or video ids to load into the queue.
         """
-        result = self.bot.config["playlist_regex"].search(url)
-        # Process as a playlist.
-        if result:
-            cnt = await self._load(playlist_id=result.group("playlist_id"))
+        await self._add(ctx, urls, SongQueue.NORMAL)
 
-        # Process as a song.
-        else:
-            cnt = await self._load(song_url=url)
+    ####################################################################################
+    async def _add(self, ctx: commands.Context, urls: tuple, priority: int) -> None:
+        """Add songs or playlists to a lane of the queue.
+
+        Args:
+            ctx (commands.Context): The command context.
+            urls (tuple): Urls or video ids to load into the queue.
+            priority (int): Queue lane.
+        """
+        if not urls:
+            await ctx.send("Must provide at least one url to command!")
+            return
+
+        # The player is started as soon as the first songs are queued.
+        load = functools.partial(
+            self._load,
+            ctx.audio_state,  # type: ignore
+            ctx,
+            requester=ctx.author.id,
+            priority=priority,
+        )
+        cnt = 0
+        song_urls = []
+        for url in urls:
+            result = self.bot.config["playlist_regex"].search(url)
+            # Process as a playlist.
+            if result:
+                if song_urls:
+                    cnt += await load(song_urls=song_urls)
+                    song_urls = []
+
+                cnt += await load(playlist_id=result.group("playlist_id"))
+
+            # Process as a song.
+            else:
+                song_urls.append(url)
+
+        if song_urls:
+            cnt += await load(song_urls=song_urls)
 
         await ctx.send(f"Loaded {cnt} songs into the queue.")
-        await ctx.invoke(self.play)
+
+    ####################################################################################
+    @commands.command(name="cache", help="Show the on-disk track cache.")
+    async def cache(self, ctx: commands.Context) -> None:
+        """Show the on-disk track cache usage and the most recently played tracks.
+
+        Args:
+            ctx (commands.Context): The command context.
+        """
+        if YTDLSource.tracks is None:
+            await ctx.send("The track cache is disabled.")
+            return
+
+        stats = YTDLSource.tracks.stats
+        recent = "\n\t".join(
+            f"{video_id}: {size / 2**20:.1f} MiB"
+            for video_id, size in YTDLSource.tracks.recent()
+        )
+        await ctx.send(
+            f"Track cache: {stats['entries']} tracks, "
+            f"{stats['bytes'] / 2**20:.1f}/{stats['max_bytes'] / 2**20:.0f} MiB used, "
+            f"{stats['writing']} being written.\n"
+            f"{stats['hits']} hits, {stats['misses']} misses, "
+            f"{stats['evictions']} evicted, {stats['failures']} failed writes.\n"
+            f"Most recently played:\n\t{recent}"
+        )
 
     ####################################################################################
     @commands.command(name="clear", help="Clear all songs in the queue.")
@@ -133,7 +256,7 @@ class PuckCog(commands.Cog):
         Args:
             ctx (commands.Context): The cog context.
         """
-        self.audio_state.queue.clear()
+        ctx.audio_state.queue.clear()
 
         await ctx.send("Queue cleared.")
 
@@ -171,12 +294,12 @@ class PuckCog(commands.Cog):
         destination = ctx.author.voice.channel  # type: ignore
 
         # If already connected to a voice channel, move to the new voice channel.
-        if self.audio_state.voice is not None:
+        if ctx.audio_state.voice is not None:
             self.bot.logger.debug("JOIN: Attempting to move voice channel.")
-            await self.audio_state.voice.move_to(destination)
+            await ctx.audio_state.voice.move_to(destination)
             return
 
-        self.audio_state.voice = await destination.connect()  # type: ignore
+        ctx.audio_state.voice = await destination.connect()  # type: ignore
 
     ####################################################################################
     @commands.command(name="leave", aliases=["disconnect"])
@@ -187,11 +310,11 @@ class PuckCog(commands.Cog):
         Args:
             ctx (commands.Context): The command context.
         """
-        if not self.audio_state.voice:
+        if not ctx.audio_state.voice:
             await ctx.send("Not connected to any voice channel.")
             return
 
-        await self.audio_state.stop()
+        await self.audio_states.remove(ctx.guild.id)  # type: ignore
 
     ####################################################################################
     @commands.command(name="list", help="List all songs in a given playlist.")
@@ -203,7 +326,7 @@ class PuckCog(commands.Cog):
             plist (str): Playlist for which to list all songs.
         """
         try:
-            songs = self.bot.get_playlist_songs(playlist)
+            songs = await self.bot.get_playlist_songs(playlist)
             await ctx.send("\n - ".join([song["snippet"]["title"] for song in songs]))
 
         except Exception as err:
@@ -211,6 +334,27 @@ class PuckCog(commands.Cog):
                 f"Error encountered getting songs for playlist {playlist} : {err}"
             )
 
+    ####################################################################################
+    @commands.command(name="latency", help="Show play pipeline latency percentiles.")
+    async def latency(self, ctx: commands.Context) -> None:
+        """Show the latency percentiles of each play pipeline stage over recent plays.
+        play runs from the player taking a song off the queue to its first packet.
+
+        Args:
+            ctx (commands.Context): The command context.
+        """
+        report = tracer.percentiles(self.STAGES)
+        if not report:
+            await ctx.send("No plays traced yet.")
+            return
+
+        lines = "\n\t".join(
+            f"{name}: p50 {stage['p50'] * 1000:.0f}ms, p90 {stage['p90'] * 1000:.0f}ms, "
+            f"p99 {stage['p99'] * 1000:.0f}ms over {stage['count']}"
+            for name, stage in report.items()
+        )
+        await ctx.send(f"Play pipeline latency:\n\t{lines}")
+
     ####################################################################################
     @commands.command(
         name="load", help="Load all songs in a given playlist at the end of the queue."
@@ -226,31 +370,137 @@ class PuckCog(commands.Cog):
             await ctx.send("Must provide a playlist to command!")
 
         else:
-            cnt = await self._load(playlist=playlist)
-            await ctx.send(f"Loaded {cnt} songs into the queue.")
-            print(
-                f"back in load, there are {self.audio_state.queue.qsize()} songs in the queue"
+            cnt = await self._load(
+                ctx.audio_state, requester=ctx.author.id, playlist=playlist
             )
+            await ctx.send(f"Loaded {cnt} songs into the queue.")
 
     ####################################################################################
-    async def _load(self, **kwargs) -> int:
-        """Load songs into the queue by playlist name, playlist id, or song url.
+    async def _load(
+        self,
+        audio_state: AudioState,
+        ctx: Union[commands.Context, None] = None,
+        requester: int = 0,
+        priority: int = SongQueue.NORMAL,
+        **kwargs,
+    ) -> int:
+        """Load songs into the queue by playlist name, playlist id, or song urls.
+        Playlists are streamed a page at a time so nothing waits on the full playlist.
+
+        Args:
+            audio_state (AudioState): State of the guild to load the songs for.
+            ctx (Union[commands.Context, None], optional): When provided, the player is
+                started as soon as the first songs are queued. Defaults to None.
+            requester (int, optional): Discord id of the member queueing the songs,
+                who the songs are scheduled against. Defaults to 0.
+            priority (int, optional): Queue lane. Defaults to SongQueue.NORMAL.
 
         Returns:
             int: Number of songs added to the queue.
         """
         self.bot.logger.debug("LOAD: Attempting to load songs.")
         cnt = 0
-        if "song_url" in kwargs:
-            songs = self.bot.get_song(**kwargs)
+        playing = False
+        with tracer.span(
+            "load", guild=audio_state.ctx.guild.id, kind=next(iter(kwargs), "")  # type: ignore
+        ):
+            if "song_urls" in kwargs:
+                pages = [await self.bot.get_songs(kwargs["song_urls"])]
+            else:
+                pages = self.bot.iter_playlist_songs(**kwargs)
+
+            # Each page goes into the queue as one batch. The stream is closed however
+            # the load ends, so a playlist fetch shared with other requests is released.
+            factory = functools.partial(Song, requester=requester, priority=priority)
+            try:
+                async for songs in self._iter_pages(pages):
+                    cnt += audio_state.queue.put_many(songs, factory)
+
+                    if ctx is not None and cnt and not playing:
+                        playing = True
+                        await self._start_player(ctx)
+
+            finally:
+                if not isinstance(pages, list):
+                    await pages.aclose()
+
+        return cnt
+
+    ####################################################################################
+    @staticmethod
+    async def _iter_pages(
+        pages: Union[list, AsyncIterator[list]],
+    ) -> AsyncIterator[list]:
+        """Iterate over pages of songs whether they are already in memory or streamed.
+
+        Args:
+            pages (Union[list, AsyncIterator[list]]): Pages of songs.
+
+        Yields:
+            list: The next page of songs.
+        """
+        if isinstance(pages, list):
+            for page in pages:
+                yield page
+
         else:
-            songs = self.bot.get_playlist_songs(**kwargs)
+            async for page in pages:
+                yield page
 
-        for song in songs:
-            await self.audio_state.queue.put(Song(song))
-            cnt += 1
+    ####################################################################################
+    async def _start_player(self, ctx: commands.Context) -> None:
+        """Start the player for songs that are being loaded. A player that can't be
+        started is reported to the channel instead of raised, so the rest of the songs
+        are still loaded.
 
-        return cnt
+        Args:
+            ctx (commands.Context): The command context.
+        """
+        if not self.ensure_voice_channel(ctx.author):
+            await ctx.send("Join a voice channel and use play to start the queue.")
+            return
+
+        try:
+            await ctx.invoke(self.play)
+
+        except (discord.DiscordException, asyncio.TimeoutError) as err:
+            self.bot.logger.warning(f"LOAD: Unable to start the player: {err}")
+            await ctx.send(f"Unable to start playing: {err}")
+
+    ####################################################################################
+    @commands.command(name="move", help="Move a song to another queue position.")
+    @commands.has_permissions(manage_guild=True)
+    async def move(self, ctx: commands.Context, source: int, destination: int) -> None:
+        """Move a song to another position in the queue. Positions start at 1, as
+        shown by queue.
+
+        Args:
+            ctx (commands.Context): The command context.
+            source (int): Position of the song.
+            destination (int): Position to move it to.
+        """
+        queue = ctx.audio_state.queue
+        if not 1 <= source <= len(queue):
+            await ctx.send(f"There is no song at position {source}.")
+            return
+
+        song = queue.move(source - 1, max(destination, 1) - 1)
+        await ctx.send(
+            f"Moved {song.title} to position {min(max(destination, 1), len(queue))}."
+        )
+
+    ####################################################################################
+    @commands.command(name="next", help="Add songs ahead of the fair-share queue.")
+    @commands.has_permissions(manage_guild=True)
+    async def next(self, ctx: commands.Context, *urls: str) -> None:
+        """Add songs or playlists to the priority lane, which plays before everything
+        queued with add.
+
+        Args:
+            ctx (commands.Context): The command context.
+            urls (str): Urls or video ids to load into the queue.
+        """
+        await self._add(ctx, urls, SongQueue.PRIORITY)
 
     ####################################################################################
     @commands.command(name="pause", help="Pause the current song.")
@@ -261,8 +511,8 @@ class PuckCog(commands.Cog):
         Args:
             ctx (commands.Context): The command context.
         """
-        if not self.audio_state.is_playing and self.audio_state.voice.is_playing():  # type: ignore
-            self.audio_state.voice.pause()  # type: ignore
+        if not ctx.audio_state.is_playing and ctx.audio_state.voice.is_playing():  # type: ignore
+            ctx.audio_state.voice.pause()  # type: ignore
             await ctx.message.add_reaction("⏯")
 
     ####################################################################################
@@ -271,13 +521,13 @@ class PuckCog(commands.Cog):
         """Plays a song.  If there are songs in the queue, this will be queued until the
         other songs finished playing.
         """
-        if self.audio_state.voice is None:
+        if ctx.audio_state.voice is None:
             self.bot.logger.debug(
                 "PLAY: Not connected to voice channel, attempting connection.."
             )
             await ctx.invoke(self.join)
 
-        self.audio_state.play()
+        ctx.audio_state.play()
         self.bot.logger.debug("PLAY: Attempting to play songs.")
 
     ####################################################################################
@@ -288,25 +538,79 @@ class PuckCog(commands.Cog):
         Args:
             ctx (commands.Context): The command context.
         """
-        out = "\n\t".join(sorted(self.bot.get_playlists().keys()))
+        playlists = await self.bot.get_playlists()
+        out = "\n\t".join(sorted(playlists.keys()))
 
         await ctx.send(f"Available playlists:\n\t{out}\n")
 
     ####################################################################################
-    @commands.command(name="queue", help="List all songs in the queue.")
-    async def queue(self, ctx: commands.Context) -> None:
-        """List all songs in the queue.
+    @commands.command(
+        name="queue", help="List the songs in the queue, a page at a time."
+    )
+    async def queue(self, ctx: commands.Context, page: int = 1) -> None:
+        """List a page of the songs in the queue.
 
         Args:
             ctx (commands.Context): The cog context.
+            page (int, optional): Page to list. Defaults to 1.
         """
-        cnt = self.audio_state.queue.qsize()
-        if cnt:
-            await ctx.send(f"There are currently {cnt} songs in the queue.")
-            for song in self.audio_state.queue:
-                await ctx.send(f"- {song.title}")
-        else:
+        queue = ctx.audio_state.queue
+        if not queue:
             await ctx.send("There are currently no songs in the queue.")
+            return
+
+        pages = -(-len(queue) // self.QUEUE_PAGE)
+        page = min(max(page, 1), pages)
+        start = (page - 1) * self.QUEUE_PAGE
+        songs = "\n".join(
+            f"{position}. {song.title}"
+            for position, song in enumerate(
+                queue[start : start + self.QUEUE_PAGE], start=start + 1
+            )
+        )
+        await ctx.send(
+            f"There are currently {len(queue)} songs in the queue, page {page}/{pages}:"
+            f"\n{songs}"
+        )
+
+    ####################################################################################
+    @commands.command(name="quota", help="Show today's YouTube API quota spend.")
+    async def quota(self, ctx: commands.Context) -> None:
+        """Show today's YouTube API quota spend.
+
+        Args:
+            ctx (commands.Context): The command context.
+        """
+        await self.bot.quota.load()
+        report = self.bot.quota.report()
+        endpoints = "\n\t".join(
+            f"{endpoint}: {units}"
+            for endpoint, units in sorted(report["endpoints"].items())
+        )
+        hours, seconds = divmod(int(report["resets_in"]), 3600)
+        await ctx.send(
+            f"YouTube quota: {report['spent']}/{report['budget']} units spent, "
+            f"{report['remaining']} remaining, resets in {hours}h{seconds // 60:02d}m.\n"
+            f"Throttled requests: {report['throttled']}\n\t{endpoints}"
+        )
+
+    ####################################################################################
+    @commands.command(name="remove", help="Remove a song from the queue.")
+    @commands.has_permissions(manage_guild=True)
+    async def remove(self, ctx: commands.Context, position: int) -> None:
+        """Remove a song from the queue. Positions start at 1, as shown by queue.
+
+        Args:
+            ctx (commands.Context): The command context.
+            position (int): Position of the song.
+        """
+        queue = ctx.audio_state.queue
+        if not 1 <= position <= len(queue):
+            await ctx.send(f"There is no song at position {position}.")
+            return
+
+        song = queue.remove(position - 1)
+        await ctx.send(f"Removed {song.title} from the queue.")
 
     ####################################################################################
     @commands.command(name="resume", help="Resume the playlist.")
@@ -317,10 +621,48 @@ class PuckCog(commands.Cog):
         Args:
             ctx (commands.Context): The command context.
         """
-        if not self.audio_state.is_playing and self.audio_state.voice.is_paused():  # type: ignore
-            self.audio_state.voice.resume()  # type: ignore
+        if not ctx.audio_state.is_playing and ctx.audio_state.voice.is_paused():  # type: ignore
+            ctx.audio_state.voice.resume()  # type: ignore
             await ctx.message.add_reaction("⏯")
 
+    ####################################################################################
+    @commands.command(
+        name="seek", help="Seek to a position, e.g. 1:30, 90, +10 or -10 seconds."
+    )
+    @commands.has_permissions(manage_guild=True)
+    async def seek(self, ctx: commands.Context, position: str) -> None:
+        """Seek within the current song. Positions are absolute as [[h:]m:]s, or
+        relative to the current position when prefixed with + or -.
+
+        Args:
+            ctx (commands.Context): The command context.
+            position (str): Position to seek to.
+        """
+        if ctx.audio_state.current is None or ctx.audio_state.current.source is None:
+            await ctx.send("The bot is not playing anything at the moment.")
+            return
+
+        try:
+            seconds = 0.0
+            for part in position.lstrip("+-").split(":"):
+                seconds = seconds * 60 + float(part)
+
+            # float() also parses nan and inf, which no song can be seeked to.
+            if not math.isfinite(seconds):
+                raise ValueError(position)
+
+        except ValueError:
+            await ctx.send(f"Invalid position {position}.")
+            return
+
+        if position[0] in "+-":
+            seconds = ctx.audio_state.position + (
+                seconds if position[0] == "+" else -seconds
+            )
+
+        minutes, seconds = divmod(int(await ctx.audio_state.seek(seconds)), 60)
+        await ctx.send(f"Seeked to {minutes}:{seconds:02d}")
+
     ####################################################################################
     @commands.command(name="skip", help="Skip the current song.")
     @commands.has_permissions(manage_guild=True)
@@ -330,12 +672,70 @@ class PuckCog(commands.Cog):
         Args:
             ctx (commands.Context): The command context.
         """
-        if self.audio_state.is_playing:
-            self.audio_state.skip()
-            await ctx.send(f"Skipping {self.audio_state.current.title}")  # type: ignore
+        if ctx.audio_state.is_playing:
+            ctx.audio_state.skip()
+            await ctx.send(f"Skipping {ctx.audio_state.current.title}")  # type: ignore
         else:
             await ctx.send("The bot is not playing anything at the moment.")
 
+    ####################################################################################
+    @commands.command(name="stats", help="Show cache statistics.")
+    async def stats(self, ctx: commands.Context) -> None:
+        """Show cache statistics.
+
+        Args:
+            ctx (commands.Context): The command context.
+        """
+        catalog = self.bot.playlist_cache_stats
+        extractor = YTDLSource.extractor.stats
+        guilds = self.audio_states.stats
+        streams = YTDLSource.streams.stats
+        await ctx.send(
+            f"Guilds: {guilds['guilds']} active, {guilds['playing']} playing, "
+            f"{guilds['reaped']} torn down while idle.\n"
+            f"Playlist catalog cache: {catalog['hits']} hits, "
+            f"{catalog['misses']} misses, {catalog['not_modified']} unchanged pages.\n"
+            f"Stream cache: {streams['entries']} entries, {streams['hits']} hits, "
+            f"{streams['misses']} misses, {streams['expired']} expired, "
+            f"{streams['evictions']} evicted.\n"
+            f"Extractor pool: {extractor['workers']} workers, {extractor['jobs']} jobs, "
+            f"{extractor['failures']} failed, {extractor['timeouts']} timed out, "
+            f"{extractor['recycles']} recycles."
+        )
+        if YTDLSource.ffmpeg_pool is not None:
+            pool = YTDLSource.ffmpeg_pool.stats
+            ttfp = ", ".join(
+                f"{name} {pool[f'{name}_ttfp'] * 1000:.0f}ms"
+                for name in ("pooled", "cold")
+                if pool[f"{name}_ttfp"] is not None
+            )
+            await ctx.send(
+                f"FFmpeg pool: {pool['idle']} idle, {pool['hits']} hits, "
+                f"{pool['misses']} misses, {pool['spawned']} spawned, "
+                f"{pool['reaped']} reaped.\n"
+                f"Median time to first packet: {ttfp or 'no samples yet'}."
+            )
+        reaper = self.reaper.stats
+        if reaper["runs"]:
+            usage = reaper["last"]
+            await ctx.send(
+                f"Reaper: {reaper['runs']} runs reclaimed {reaper['guilds']} idle "
+                f"guilds, {reaper['voice_clients']} voice clients, "
+                f"{reaper['ffmpeg']} orphaned FFmpeg processes, {reaper['tasks']} "
+                f"tasks, {reaper['sources']} sources and {reaper['streams']} expired "
+                f"stream urls.\n"
+                f"After the last run: "
+                f"{(usage['rss'] or 0) / 2**20:.1f} MiB resident, {usage['fds']} open "
+                f"file descriptors."
+            )
+        if YTDLSource.loudness is not None:
+            loudness = YTDLSource.loudness.stats
+            await ctx.send(
+                f"Loudness analysis: {loudness['stored']} tracks analysed, "
+                f"{loudness['pending']} pending, {loudness['analysed']} analysed and "
+                f"{loudness['failures']} failed this session."
+            )
+
     ####################################################################################
     @commands.command(name="stop", help="Stop playing the queue.")
     async def stop(self, ctx: commands.Context) -> None:
@@ -344,12 +744,56 @@ class PuckCog(commands.Cog):
         Args:
             ctx (commands.Context): The command context.
         """
-        if self.audio_state.is_playing:
-            await self.audio_state.stop()
-            await ctx.send(f"Skipping {self.audio_state.current.title}")  # type: ignore
+        if ctx.audio_state.is_playing:
+            await ctx.audio_state.stop()
+            await ctx.send(f"Skipping {ctx.audio_state.current.title}")  # type: ignore
         else:
             await ctx.send("The bot is not playing anything at the moment.")
 
+    ####################################################################################
+    @commands.command(name="volume", help="Show or set the volume, 0 to 200 percent.")
+    async def volume(
+        self, ctx: commands.Context, percent: Union[int, None] = None
+    ) -> None:
+        """Show or set the playback volume of the guild.
+
+        Args:
+            ctx (commands.Context): The command context.
+            percent (Union[int, None], optional): New volume in percent. Defaults to
+                None, which shows the current volume.
+        """
+        if percent is None:
+            await ctx.send(f"Volume: {ctx.audio_state.volume:.0%}")
+            return
+
+        if not 0 <= percent <= 200:
+            await ctx.send("Volume must be between 0 and 200 percent.")
+            return
+
+        ctx.audio_state.volume = percent / 100
+        await ctx.send(f"Volume set to {percent}%")
+
+    ####################################################################################
+    @commands.command(name="weight", help="Set a member's share of the queue.")
+    @commands.has_permissions(manage_guild=True)
+    async def weight(
+        self, ctx: commands.Context, member: discord.Member, weight: float
+    ) -> None:
+        """Set a member's fair-share weight. A member with weight 2 gets two songs
+        played for every one of a member with weight 1.
+
+        Args:
+            ctx (commands.Context): The command context.
+            member (discord.Member): The member.
+            weight (float): The weight, between 0.1 and 10.
+        """
+        if not 0.1 <= weight <= 10:
+            await ctx.send("Weight must be between 0.1 and 10.")
+            return
+
+        ctx.audio_state.queue.set_weight(member.id, weight)
+        await ctx.send(f"{member.display_name} now has a queue weight of {weight:g}.")
+
     ####################################################################################
     #                             Instance Methods                                     #
     ####################################################################################
@@ -0,0 +1,589 @@
+# Standard library imports.
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Union
+from urllib.parse import parse_qs, urlparse
+
+from music_bot.common.exceptions import YTDLError
+from music_bot.common.track import TrackInfo
+
+logger = logging.getLogger(__name__)
+
+
+########################################################################################
+class TrackCache:
+    """Size-bounded on-disk cache of played tracks. Each track is written once as
+    Ogg/Opus next to a JSON sidecar holding its info, so later plays are served from
+    disk without extraction or network traffic. A track is written by a second output
+    of the FFmpeg process playing it, and only downloaded separately when that process
+    is restarted by a seek or a failure. Files are written to a temporary name and
+    renamed into place, so a crash never leaves a partial track behind. The least
+    recently played tracks are evicted once the cache outgrows its byte budget.
+
+    The index lives in memory and is only touched on the event loop, every file
+    operation after start up runs through run_blocking.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_bytes: int = 1 << 30,
+        writers: int = 2,
+        on_stored: Union[Callable[[str, str], Awaitable], None] = None,
+        run_blocking: Union[Callable[..., Awaitable], None] = None,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.on_stored = on_stored
+        self.run_blocking = run_blocking or asyncio.to_thread
+
+        self._entries = OrderedDict()
+        self._loop = None
+        self._semaphore = asyncio.Semaphore(writers)
+        self._stats = {"evictions": 0, "failures": 0, "hits": 0, "misses": 0, "teed": 0}
+
+        # Tracks being written, to the task writing them, or to None while the FFmpeg
+        # process playing them writes them.
+        self._writing = {}
+
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def __contains__(self, video_id: str) -> bool:
+        return video_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def size(self) -> int:
+        """Bytes used by the cached tracks and their sidecars.
+
+        Returns:
+            int: Bytes used.
+        """
+        return sum(self._entries.values())
+
+    ####################################################################################
+    @property
+    def stats(self) -> dict:
+        """Cache counters.
+
+        Returns:
+            dict: Hit, miss, eviction and failure counters and the tracks written by
+                their playing process, plus the entry count, bytes used, byte budget and
+                tracks being written.
+        """
+        return {
+            **self._stats,
+            "bytes": self.size,
+            "entries": len(self._entries),
+            "max_bytes": self.max_bytes,
+            "writing": len(self._writing),
+        }
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    async def get(self, video_id: str) -> Union[tuple, None]:
+        """Get a cached track, marking it as recently played.
+
+        Args:
+            video_id (str): YouTube id of the video.
+
+        Returns:
+            Union[tuple, None]: Path of the Ogg/Opus file and its TrackInfo, or None on
+                a miss.
+        """
+        if video_id not in self._entries:
+            self._stats["misses"] += 1
+            return None
+
+        # Mark the track as played before reading it, so it is not evicted meanwhile.
+        self._entries.move_to_end(video_id)
+        try:
+            info = await self.run_blocking(self._read, video_id)
+
+        except (OSError, ValueError, YTDLError):
+            if self._entries.pop(video_id, None) is not None:
+                await self.run_blocking(self._remove, [video_id])
+
+            self._stats["misses"] += 1
+            return None
+
+        self._stats["hits"] += 1
+
+        return self._path(video_id, "opus"), info
+
+    ####################################################################################
+    def recent(self, count: int = 5) -> list:
+        """Get the most recently played tracks.
+
+        Args:
+            count (int, optional): Number of tracks. Defaults to 5.
+
+        Returns:
+            list: (video id, bytes) of the most recently played tracks, newest first.
+        """
+        return list(reversed(self._entries.items()))[:count]
+
+    ####################################################################################
+    def schedule(self, video_id: str, info: TrackInfo) -> None:
+        """Write a track to the cache in the background, unless it is already cached
+        or being written.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            info (TrackInfo): Track info with the stream url.
+        """
+        if video_id in self._entries or video_id in self._writing:
+            return
+
+        self._track(video_id, self._write(video_id, info))
+
+    ####################################################################################
+    def tee(self, video_id: str, info: TrackInfo) -> Union[list, None]:
+        """Reserve a streamed track to be written by the FFmpeg process that plays it,
+        so its first play downloads it only once. tee_done() must be called once the
+        process has exited.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            info (TrackInfo): Track info with the stream url.
+
+        Returns:
+            Union[list, None]: FFmpeg output options writing the track, or None if it is
+                not streamed, or already cached or being written.
+        """
+        if (
+            not info.url.startswith(("http://", "https://"))
+            or video_id in self._entries
+            or video_id in self._writing
+        ):
+            return None
+
+        self._loop = asyncio.get_running_loop()
+        self._writing[video_id] = None
+
+        return self._output(info, self._tmp(video_id))
+
+    ####################################################################################
+    def tee_done(
+        self, video_id: str, info: TrackInfo, complete: bool, fallback: bool
+    ) -> None:
+        """Hand back a track reserved by tee() once its FFmpeg process has exited. Thread
+        safe, as the process usually ends on the voice thread.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            info (TrackInfo): Track info with the stream url.
+            complete (bool): True if the process wrote the whole track.
+            fallback (bool): True to download an incomplete track separately, for
+                processes restarted by a seek or a failure rather than a skip.
+        """
+        try:
+            self._loop.call_soon_threadsafe(  # type: ignore
+                self._tee_done, video_id, info, complete, fallback
+            )
+
+        except RuntimeError:
+            # The loop has closed, the temporary file is removed on the next start.
+            pass
+
+    ####################################################################################
+    def _evict(self) -> list:
+        """Drop the least recently played tracks from the index until the cache fits
+        its budget. Their files are left for the caller to remove.
+
+        Returns:
+            list: Video ids of the dropped tracks.
+        """
+        evicted = []
+        size = self.size
+        while size > self.max_bytes and self._entries:
+            video_id, entry_size = self._entries.popitem(last=False)
+            evicted.append(video_id)
+            size -= entry_size
+            self._stats["evictions"] += 1
+
+        return evicted
+
+    ####################################################################################
+    async def _keep(self, video_id: str, info: TrackInfo, track_tmp: str) -> None:
+        """Move a written track into place and index it, evicting what no longer fits.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            info (TrackInfo): Track info.
+            track_tmp (str): Temporary path the track was written to.
+        """
+        try:
+            size = await self.run_blocking(self._store, video_id, info, track_tmp)
+
+        except (OSError, ValueError) as err:
+            self._stats["failures"] += 1
+            logger.warning(f"Unable to cache track {video_id}: {err}")
+            return
+
+        self._entries[video_id] = size
+        evicted = self._evict()
+        if evicted:
+            await self.run_blocking(self._remove, evicted)
+
+        if self.on_stored is not None and video_id in self._entries:
+            await self.on_stored(video_id, self._path(video_id, "opus"))
+
+    ####################################################################################
+    def _load(self) -> None:
+        """Index the tracks already on disk, least recently played first."""
+        tracks = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".tmp"):
+                os.remove(entry.path)
+
+            elif entry.name.endswith(".opus"):
+                video_id = entry.name[: -len(".opus")]
+                try:
+                    sidecar = os.stat(self._path(video_id, "json"))
+                except FileNotFoundError:
+                    os.remove(entry.path)
+                    continue
+
+                stat = entry.stat()
+                tracks.append((stat.st_mtime, video_id, stat.st_size + sidecar.st_size))
+
+        for _, video_id, size in sorted(tracks):
+            self._entries[video_id] = size
+
+        self._remove(self._evict())
+
+    ####################################################################################
+    @staticmethod
+    def _output(info: TrackInfo, path: str) -> list:
+        """FFmpeg output options writing a track as Ogg/Opus. Opus sources are copied
+        without re-encoding.
+
+        Args:
+            info (TrackInfo): Track info.
+            path (str): Path to write the track to.
+
+        Returns:
+            list: FFmpeg output options.
+        """
+        codec = ["copy"] if info.acodec == "opus" else ["libopus", "-b:a", "128k"]
+
+        return ["-vn", "-map", "0:a:0", "-c:a", *codec, "-f", "ogg", "-y", path]
+
+    ####################################################################################
+    def _path(self, video_id: str, extension: str) -> str:
+        """Path of a cached file.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            extension (str): File extension.
+
+        Returns:
+            str: Path of the cached file.
+        """
+        return os.path.join(self.directory, f"{video_id}.{extension}")
+
+    ####################################################################################
+    def _read(self, video_id: str) -> TrackInfo:
+        """Read a cached track's info and touch the track, so its age on disk follows
+        its last play. Runs through run_blocking.
+
+        Args:
+            video_id (str): YouTube id of the video.
+
+        Raises:
+            OSError: Raised if the sidecar or the track is missing.
+            ValueError: Raised if the sidecar is unreadable.
+
+        Returns:
+            TrackInfo: The track info.
+        """
+        with open(self._path(video_id, "json"), mode="r", encoding="utf-8") as fp:
+            info = TrackInfo.from_dict(json.load(fp))
+
+        os.utime(self._path(video_id, "opus"))
+
+        return info
+
+    ####################################################################################
+    def _remove(self, video_ids: list) -> None:
+        """Remove the files of tracks that left the index. Runs through run_blocking
+        once the cache is running.
+
+        Args:
+            video_ids (list): YouTube ids of the videos.
+        """
+        for video_id in video_ids:
+            for extension in ("opus", "json"):
+                try:
+                    os.remove(self._path(video_id, extension))
+                except FileNotFoundError:
+                    pass
+
+    ####################################################################################
+    @staticmethod
+    def _remove_tmp(path: str) -> None:
+        """Remove a temporary file left by a failed write, if there is one.
+
+        Args:
+            path (str): Path of the temporary file.
+        """
+        if os.path.exists(path):
+            os.remove(path)
+
+    ####################################################################################
+    def _store(self, video_id: str, info: TrackInfo, track_tmp: str) -> int:
+        """Write a downloaded track's sidecar and move both files into place. Runs
+        through run_blocking.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            info (TrackInfo): Track info.
+            track_tmp (str): Temporary path the track was downloaded to.
+
+        Raises:
+            OSError: Raised if a file could not be written or moved.
+
+        Returns:
+            int: Bytes used by the track and its sidecar.
+        """
+        sidecar_tmp = self._path(video_id, f"{os.getpid()}.json.tmp")
+        try:
+            with open(sidecar_tmp, mode="w", encoding="utf-8") as fp:
+                json.dump(info.to_dict(), fp)
+
+            os.replace(sidecar_tmp, self._path(video_id, "json"))
+            os.replace(track_tmp, self._path(video_id, "opus"))
+
+        finally:
+            for path in (track_tmp, sidecar_tmp):
+                self._remove_tmp(path)
+
+        return os.path.getsize(self._path(video_id, "opus")) + os.path.getsize(
+            self._path(video_id, "json")
+        )
+
+    ####################################################################################
+    def _tee_done(
+        self, video_id: str, info: TrackInfo, complete: bool, fallback: bool
+    ) -> None:
+        """Keep, download again or drop a teed track on the event loop.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            info (TrackInfo): Track info with the stream url.
+            complete (bool): True if the process wrote the whole track.
+            fallback (bool): True to download an incomplete track separately.
+        """
+        self._writing.pop(video_id, None)
+        if complete:
+            self._stats["teed"] += 1
+            self._track(video_id, self._keep(video_id, info, self._tmp(video_id)))
+
+        elif fallback:
+            # The download overwrites the partial file.
+            self.schedule(video_id, info)
+
+        else:
+            self._track(
+                video_id, self.run_blocking(self._remove_tmp, self._tmp(video_id))
+            )
+
+    ####################################################################################
+    def _tmp(self, video_id: str) -> str:
+        """Temporary path a track is written to before it is moved into place.
+
+        Args:
+            video_id (str): YouTube id of the video.
+
+        Returns:
+            str: Temporary path of the track.
+        """
+        return self._path(video_id, f"{os.getpid()}.opus.tmp")
+
+    ####################################################################################
+    def _track(self, video_id: str, coro: Awaitable) -> None:
+        """Run a write of a track in the background, keeping it marked as being written
+        until it is done.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            coro (Awaitable): The write.
+        """
+        task = asyncio.ensure_future(coro)
+        self._writing[video_id] = task
+        task.add_done_callback(lambda _: self._writing.pop(video_id, None))
+
+    ####################################################################################
+    async def _write(self, video_id: str, info: TrackInfo) -> None:
+        """Download and write a track as Ogg/Opus, for tracks whose playing process could
+        not write them.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            info (TrackInfo): Track info with the stream url.
+        """
+        track_tmp = self._tmp(video_id)
+        process = None
+        async with self._semaphore:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    "ffmpeg",
+                    "-nostdin",
+                    "-loglevel",
+                    "error",
+                    *("-reconnect", "1", "-reconnect_streamed", "1"),
+                    *("-reconnect_delay_max", "5"),
+                    *("-i", info.url, *self._output(info, track_tmp)),
+                    stdout=asyncio.subprocess.DEVNULL,
+                    stderr=asyncio.subprocess.PIPE,
+                )
+                _, stderr = await process.communicate()
+                if process.returncode != 0:
+                    await self.run_blocking(self._remove_tmp, track_tmp)
+                    raise OSError(stderr.decode(errors="replace").strip())
+
+            except (OSError, ValueError) as err:
+                self._stats["failures"] += 1
+                logger.warning(f"Unable to cache track {video_id}: {err}")
+                return
+
+            except asyncio.CancelledError:
+                if process is not None and process.returncode is None:
+                    process.kill()
+
+                raise
+
+        await self._keep(video_id, info, track_tmp)
+
+
+########################################################################################
+class StreamCache:
+    """LRU cache of resolved track info keyed by video id. Signed googlevideo
+    stream urls carry their expiry time, so an entry is only served while its url will
+    stay valid for the whole track plus a safety margin.
+    """
+
+    # Fallback lifetime for stream urls that carry no expire parameter.
+    DEFAULT_TTL = 3600.0
+
+    def __init__(self, max_entries: int = 256, margin: float = 60.0):
+        self.margin = margin
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()
+        self._stats = {"evictions": 0, "expired": 0, "hits": 0, "misses": 0}
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def stats(self) -> dict:
+        """Cache counters.
+
+        Returns:
+            dict: Hit, miss, expiry and eviction counters, plus the entry count.
+        """
+        return {**self._stats, "entries": len(self._entries)}
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def get(self, key: str) -> Union[TrackInfo, None]:
+        """Get the info for a video if its stream url is still usable.
+
+        Args:
+            key (str): Video id.
+
+        Returns:
+            Union[TrackInfo, None]: Cached track info, or None on a miss.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        expires, info = entry
+        if expires - time.time() < info.duration + self.margin:
+            del self._entries[key]
+            self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+
+        return info
+
+    ####################################################################################
+    def purge(self) -> int:
+        """Drop every entry whose stream url has expired.
+
+        Returns:
+            int: Number of entries dropped.
+        """
+        now = time.time()
+        expired = [key for key, (expires, _) in self._entries.items() if expires <= now]
+        for key in expired:
+            del self._entries[key]
+
+        self._stats["expired"] += len(expired)
+
+        return len(expired)
+
+    ####################################################################################
+    def put(self, key: str, info: TrackInfo) -> None:
+        """Cache the info for a video, evicting the least recently used entries.
+
+        Args:
+            key (str): Video id.
+            info (TrackInfo): Resolved track info.
+        """
+        self._entries[key] = (self.expiry(info.url), info)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    ####################################################################################
+    #                               Static Methods                                     #
+    ####################################################################################
+    @staticmethod
+    def expiry(url: str) -> float:
+        """Get the expiry time of a signed stream url. googlevideo urls carry it either
+        as an expire query parameter or as an /expire/<timestamp>/ path segment.
+
+        Args:
+            url (str): Stream url.
+
+        Returns:
+            float: Unix timestamp the url expires at.
+        """
+        parsed = urlparse(url)
+        expire = parse_qs(parsed.query).get("expire")
+        if expire and expire[0].isdigit():
+            return float(expire[0])
+
+        match = re.search(r"/expire/(\d+)", parsed.path)
+        if match:
+            return float(match.group(1))
+
+        return time.time() + StreamCache.DEFAULT_TTL
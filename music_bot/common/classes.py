@@ -5,22 +5,166 @@ import asyncio
 import functools
 import itertools
 import logging
+import os
 import random
+import threading
+import time
 from collections import OrderedDict
 from collections.abc import Mapping, MutableMapping
-from typing import Union
+from typing import Any, Awaitable, Callable, Hashable, Iterable, Union
 
 # Third party imports.
 import discord
-import youtube_dl
 from async_timeout import timeout
 from discord.ext import commands
 
+from music_bot.common.cache import StreamCache, TrackCache
 from music_bot.common.exceptions import CaseInsensitiveDictError, VoiceError, YTDLError
+from music_bot.common.extractor import ExtractorPool
+from music_bot.common.ffmpeg import FFmpegPool, FFmpegProcessAudio
+from music_bot.common.journal import QueueJournal
+from music_bot.common.loudness import LoudnessAnalyzer
+from music_bot.common.sortedlist import IndexedSortedList
+from music_bot.common.track import TrackInfo
+from music_bot.common.tracing import Span, tracer
 from music_bot.common.utils import pretty_dict
 
 
-class YTDLSource(discord.PCMVolumeTransformer):
+class SingleFlight:
+    """Coalesces concurrent identical requests. Callers asking for a key that is already
+    in flight await the same future instead of starting the work again, and all of them
+    get the same result or exception. Keys are forgotten as soon as the work finishes,
+    so this never serves stale results.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def claim(self, key: Hashable) -> asyncio.Future:
+        """Mark a key as in flight for work the caller drives itself, such as a stream.
+        The caller must resolve the returned future once the work is finished.
+
+        Args:
+            key (Hashable): Request key.
+
+        Returns:
+            asyncio.Future: Future other callers of the key will wait on.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._register(key, future)
+
+        return future
+
+    ####################################################################################
+    async def do(self, key: Hashable, factory: Callable[[], Awaitable]) -> Any:
+        """Await the result for a key, starting the work only if it is not in flight.
+
+        Args:
+            key (Hashable): Request key.
+            factory (Callable[[], Awaitable]): Starts the work for the key.
+
+        Returns:
+            Any: Result of the work.
+        """
+        future = self._calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._register(key, future)
+
+        # Shield the shared work so one cancelled caller does not cancel the others.
+        return await asyncio.shield(future)
+
+    ####################################################################################
+    async def do_many(
+        self, keys: Iterable[Hashable], factory: Callable[[list], Awaitable[dict]]
+    ) -> dict:
+        """Await the results for many keys. Keys already in flight are shared, the rest
+        are handed to a single call of the factory.
+
+        Args:
+            keys (Iterable[Hashable]): Request keys.
+            factory (Callable[[list], Awaitable[dict]]): Starts the work for a list of
+                keys, returning a dict of key -> result. Missing keys resolve to None.
+
+        Returns:
+            dict: Key -> result for every requested key.
+        """
+        keys = list(dict.fromkeys(keys))
+        missing = [key for key in keys if key not in self._calls]
+        if missing:
+            batch = asyncio.ensure_future(factory(missing))
+            for key in missing:
+                self._register(key, asyncio.ensure_future(self._pick(batch, key)))
+
+        futures = {key: self._calls[key] for key in keys}
+
+        return {key: await asyncio.shield(future) for key, future in futures.items()}
+
+    ####################################################################################
+    def get(self, key: Hashable) -> Union[asyncio.Future, None]:
+        """Get the in-flight future for a key.
+
+        Args:
+            key (Hashable): Request key.
+
+        Returns:
+            Union[asyncio.Future, None]: The in-flight future, or None.
+        """
+        return self._calls.get(key)
+
+    ####################################################################################
+    @staticmethod
+    async def _pick(batch: asyncio.Future, key: Hashable) -> Any:
+        """Pull a single key's result out of a batch.
+
+        Args:
+            batch (asyncio.Future): Future resolving to a dict of key -> result.
+            key (Hashable): Request key.
+
+        Returns:
+            Any: The key's result, or None if the batch did not return it.
+        """
+        return (await batch).get(key)
+
+    ####################################################################################
+    def _register(self, key: Hashable, future: asyncio.Future) -> None:
+        """Track an in-flight future until it is done.
+
+        Args:
+            key (Hashable): Request key.
+            future (asyncio.Future): The in-flight future.
+        """
+
+        def _done(done: asyncio.Future) -> None:
+            if self._calls.get(key) is done:
+                del self._calls[key]
+
+            # Mark the exception as retrieved in case every waiter was cancelled.
+            if not done.cancelled():
+                done.exception()
+
+        self._calls[key] = future
+        future.add_done_callback(_done)
+
+
+########################################################################################
+class YTDLSource(discord.AudioSource):
+    """Audio source for a resolved video. Opus streams are played in passthrough mode:
+    at unity gain FFmpeg copies the packets straight to Discord, otherwise it applies
+    the volume filter and encodes natively, so no audio is processed frame by frame in
+    Python. Other codecs are decoded to PCM and scaled by a GainTransformer. The first
+    FFmpeg process of a streamed track also writes it to the track cache.
+    """
+
     FFMPEG_OPTIONS = {
         "before_options": "-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5",
         "options": "-vn",
@@ -42,46 +186,64 @@ class YTDLSource(discord.PCMVolumeTransformer):
         "source_address": "0.0.0.0",
     }
 
-    ytdl = youtube_dl.YoutubeDL(YTDL_OPTIONS)
+    # Extraction runs in worker processes that each own a YoutubeDL instance.
+    extractor = ExtractorPool(YTDL_OPTIONS)
+
+    # Extractions in flight keyed by video id, shared between concurrent identical
+    # requests, and the resolved results kept until their stream urls expire.
+    extractions = SingleFlight()
+    streams = StreamCache()
+
+    # Highest level, volume times loudness gain, a track is played at.
+    MAX_LEVEL = 2.0
+
+    # Seconds an FFmpeg process gets to finish writing the track cache copy once its
+    # last packet has been read.
+    TEE_TIMEOUT = 5.0
+
+    # Pre-spawned FFmpeg processes, the on-disk cache of played tracks and per-track
+    # loudness gains, all disabled unless configured.
+    ffmpeg_pool: Union[FFmpegPool, None] = None
+    loudness: Union[LoudnessAnalyzer, None] = None
+    tracks: Union[TrackCache, None] = None
 
     def __init__(
         self,
         ctx: commands.Context,
-        source: discord.FFmpegPCMAudio,
         *,
-        data: dict,
-        volume: float = 0.5,
+        info: TrackInfo,
+        volume: float = 1.0,
+        gain: float = 1.0,
+        position: float = 0.0,
     ):
-        super().__init__(source, volume)
-
         self.channel = ctx.channel
-        self.data = data
+        self.info = info
+        self.passthrough = info.acodec == "opus"
         self.requester = ctx.author
 
-        # Validate and set class members.
-        for field in (
-            "data",
-            "description",
-            "dislikes",
-            "duration",
-            "likes",
-            "tags",
-            "thumbnail",
-            "title",
-            "upload_date",
-            "uploader",
-            "uploader_url",
-            "url",
-            "webpage_url",
-        ):
-            value = data.get(field)
-            if value is None:
-                raise YTDLError(f"Unable to get field {field} from YTDL.")
-
-            setattr(self, field, value)
+        # When playback of the source was asked for, to time its first packet, and the
+        # span that ends with that packet.
+        self.requested_at = time.perf_counter()
+        self.trace = None
+
+        # Frames read since the FFmpeg process started, and where in the track it
+        # started. The lock keeps the audio thread off a process being swapped out.
+        # Only the first process of the track counts towards the FFmpeg pool stats,
+        # not the ones restarted by seeks and volume changes, and only a first process
+        # started at the beginning of the track writes it to the track cache.
+        self._ended = False
+        self._frames = 0
+        self._gain = gain
+        self._lock = threading.Lock()
+        self._offset = position
+        self._pooled = False
+        self._recorded = False
+        self._teed = None
+        self._volume = max(volume, 0.0)
+        self._source = self._spawn(position, tee=not position)
 
     def __str__(self):
-        return f"**{self.title}** by **{self.uploader}**"
+        return f"**{self.info.title}** by **{self.info.uploader}**"
 
     ####################################################################################
     #                                  Properties                                      #
@@ -101,45 +263,62 @@ class YTDLSource(discord.PCMVolumeTransformer):
 
     ####################################################################################
     @property
-    def data(self) -> dict:
-        """Metadata dictionary pulled from YouTube.
+    def gain(self) -> float:
+        """Static loudness gain of the track, applied on top of the volume.
 
         Returns:
-            dict: Metadata dictionary pulled from YouTube.
+            float: Linear loudness gain.
         """
-        return self.__data
-
-    @data.setter
-    def data(self, data: dict):
-        self.__data = data
+        return self._gain
 
     ####################################################################################
     @property
-    def description(self) -> str:
-        """Description of the video.
+    def info(self) -> TrackInfo:
+        """Metadata of the video.
 
         Returns:
-            str: Description of the video.
+            TrackInfo: Metadata of the video.
         """
-        return self.__description
+        return self.__info
+
+    @info.setter
+    def info(self, info: TrackInfo):
+        self.__info = info
 
-    @description.setter
-    def description(self, description: str):
-        self.__description = description
+    ####################################################################################
+    @property
+    def level(self) -> float:
+        """Level the track is played at, the volume times the loudness gain, capped at
+        MAX_LEVEL. Both the FFmpeg volume filter and the PCM gain stage are given this.
+
+        Returns:
+            float: Linear playback level.
+        """
+        return min(self.volume * self.gain, self.MAX_LEVEL)
 
     ####################################################################################
     @property
-    def duration(self) -> str:
-        """Length of the video.
+    def passthrough(self) -> bool:
+        """Check if the source is played as Opus without a Python-side encode.
 
         Returns:
-            str: Length of the video.
+            bool: True if FFmpeg produces the Opus packets, else False.
         """
-        return self.__duration
+        return self.__passthrough
+
+    @passthrough.setter
+    def passthrough(self, passthrough: bool):
+        self.__passthrough = passthrough
+
+    ####################################################################################
+    @property
+    def position(self) -> float:
+        """Playback position, in seconds from the start of the track.
 
-    @duration.setter
-    def duration(self, duration: int):
-        self.__duration = self.parse_duration(duration)
+        Returns:
+            float: Playback position.
+        """
+        return self._offset + self._frames * discord.opus.Encoder.FRAME_LENGTH / 1000
 
     ####################################################################################
     @property
@@ -157,174 +336,329 @@ class YTDLSource(discord.PCMVolumeTransformer):
 
     ####################################################################################
     @property
-    def tags(self) -> list:
-        """Metadata tags for the video.
+    def volume(self) -> float:
+        """Playback volume, 1.0 being the original level.
 
         Returns:
-            list: "Metadata tags for the video.
+            float: Playback volume.
         """
-        return self.__tags
+        return self._volume
 
-    @tags.setter
-    def tags(self, tags: list):
-        self.__tags = tags
+    @volume.setter
+    def volume(self, volume: float):
+        volume = max(volume, 0.0)
+        if volume == self._volume:
+            return
+
+        self._volume = volume
+        if not self.passthrough:
+            self._source.volume = self.level  # type: ignore
+            return
+
+        # FFmpeg applies the gain in passthrough mode, so restart it where it is.
+        self.seek(self.position)
 
     ####################################################################################
-    @property
-    def thumbnail(self) -> str:
-        """Url of the video thumbnail.
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def cleanup(self) -> None:
+        """Kill the FFmpeg process. A process that has played the whole track first gets
+        to finish writing it to the track cache.
+        """
+        self._end_tee(restarted=False)
+        self._source.cleanup()
+
+    ####################################################################################
+    def is_opus(self) -> bool:
+        """Check if read returns Opus packets rather than PCM frames.
 
         Returns:
-            str: Url of the video thumbnail.
+            bool: True in passthrough mode, else False.
         """
-        return self.__thumbnail
-
-    @thumbnail.setter
-    def thumbnail(self, thumbnail: str):
-        self.__thumbnail = thumbnail
+        return self.passthrough
 
     ####################################################################################
-    @property
-    def title(self) -> str:
-        """Title of the video.
+    def read(self) -> bytes:
+        """Read the next 20ms of audio. Called by the voice client's audio thread.
 
         Returns:
-            str: Title of the video.
+            bytes: An Opus packet in passthrough mode, else a PCM frame. Empty once the
+                track has ended.
         """
-        return self.__title
+        with self._lock:
+            data = self._source.read()
+            if not data:
+                self._ended = True
 
-    @title.setter
-    def title(self, title: str):
-        self.__title = title
+        if data:
+            if not self._frames:
+                waited = time.perf_counter() - self.requested_at
+                if self.ffmpeg_pool is not None and not self._recorded:
+                    self.ffmpeg_pool.record(self._pooled, waited)
+
+                self._recorded = True
+
+                if self.trace is not None:
+                    tracer.record(
+                        "first_packet",
+                        time.time_ns() - int(waited * 1e9),
+                        parent=self.trace,
+                        pooled=self._pooled,
+                    )
+                    tracer.end_span(self.trace)
+                    self.trace = None
+
+            self._frames += 1
+
+        return data
 
     ####################################################################################
-    @property
-    def uploader(self) -> str:
-        """Uploader of the video.
+    def seek(self, position: float) -> None:
+        """Restart FFmpeg at a position. The position is passed as an input option, so
+        FFmpeg seeks the stream without downloading or decoding the skipped part.
 
-        Returns:
-            str: Uploader of the video.
+        Args:
+            position (float): Seconds into the track.
         """
-        return self.__uploader
-
-    @uploader.setter
-    def uploader(self, uploader: str):
-        self.__uploader = uploader
+        position = max(position, 0.0)
+        requested_at = time.perf_counter()
+        source = self._spawn(position)
+        with self._lock:
+            previous, self._source = self._source, source
+            self._ended = False
+            self._frames = 0
+            self._offset = position
+            self.requested_at = requested_at
+
+        previous.cleanup()
+        self._end_tee(restarted=True)
 
     ####################################################################################
-    @property
-    def upload_date(self) -> str:
-        """Upload date of the video.
+    def _end_tee(self, restarted: bool) -> None:
+        """Hand the track cache copy written by the first FFmpeg process back to the
+        track cache once that process is done with it. It is kept if the process played
+        the whole track, and downloaded separately instead if the process was restarted
+        or its stream failed.
 
-        Returns:
-            str: Upload date of the video.
+        Args:
+            restarted (bool): True if the process is being replaced by a seek.
         """
-        return self.__upload_date
+        with self._lock:
+            teed, self._teed = self._teed, None
+            ended = self._ended
+
+        if teed is None:
+            return
 
-    @upload_date.setter
-    def upload_date(self, upload_date: str):
-        self.__upload_date = (
-            upload_date[6:8] + "." + upload_date[4:6] + "." + upload_date[0:4]
+        complete = ended and teed.wait(self.TEE_TIMEOUT) == 0
+        teed.cleanup()
+        self.tracks.tee_done(  # type: ignore
+            self.info.video_id, self.info, complete, restarted or ended
         )
 
     ####################################################################################
-    @property
-    def uploader_url(self) -> str:
-        """Url of the channel of the uploader of the video.
+    def _spawn(self, position: float, tee: bool = False) -> discord.AudioSource:
+        """Start an FFmpeg process for the track.
+
+        Args:
+            position (float): Seconds into the track to start from.
+            tee (bool, optional): True to also write the track to the track cache, for
+                the first process of the track. Defaults to False.
 
         Returns:
-            str: Url of the channel of the uploader of the video.
+            discord.AudioSource: The FFmpeg audio source.
         """
-        return self.__uploader_url
+        level = self.level
+        self._pooled = False
+        output = self._tee() if tee else []
+
+        # Pooled processes are spawned before their input is known, so they can not
+        # write the track. Saving its download is worth more than the process start up.
+        if not output:
+            source = self._spawn_pooled(position, level)
+            if source is not None:
+                return source
+
+        args = ["-ss", f"{position:.3f}"] if position else []
+        if self.info.url.startswith(("http://", "https://")):
+            args.extend(self.FFMPEG_OPTIONS["before_options"].split())
+
+        args.extend(("-i", self.info.url, *self.FFMPEG_OPTIONS["options"].split()))
+        if self.passthrough:
+            # FFmpeg stream copies at unity level.
+            codec = "copy" if level == 1.0 else "libopus"
+            args.extend(("-map_metadata", "-1", "-f", "opus", "-c:a", codec))
+            args.extend(("-ar", "48000", "-ac", "2", "-b:a", "128k"))
+            if level != 1.0:
+                args.extend(("-af", f"volume={level:.3f}"))
 
-    @uploader_url.setter
-    def uploader_url(self, uploader_url: str):
-        self.__uploader_url = uploader_url
+        else:
+            args.extend(("-f", "s16le", "-ar", "48000", "-ac", "2"))
 
-    ####################################################################################
-    @property
-    def url(self) -> str:
-        """Streaming url of the video.
+        try:
+            source = FFmpegProcessAudio(
+                [*args, "-loglevel", "warning", "pipe:1", *output],
+                opus=self.passthrough,
+            )
 
-        Returns:
-            str: Streaming url of the video.
-        """
-        return self.__url
+        except discord.ClientException:
+            if output:
+                self.tracks.tee_done(  # type: ignore
+                    self.info.video_id, self.info, False, False
+                )
 
-    @url.setter
-    def url(self, url: str):
-        self.__url = url
+            raise
+
+        if output:
+            self._teed = source
+
+        if self.passthrough:
+            return source
+
+        # NumPy is only needed once a PCM track plays, so it is not imported at start
+        # up.
+        from music_bot.common.gain import (  # pylint: disable=import-outside-toplevel
+            GainTransformer,
+        )
+
+        return GainTransformer(source, level)
 
     ####################################################################################
-    @property
-    def views(self) -> int:
-        """View count for the video.
+    def _spawn_pooled(
+        self, position: float, level: float
+    ) -> Union[discord.AudioSource, None]:
+        """Start the track on a pre-spawned FFmpeg process. Passthrough sources are only
+        pooled at unity level, where FFmpeg stream copies, and remote inputs only when
+        FFmpeg accepts the reconnect options in its concat script.
+
+        Args:
+            position (float): Seconds into the track to start from.
+            level (float): Volume times loudness gain.
 
         Returns:
-            int: View count for the video.
+            Union[discord.AudioSource, None]: The audio source, or None if no pooled
+                process could be used.
         """
-        return self.__views
+        remote = self.info.url.startswith(("http://", "https://"))
+        if (
+            self.ffmpeg_pool is None
+            or (self.passthrough and level != 1.0)
+            or (remote and not self.ffmpeg_pool.options_supported)
+        ):
+            return None
+
+        source = self.ffmpeg_pool.acquire("opus" if self.passthrough else "pcm")
+        if source is None:
+            return None
+
+        options = self.FFMPEG_OPTIONS["before_options"].split()
+        source.start(
+            self.info.url,
+            position,
+            (
+                tuple(zip((key.lstrip("-") for key in options[::2]), options[1::2]))
+                if remote
+                else ()
+            ),
+        )
+        self._pooled = True
+        if self.passthrough:
+            return source
+
+        from music_bot.common.gain import (  # pylint: disable=import-outside-toplevel
+            GainTransformer,
+        )
 
-    @views.setter
-    def views(self, views: int):
-        self.__views = views
+        return GainTransformer(source, level)
 
     ####################################################################################
-    @property
-    def webpage_url(self) -> str:
-        """Url of the video.
+    def _tee(self) -> list:
+        """Reserve the track to be written to the track cache by the FFmpeg process
+        about to play it.
 
         Returns:
-            str: Url of the video.
+            list: FFmpeg output options writing the track, empty if it is not written.
         """
-        return self.__webpage_url
+        if self.tracks is None or not self.info.video_id:
+            return []
 
-    @webpage_url.setter
-    def webpage_url(self, webpage_url: str):
-        self.__webpage_url = webpage_url
+        return self.tracks.tee(self.info.video_id, self.info) or []
 
     ####################################################################################
     #                                Class Methods                                     #
-    ####################################################################################
-    @classmethod
-    async def test(cls):
-        # TODO: remove
-        loop = asyncio.get_event_loop()
-
-        partial = functools.partial(
-            cls.ytdl.extract_info,
-            "https://youtu.be/CdqoNKCCt7A",
-            download=False
-            #     cls.ytdl.extract_info,
-            #     "https://www.youtube.com/playlist?list=PLKZOur5nlyjjzyhlzHkHYaIsOP9lpD6LA",
-            #     download=False,
-        )
-        processed_info = await loop.run_in_executor(None, partial)
-
-        import pprint
-
-        pprint.pprint(processed_info)
-
     ####################################################################################
     @classmethod
     async def create_source(
         cls,
         ctx: commands.Context,
         url: str,
-        loop: Union[asyncio.AbstractEventLoop, None] = None,
+        video_id: str = "",
+        volume: float = 1.0,
+        position: float = 0.0,
     ) -> YTDLSource:
-        if loop is None:
-            loop = asyncio.get_event_loop()
+        """Create an audio source for a video, at the loudness gain measured for it if
+        it has been analysed.
+
+        Args:
+            ctx (commands.Context): The command context.
+            url (str): Url of the video.
+            video_id (str, optional): YouTube id of the video, used as the stream and
+                track cache key. Defaults to "".
+            volume (float, optional): Playback volume. Defaults to 1.0.
+            position (float, optional): Seconds into the video to start from. Defaults
+                to 0.0.
+
+        Returns:
+            YTDLSource: The audio source.
+        """
+        gain = await cls.loudness.gain(video_id) if cls.loudness and video_id else 1.0
+        cached = await cls.tracks.get(video_id) if cls.tracks and video_id else None
+        if cached is not None:
+            path, info = cached
+
+            # Cached tracks are always stored as Opus.
+            info = info.replace(acodec="opus", url=path)
+
+        else:
+            info = await cls.extract_info(url, video_id=video_id)
+
+        with tracer.span("spawn", track_cache=cached is not None):
+            return cls(ctx, info=info, volume=volume, gain=gain, position=position)
 
-        partial = functools.partial(cls.ytdl.extract_info, url, download=False)
-        info = await loop.run_in_executor(None, partial)
+    ####################################################################################
+    @classmethod
+    async def extract_info(cls, url: str, video_id: str = "") -> TrackInfo:
+        """Resolve the info for a video. Results are served from the stream cache while
+        the signed stream url is still valid, so replays skip extraction entirely.
+        Misses are extracted on the extractor process pool.
+
+        Args:
+            url (str): Url of the video.
+            video_id (str, optional): YouTube id of the video. Defaults to "".
+
+        Raises:
+            YTDLError: Raised if the video could not be resolved.
+
+        Returns:
+            TrackInfo: The track info.
+        """
+        key = video_id or url
+        with tracer.span("extract", video_id=video_id) as span:
+            info = cls.streams.get(key)
+            span.attributes["stream_cache"] = info is not None
+            if info is not None:
+                return info
+
+            info = await cls.extractions.do(
+                key, functools.partial(cls.extractor.extract, url)
+            )
 
         if info is None:
             raise YTDLError(f"Couldn't fetch url {url}.")
 
-        return cls(
-            ctx, discord.FFmpegPCMAudio(info["url"], **cls.FFMPEG_OPTIONS), data=info
-        )
+        cls.streams.put(key, info)
+
+        return info
 
     ####################################################################################
     #                               Static Methods                                     #
@@ -367,10 +701,34 @@ class AudioState:
         self.current = None
         self.loop = asyncio.get_event_loop()
         self.next = asyncio.Event()
-        self.queue = SongQueue()
+        self.queue = SongQueue(
+            on_change=self.schedule_prefetch, journal=self.open_journal(bot, ctx)
+        )
         self.voice = None
 
-        self._volume = 0.5
+        self._volume = bot.config.get("default_volume", 1.0)  # type: ignore
+
+        # Lookahead prefetch of the next songs in the queue, keyed by Song.
+        self._prefetch_depth = bot.config.get("prefetch_depth", 2)  # type: ignore
+        self._prefetch_ffmpeg = bot.config.get("prefetch_ffmpeg", False)  # type: ignore
+        self._prefetches = {}
+
+        # The playing song's position is saved every resume_interval seconds. A song
+        # that ends early without a skip or stop is resumed where it stopped.
+        self._resume_attempts = 0
+        self._resume_interval = bot.config.get("resume_interval", 5.0)  # type: ignore
+        self._skipped = False
+
+        # Bring back the queue of the previous run. The song it was playing plays
+        # first, from its resume point.
+        interrupted = self.queue.restore()
+        if self.queue.qsize():
+            bot.logger.info(  # type: ignore
+                f"Restored {self.queue.qsize()} queued songs in {ctx.guild}."
+            )
+
+        if interrupted is not None:
+            bot.logger.info(f"Resuming {interrupted.title} on play.")  # type: ignore
 
     def __del__(self):
         if self.audio_player is not None:
@@ -437,6 +795,23 @@ class AudioState:
     def current(self, current: Union[Song, None]):
         self._current = current
 
+    ####################################################################################
+    @property
+    def is_idle(self) -> bool:
+        """Check if the guild has nothing playing, paused or queued.
+
+        Returns:
+            bool: True if the player is stopped and the queue is empty, else False.
+        """
+        if self.queue.qsize() or (
+            self.audio_player is not None and not self.audio_player.done()
+        ):
+            return False
+
+        return self.voice is None or not (
+            self.voice.is_playing() or self.voice.is_paused()
+        )
+
     ###################################################################################
     @property
     def is_playing(self) -> bool:
@@ -464,6 +839,19 @@ class AudioState:
     def loop(self, value: asyncio.AbstractEventLoop):
         self._loop = value
 
+    ####################################################################################
+    @property
+    def position(self) -> float:
+        """Playback position of the current song.
+
+        Returns:
+            float: Seconds into the current song, 0.0 if nothing is playing.
+        """
+        if self.current is None or self.current.source is None:
+            return 0.0
+
+        return self.current.source.position
+
     ####################################################################################
     @property
     def queue(self) -> SongQueue:
@@ -494,30 +882,34 @@ class AudioState:
 
     ####################################################################################
     @property
-    def volume(self):
+    def volume(self) -> float:
+        """Playback volume for the guild, 1.0 being the original level. Changes apply
+        to the song currently playing and to every song after it.
+
+        Returns:
+            float: Playback volume.
+        """
         return self._volume
 
     @volume.setter
     def volume(self, volume: float):
-        self._volume = volume
+        self._volume = min(max(volume, 0.0), 2.0)
+        if self.current is not None and self.current.source is not None:
+            self.current.source.volume = self._volume
 
     ####################################################################################
     #                               Instance Methods                                   #
     ####################################################################################
     async def audio_player_task(self):
-        print("before loop")
         while True:
             self.next.clear()
 
-            print("checking queue")
-            print(self.queue.empty())
             # Make sure the queue is not empty.
             if self.queue.empty():
                 self.bot.loop.create_task(self.stop())
 
                 return
 
-            print("queue not empty, checking loop")
             # if not self.loop:
             #     # Try to get the next song within 3 minutes. If no song will be added to
             #     # the queue in time, the player will disconnect due to performance
@@ -532,18 +924,29 @@ class AudioState:
             #         self.bot.loop.create_task(self.stop())
 
             #         return
-            self.current = await self.queue.get()
-            print(self.current)
+            song = await self.queue.get()
             self.queue.task_done()
-            print("loop is good, checking current song")
-            print(self.current)
             # Make sure we have a song ready to play.
-            if self.current is None:
+            if song is None:
                 self.bot.loop.create_task(self.stop())
 
                 return
 
-            print("current song okay")
+            # Take over the song's prefetch, if any, and start prefetching the songs
+            # that moved into the lookahead window.
+            prefetch = self._prefetches.pop(song, None)
+
+            # The play span joins the trace of the command that queued the song and
+            # ends with the song's first voice packet.
+            tracer.record("queued", song.queued_at, parent=song.trace)
+            trace = tracer.start_span(
+                "play", parent=song.trace, guild=self.ctx.guild.id  # type: ignore
+            )
+            self.current = song
+            self.schedule_prefetch()
+            self._resume_attempts = 0
+            self._skipped = False
+
             # Try and create a download source for the song.
             # async with self.ctx.typing():
             #     try:
@@ -556,75 +959,537 @@ class AudioState:
             #         )
             #     else:
             #         self.current.source = source
-            self.current.source = await YTDLSource.create_source(
-                self.ctx, self.current.url, loop=self.bot.loop
-            )
-
-            # self.current.source.volume = self._volume
-            print("made it here")
-            import pprint
+            # A song that can't be resolved is reported and skipped, the rest of the
+            # queue still plays.
+            try:
+                with tracer.use(trace):
+                    await self.prepare_source(prefetch)
+
+            except asyncio.CancelledError as err:
+                tracer.end_span(trace, error=repr(err))
+                raise
+
+            except Exception as err:
+                tracer.end_span(trace, error=repr(err))
+                await self.skip_failed(song, err)
+                continue
+
+            # Prefetched sources were spawned before any later volume change.
+            self.current.source.trace = trace
+            self.current.source.volume = self.volume
+
+            # first_packet times the voice client alone, resolving the source is
+            # already covered by the play span.
+            self.current.source.requested_at = time.perf_counter()
+            self.voice.play(self.current.source, after=self.play_next_song)  # type: ignore
+
+            # Keep a copy of the track on disk so later plays skip the network. This is
+            # a no-op for tracks written by the process playing them.
+            if YTDLSource.tracks is not None:
+                YTDLSource.tracks.schedule(
+                    self.current.video_id, self.current.source.info
+                )
+
+            # Measure the track's loudness for the next time it is played. With the
+            # track cache on, a track is measured from its cached copy once written,
+            # so only tracks already played from disk are scheduled here.
+            if YTDLSource.loudness is not None and (
+                YTDLSource.tracks is None
+                or not self.current.source.info.url.startswith(("http://", "https://"))
+            ):
+                await YTDLSource.loudness.schedule(
+                    self.current.video_id, self.current.source.info.url
+                )
 
-            pprint.pprint(self.voice)
-            self.voice.play(self.current.source, after=self.play_next_song())  # type: ignore
-            print("Now I'm here")
             await self.current.source.channel.send(embed=self.current.create_embed())
 
-            # Await the next Event.
-            await self.next.wait()
+            # Wait for the song to end, resuming it if it was cut off.
+            await self.wait_for_song()
+            while await self.resume_interrupted():
+                await self.wait_for_song()
+
+            await self.clear_resume_point()
+            self.queue.played()
+
+    ####################################################################################
+    def cancel_prefetch(self, song: Song) -> None:
+        """Cancel a song's prefetch and release anything it already resolved.
+
+        Args:
+            song (Song): The song.
+        """
+        prefetch = self._prefetches.pop(song, None)
+        if prefetch is not None:
+            prefetch.cancel()
+
+        if song.source is not None:
+            song.source.cleanup()
+            song.source = None
+
+    ####################################################################################
+    async def clear_resume_point(self) -> None:
+        """Drop the guild's resume point once its song is done."""
+        await self.bot.run_blocking(  # type: ignore
+            self.bot.resume_points.clear, self.ctx.guild.id  # type: ignore
+        )
+
+    ####################################################################################
+    async def load_resume_point(self, song: Song) -> float:
+        """Get the position to start a song at. The saved resume point only applies if
+        it belongs to the song, and its info seeds the stream cache so a stream url
+        that is still valid is reused instead of extracting the song again.
+
+        Args:
+            song (Song): The song about to play.
+
+        Returns:
+            float: Seconds into the song to start at.
+        """
+        point = await self.bot.run_blocking(  # type: ignore
+            self.bot.resume_points.get, self.ctx.guild.id  # type: ignore
+        )
+        if point is None or point["video_id"] != song.video_id:
+            return 0.0
+
+        info = TrackInfo.from_dict(point["info"])
+        if info.url.startswith(("http://", "https://")):
+            if YTDLSource.streams.get(song.video_id) is None:
+                YTDLSource.streams.put(song.video_id, info)
+
+        return point["position"]
+
+    ####################################################################################
+    @staticmethod
+    def open_journal(
+        bot: commands.Bot, ctx: commands.Context
+    ) -> Union[QueueJournal, None]:
+        """Open the queue journal of the context's guild.
+
+        Args:
+            bot (commands.Bot): Discord client, for the queue_journal_* config.
+            ctx (commands.Context): The command context.
+
+        Returns:
+            Union[QueueJournal, None]: The journal, or None if queue_journal_dir is
+                empty.
+        """
+        directory = bot.config.get("queue_journal_dir", "./cache/queues")  # type: ignore
+        if not directory or ctx.guild is None:
+            return None
+
+        return QueueJournal(
+            os.path.join(directory, f"{ctx.guild.id}.jsonl"),
+            compact_every=bot.config.get("queue_journal_compact", 1000),  # type: ignore
+        )
 
     ####################################################################################
     def play(self):
-        if self.audio_player is None:
+        if self.audio_player is None or self.audio_player.done():
             self.audio_player = self.bot.loop.create_task(self.audio_player_task())
 
+            # Spawn FFmpeg processes while the first song is being resolved.
+            if YTDLSource.ffmpeg_pool is not None:
+                for kind in YTDLSource.ffmpeg_pool.KINDS:
+                    YTDLSource.ffmpeg_pool.fill(kind)
+
     ####################################################################################
     def play_next_song(self, error=None) -> None:
-        """_summary_
+        """Signal the player task to move to the next song. Called by the voice client
+        from its audio thread once the current song has finished.
 
         Args:
-            error (_type_, optional): _description_. Defaults to None.
+            error (Exception, optional): Error raised while playing. Defaults to None.
 
         Raises:
-            VoiceError: _description_
+            VoiceError: Raised if the song stopped because of an error.
         """
+        self.loop.call_soon_threadsafe(self.next.set)
+
         if error:
             raise VoiceError(str(error))
 
-        self.next.set()
-
     ####################################################################################
-    def skip(self) -> None:
-        """Skip the currently playing song (if one is playing)."""
-        if self.is_playing and self.voice is not None:
-            self.voice.stop()
+    async def prepare_source(self, prefetch: Union[asyncio.Task, None]) -> None:
+        """Resolve the current song's source, at its resume point if it has one.
+
+        Args:
+            prefetch (Union[asyncio.Task, None]): The song's prefetch, if any.
+        """
+        if prefetch is not None:
+            with tracer.span("prefetch_wait"):
+                await prefetch
+
+        # Continue a song that was interrupted by a restart where it stopped.
+        position = await self.load_resume_point(self.current)  # type: ignore
+        if self.current.source is None:  # type: ignore
+            self.current.source = await YTDLSource.create_source(  # type: ignore
+                self.ctx,
+                self.current.url,  # type: ignore
+                video_id=self.current.video_id,  # type: ignore
+                volume=self.volume,
+                position=position,
+            )
+
+        elif position:
+            self.current.source.seek(position)  # type: ignore
 
     ####################################################################################
-    async def stop(self):
-        print("CLEAARING THE CUNBHELIJGBHNLEKSJHGBNELKH")
-        self.queue.clear()
+    async def prefetch(self, song: Song) -> None:
+        """Resolve a song ahead of time. The stream info lands in the stream cache, and
+        with prefetch_ffmpeg enabled the FFmpeg source is spawned as well. Songs already
+        in the track cache need no prefetch.
 
-        if self.voice:
-            await self.voice.disconnect()
-            self.voice = None
+        Args:
+            song (Song): The song.
+        """
+        if YTDLSource.tracks and song.video_id in YTDLSource.tracks:
+            return
 
+        try:
+            with tracer.span("prefetch", parent=song.trace):
+                if self._prefetch_ffmpeg:
+                    song.source = await YTDLSource.create_source(
+                        self.ctx, song.url, video_id=song.video_id, volume=self.volume
+                    )
 
-########################################################################################
-class CaseInsensitiveDict(MutableMapping):
-    """This class was liberally borrowed and expanded upon the requests library:
-    https://github.com/psf/requests/blob/main/requests/structures.py
+                else:
+                    await YTDLSource.extract_info(song.url, video_id=song.video_id)
 
-    A case-insensitive dict-like object.  Implements all methods and operations of
-    MutableMapping as well as dict's copy. Also provides lower_items.  All keys are
-    expected to be strings. The structure remembers the case of the last key to be set,
-    and iter(instance), keys(), items(), iterkeys(), and iteritems() will contain
-    case-sensitive keys. However, querying and contains testing is case insensitive:
+        except Exception as err:
+            # The player resolves the song again when it gets to it, and reports the
+            # error and skips the song if that fails too.
+            self.bot.logger.debug(f"Prefetch of {song.title} failed: {err}")  # type: ignore
 
-        cid = CaseInsensitiveDict()
-        cid['Accept'] = 'application/json'
-        cid['aCCEPT'] == 'application/json'  # True
-        list(cid) == ['Accept']  # True
+    ####################################################################################
+    def reclaim(self) -> dict:
+        """Release what the guild holds but no longer uses: a player task that has
+        ended, prefetches of songs that left the queue, and the finished song's source
+        once the guild is idle.
 
-    For example, headers['content-encoding'] will return the value of a Content-Encoding
+        Returns:
+            dict: Number of tasks and sources released.
+        """
+        reclaimed = {"sources": 0, "tasks": 0}
+        if self.audio_player is not None and self.audio_player.done():
+            if not self.audio_player.cancelled() and self.audio_player.exception():
+                self.bot.logger.warning(  # type: ignore
+                    f"Player task failed: {self.audio_player.exception()}"
+                )
+
+            self.audio_player = None
+            reclaimed["tasks"] += 1
+
+        prefetches = len(self._prefetches)
+        self.schedule_prefetch()
+        reclaimed["tasks"] += max(prefetches - len(self._prefetches), 0)
+
+        if self.is_idle and self.current is not None:
+            if self.current.source is not None:
+                self.current.source.cleanup()
+                self.current.source = None
+                reclaimed["sources"] += 1
+
+            self.current = None
+
+        return reclaimed
+
+    ####################################################################################
+    async def resume_interrupted(self) -> bool:
+        """Restart the current song where it stopped if it ended early without being
+        skipped or stopped, e.g. after a voice drop or a stream failure. The voice
+        client gets up to 30 seconds to reconnect.
+
+        Returns:
+            bool: True if the song was resumed, else False.
+        """
+        source = self.current.source if self.current is not None else None
+        if (
+            source is None
+            or self._skipped
+            or self._resume_attempts >= 3
+            or source.position >= source.info.duration - 1
+        ):
+            return False
+
+        for _ in range(30):
+            if self.voice is not None and self.voice.is_connected():
+                break
+
+            await asyncio.sleep(1)
+
+        else:
+            return False
+
+        self._resume_attempts += 1
+        self.bot.logger.info(  # type: ignore
+            f"Resuming {self.current.title} at {source.position:.0f}s."  # type: ignore
+        )
+        self.next.clear()
+        source.seek(source.position)
+        self.voice.play(source, after=self.play_next_song)
+
+        return True
+
+    ####################################################################################
+    async def save_resume_point(self) -> None:
+        """Save the current song and position as the guild's resume point."""
+        if self.current is None or self.current.source is None:
+            return
+
+        await self.bot.run_blocking(  # type: ignore
+            self.bot.resume_points.put,  # type: ignore
+            self.ctx.guild.id,  # type: ignore
+            self.current.video_id,
+            self.current.source.position,
+            self.current.source.info.to_dict(),
+        )
+
+    ####################################################################################
+    def schedule_prefetch(self) -> None:
+        """Bring the prefetches in line with the next prefetch_depth songs of the
+        queue. Songs that left the window, through a skip, clear, remove or shuffle,
+        have their prefetch cancelled and songs that entered it are started.
+        """
+        window = self.queue[: self._prefetch_depth]
+        for song in list(self._prefetches):
+            if song not in window:
+                self.cancel_prefetch(song)
+
+        for song in window:
+            if song not in self._prefetches:
+                self._prefetches[song] = self.loop.create_task(self.prefetch(song))
+
+    ####################################################################################
+    async def seek(self, position: float) -> float:
+        """Move playback of the current song to a position.
+
+        Args:
+            position (float): Seconds into the song.
+
+        Returns:
+            float: The position moved to, clamped to the song.
+        """
+        source = self.current.source  # type: ignore
+        position = min(max(position, 0.0), max(source.info.duration - 1, 0))  # type: ignore
+        source.seek(position)  # type: ignore
+        await self.save_resume_point()
+
+        return position
+
+    ####################################################################################
+    def skip(self) -> None:
+        """Skip the currently playing song (if one is playing)."""
+        if self.is_playing and self.voice is not None:
+            self._skipped = True
+            self.voice.stop()
+
+    ####################################################################################
+    async def skip_failed(self, song: Song, err: Exception) -> None:
+        """Skip a song the player could not resolve, reporting why to the channel.
+
+        Args:
+            song (Song): The song.
+            err (Exception): The error raised resolving it.
+        """
+        self.bot.logger.warning(f"Skipping {song.title}: {err}")  # type: ignore
+        self.cancel_prefetch(song)
+        await self.clear_resume_point()
+        self.queue.played()
+
+        try:
+            await self.ctx.send(
+                f"Skipping {song.title}, an error occurred while processing it: {err}"
+            )
+
+        except discord.HTTPException as send_err:
+            self.bot.logger.warning(f"Unable to report skipped song: {send_err}")  # type: ignore
+
+    ####################################################################################
+    async def stop(self):
+        self._skipped = True
+        self.queue.clear()
+
+        for song in list(self._prefetches):
+            self.cancel_prefetch(song)
+
+        if self.voice:
+            await self.voice.disconnect()
+            self.voice = None
+
+    ####################################################################################
+    async def wait_for_song(self) -> None:
+        """Wait for the current song to end, saving its resume point periodically."""
+        while True:
+            try:
+                await asyncio.wait_for(self.next.wait(), self._resume_interval)
+                return
+
+            except asyncio.TimeoutError:
+                await self.save_resume_point()
+
+
+########################################################################################
+class AudioStateRegistry:
+    """AudioState objects keyed by guild id, so each guild gets its own queue, voice
+    client and player task. States are created on a guild's first command and torn
+    down when the bot leaves the guild, or by reap() once the state has been idle, with
+    nothing playing or queued and no commands, for idle_timeout seconds.
+    """
+
+    def __init__(self, bot: commands.Bot, idle_timeout: float = 600.0):
+        self.bot = bot
+        self.idle_timeout = idle_timeout
+
+        self._states = {}
+        self._stats = {"created": 0, "reaped": 0, "removed": 0}
+        self._touched = {}
+
+    def __contains__(self, guild_id: int) -> bool:
+        return guild_id in self._states
+
+    def __iter__(self):
+        return iter(list(self._states.values()))
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def stats(self) -> dict:
+        """Registry counters.
+
+        Returns:
+            dict: Created, removed and reaped counters, plus the number of guilds with
+                a state and the number of those playing.
+        """
+        return {
+            **self._stats,
+            "guilds": len(self._states),
+            "playing": sum(state.is_playing for state in self._states.values()),
+        }
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    async def close(self) -> None:
+        """Tear down every state. Their queue journals are closed first and kept, and
+        the players are stopped before they can clear the resume points, which are
+        saved at the current positions, so the queues and the songs that were playing
+        are restored when the bot starts again.
+        """
+        for state in self._states.values():
+            state.queue.close_journal()
+            if state.audio_player is not None:
+                state.audio_player.cancel()
+
+            await state.save_resume_point()
+
+        for guild_id in list(self._states):
+            await self.remove(guild_id)
+
+    ####################################################################################
+    def ensure(self, ctx: commands.Context) -> AudioState:
+        """Get the state of the context's guild, creating it on first use.
+
+        Args:
+            ctx (commands.Context): The command context.
+
+        Raises:
+            commands.NoPrivateMessage: Raised if the command was not sent in a guild.
+
+        Returns:
+            AudioState: The guild's state.
+        """
+        if ctx.guild is None:
+            raise commands.NoPrivateMessage()
+
+        state = self._states.get(ctx.guild.id)
+        if state is None:
+            state = self._states[ctx.guild.id] = AudioState(self.bot, ctx)
+            self._stats["created"] += 1
+
+        self._touched[ctx.guild.id] = time.monotonic()
+
+        return state
+
+    ####################################################################################
+    def get(self, guild_id: int) -> Union[AudioState, None]:
+        """Get the state of a guild without creating it.
+
+        Args:
+            guild_id (int): Id of the guild.
+
+        Returns:
+            Union[AudioState, None]: The guild's state, or None if it has none.
+        """
+        return self._states.get(guild_id)
+
+    ####################################################################################
+    async def reap(self) -> int:
+        """Tear down the states that have been idle for longer than idle_timeout.
+
+        Returns:
+            int: Number of states torn down.
+        """
+        cutoff = time.monotonic() - self.idle_timeout
+        idle = [
+            guild_id
+            for guild_id, state in self._states.items()
+            if state.is_idle and self._touched[guild_id] < cutoff
+        ]
+        for guild_id in idle:
+            await self.remove(guild_id)
+
+        self._stats["reaped"] += len(idle)
+
+        return len(idle)
+
+    ####################################################################################
+    async def remove(self, guild_id: int) -> bool:
+        """Stop a guild's player, leave its voice channel and forget its state.
+
+        Args:
+            guild_id (int): Id of the guild.
+
+        Returns:
+            bool: True if the guild had a state, else False.
+        """
+        state = self._states.pop(guild_id, None)
+        self._touched.pop(guild_id, None)
+        if state is None:
+            return False
+
+        await state.stop()
+        if state.audio_player is not None:
+            state.audio_player.cancel()
+
+        state.queue.played()
+        state.queue.close_journal()
+
+        self._stats["removed"] += 1
+
+        return True
+
+
+########################################################################################
+class CaseInsensitiveDict(MutableMapping):
+    """This class was liberally borrowed and expanded upon the requests library:
+    https://github.com/psf/requests/blob/main/requests/structures.py
+
+    A case-insensitive dict-like object.  Implements all methods and operations of
+    MutableMapping as well as dict's copy. Also provides lower_items.  All keys are
+    expected to be strings. The structure remembers the case of the last key to be set,
+    and iter(instance), keys(), items(), iterkeys(), and iteritems() will contain
+    case-sensitive keys. However, querying and contains testing is case insensitive:
+
+        cid = CaseInsensitiveDict()
+        cid['Accept'] = 'application/json'
+        cid['aCCEPT'] == 'application/json'  # True
+        list(cid) == ['Accept']  # True
+
+    For example, headers['content-encoding'] will return the value of a Content-Encoding
     response header, regardless of how the header name was originally stored. If the
     constructor, .update, or equality comparison operations are given keys that have
     equal .lower()s, the behavior is undefined.
@@ -723,11 +1588,26 @@ class Formatter(logging.Formatter):
 class Song:
     """Object to hold metadata related to a song."""
 
-    def __init__(self, song: dict):
+    def __init__(self, song: dict, requester: int = 0, priority: int = 1):
         self.title = song["snippet"]["title"]
-        self.video_id = song["snippet"]["resourceId"]["videoId"]
+
+        # playlistItems resources point at the video through resourceId, videos
+        # resources are the video itself.
+        resource = song["snippet"].get("resourceId")
+        self.video_id = resource["videoId"] if resource else song["id"]
         self.url = f"https://youtu.be/{self.video_id}"
 
+        # Set once the song is resolved, possibly ahead of time by the prefetcher.
+        self.source = None
+
+        # The span that queued the song, so its playback joins the same trace.
+        self.queued_at = time.time_ns()
+        self.trace = tracer.current()
+
+        # Who queued the song and in which lane, for fair-share scheduling.
+        self.priority = priority
+        self.requester = requester
+
     def __repr__(self):
         return pretty_dict(str(vars(self)))
 
@@ -735,16 +1615,58 @@ class Song:
     #                                  Properties                                      #
     ####################################################################################
     @property
-    def source(self) -> YTDLSource:
+    def priority(self) -> int:
+        """Queue lane of the song, lower lanes playing first.
+
+        Returns:
+            int: SongQueue.PRIORITY or SongQueue.NORMAL.
+        """
+        return self.__priority
+
+    @priority.setter
+    def priority(self, priority: int):
+        self.__priority = priority
+
+    ####################################################################################
+    @property
+    def queued_at(self) -> int:
+        """When the song was queued.
+
+        Returns:
+            int: Unix time in nanoseconds.
+        """
+        return self.__queued_at
+
+    @queued_at.setter
+    def queued_at(self, queued_at: int):
+        self.__queued_at = queued_at
+
+    ####################################################################################
+    @property
+    def requester(self) -> int:
+        """Discord id of the member who queued the song.
+
+        Returns:
+            int: Member id, 0 if the song was queued without one.
+        """
+        return self.__requester
+
+    @requester.setter
+    def requester(self, requester: int):
+        self.__requester = requester
+
+    ####################################################################################
+    @property
+    def source(self) -> Union[YTDLSource, None]:
         """YouTube downloader source object.
 
         Returns:
-            YTDLSource: YouTube downloader source object.
+            Union[YTDLSource, None]: YouTube downloader source object.
         """
         return self.__source
 
     @source.setter
-    def source(self, source: YTDLSource):
+    def source(self, source: Union[YTDLSource, None]):
         self.__source = source
 
     ####################################################################################
@@ -761,6 +1683,20 @@ class Song:
     def title(self, title: str):
         self.__title = title
 
+    ####################################################################################
+    @property
+    def trace(self) -> Union[Span, None]:
+        """Span the song was queued under.
+
+        Returns:
+            Union[Span, None]: The span, or None if it was queued outside of one.
+        """
+        return self.__trace
+
+    @trace.setter
+    def trace(self, trace: Union[Span, None]):
+        self.__trace = trace
+
     ####################################################################################
     @property
     def video_id(self) -> str:
@@ -789,6 +1725,24 @@ class Song:
     def url(self, url: str):
         self.__url = url
 
+    ####################################################################################
+    #                                Class Methods                                     #
+    ####################################################################################
+    @classmethod
+    def from_dict(cls, song: dict) -> Song:
+        """Rebuild a song saved with to_dict.
+
+        Args:
+            song (dict): The saved song.
+
+        Returns:
+            Song: The song.
+        """
+        rebuilt = cls(song, song.get("requester", 0), song.get("priority", 1))
+        rebuilt.queued_at = song.get("queued_at", rebuilt.queued_at)
+
+        return rebuilt
+
     ####################################################################################
     #                             Instance Methods                                     #
     ####################################################################################
@@ -804,33 +1758,86 @@ class Song:
                 description="```css\n" + self.title + "\n```",
                 color=discord.Color.blurple(),
             )
-            .add_field(name="Duration", value=self.source.duration)
+            .add_field(
+                name="Duration",
+                value=YTDLSource.parse_duration(self.source.info.duration),
+            )
             .add_field(name="Requested by", value=self.source.requester.mention)
             .add_field(
                 name="Uploader",
-                value=f"[{self.source.uploader}]({self.source.uploader_url})",
+                value=f"[{self.source.info.uploader}]({self.source.info.uploader_url})",
             )
-            .add_field(name="URL", value=f"[Click]({self.source.url})")
-            .set_thumbnail(url=self.source.thumbnail)
+            .add_field(name="URL", value=f"[Click]({self.source.info.webpage_url})")
+            .set_thumbnail(url=self.source.info.thumbnail)
         )
 
+    ####################################################################################
+    def to_dict(self) -> dict:
+        """Convert the song to a dict that from_dict rebuilds it from, shaped like the
+        videos resource the song was made from.
+
+        Returns:
+            dict: The song.
+        """
+        return {
+            "id": self.video_id,
+            "snippet": {"title": self.title},
+            "priority": self.priority,
+            "queued_at": self.queued_at,
+            "requester": self.requester,
+        }
+
 
 ########################################################################################
-# TODO: In the future, explore asyncio.PriorityQueue to be able to add items based on
-# TODO:  priority order vs. FIFO.
 class SongQueue(asyncio.Queue):
-    """Subclass of asyncio queue to create a song queue for the bot."""
+    """Song queue shared fairly between requesters. Songs are ordered by weighted fair
+    queueing: each song gets a virtual finish tag one over its requester's weight past
+    the later of the requester's previous tag and the tag of the song last played. One
+    requester loading a 400 song playlist then takes turns with everyone else instead
+    of going first for hours. Songs in the priority lane play before the normal lane.
+
+    Entries are (lane, finish, sequence, start, song) tuples in an IndexedSortedList, so
+    the queue position of a song is its rank and positional access, removal and
+    insertion take logarithmic time. A song moved or inserted at a position gets a key
+    between the keys of its new neighbours, so the fair share order of everything else
+    is left as it was.
+
+    With a journal every entry added or taken out is logged by its key, along with the
+    song the consumer is playing, so restore() rebuilds the queue exactly as it was
+    without resolving any song again.
+    """
+
+    NORMAL = 1
+    PRIORITY = 0
 
-    def __getitem__(self, item) -> list:
+    def __init__(
+        self,
+        maxsize: int = 0,
+        on_change: Union[Callable[[], None], None] = None,
+        journal: Union[QueueJournal, None] = None,
+    ):
+        super().__init__(maxsize)
+
+        # Called whenever songs are added, removed or reordered, other than the
+        # consumer taking a song off the head of the queue.
+        self.on_change = on_change
+
+        self.journal = journal
+
+        # The song the consumer took last, until it is marked played.
+        self._playing = None
+
+        # Scheduling weight per requester, 1.0 unless set.
+        self.weights = {}
+
+    def __getitem__(self, item) -> Union[Song, list]:
         if isinstance(item, slice):
-            return list(
-                itertools.islice(self._queue, item.start, item.stop, item.step)  # type: ignore
-            )
+            return [entry[-1] for entry in self._queue[item]]  # type: ignore
 
-        return self._queue[item]  # type: ignore
+        return self._queue[item][-1]  # type: ignore
 
     def __iter__(self):  # type: ignore
-        return self._queue.__iter__()  # type: ignore
+        return (entry[-1] for entry in self._queue)  # type: ignore
 
     def __len__(self):
         return self.qsize()
@@ -839,13 +1846,433 @@ class SongQueue(asyncio.Queue):
     #                             Instance Methods                                     #
     ####################################################################################
     def clear(self):
-        print("CLEAARING THE CUNBHELIJGBHNLEKSJHGBNELKH")
         self._queue.clear()  # type: ignore
+        self._finish.clear()
+        self._log(self._state())
+        self._changed()
 
     ####################################################################################
-    def remove(self, index: int):
-        del self._queue[index]  # type: ignore
+    def close_journal(self) -> None:
+        """Stop journaling. The journal file is kept as it is, so a queue torn down
+        while the bot shuts down is restored on the next start.
+        """
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+    ####################################################################################
+    def insert(self, index: int, song: Song) -> None:
+        """Add a song at a position instead of its fair share position.
+
+        Args:
+            index (int): Position to insert at, clamped to the queue.
+            song (Song): The song.
+        """
+        if not self._queue:  # type: ignore
+            self._insert(song)
+        else:
+            self._place(index, song)
+
+        self._unfinished_tasks += 1  # type: ignore
+        self._finished.clear()  # type: ignore
+        self._wakeup_next(self._getters)  # type: ignore
+        self._changed()
+
+    ####################################################################################
+    def move(self, source: int, destination: int) -> Song:
+        """Move a song to another position.
+
+        Args:
+            source (int): Position of the song.
+            destination (int): Position to move it to, clamped to the queue.
+
+        Raises:
+            IndexError: Raised if there is no song at source.
+
+        Returns:
+            Song: The moved song.
+        """
+        entry = self._pop(source)
+        song = entry[-1]
+        if self._queue:  # type: ignore
+            self._place(destination, song)
+        else:
+            self._add(entry)
+
+        self._changed()
+
+        return song
+
+    ####################################################################################
+    def played(self) -> None:
+        """Mark the song the consumer took last as played, so it is not restored."""
+        if self._playing is not None:
+            self._playing = None
+            self._log({"op": "done"})
+
+    ####################################################################################
+    def put_many(
+        self, items: Iterable, factory: Union[Callable[[Any], Song], None] = None
+    ) -> int:
+        """Add a batch of songs at once, without waiting. The whole batch is tagged,
+        inserted and journaled in one go, then the consumer is woken and on_change
+        called once, instead of once per song.
+
+        Args:
+            items (Iterable): The songs, or the items to build them from.
+            factory (Union[Callable[[Any], Song], None], optional): Builds a song from
+                an item as the batch is inserted, e.g. Song from a videos resource.
+                Defaults to None, which takes the items as songs.
+
+        Raises:
+            asyncio.QueueFull: Raised if the batch does not fit a bounded queue. None
+                of the batch is added.
+
+        Returns:
+            int: Number of songs added.
+        """
+        songs = map(factory, items) if factory is not None else items
+        finish = dict(self._finish)
+        entries = [self._tag(song) for song in songs]
+        if self.maxsize > 0 and self.qsize() + len(entries) > self.maxsize:
+            self._finish = finish
+            raise asyncio.QueueFull
+
+        if not entries:
+            return 0
+
+        self._add(*entries, tagged=True)
+        self._unfinished_tasks += len(entries)  # type: ignore
+        self._finished.clear()  # type: ignore
+        for _ in range(min(len(entries), len(self._getters))):  # type: ignore
+            self._wakeup_next(self._getters)  # type: ignore
+
+        self._changed()
+
+        return len(entries)
+
+    ####################################################################################
+    def remove(self, index: int) -> Song:
+        """Remove the song at a position.
+
+        Args:
+            index (int): Position of the song.
+
+        Raises:
+            IndexError: Raised if there is no song at index.
+
+        Returns:
+            Song: The removed song.
+        """
+        song = self._pop(index)[-1]
+        self._changed()
+
+        return song
+
+    ####################################################################################
+    def restore(self) -> Union[Song, None]:
+        """Rebuild the queue from its journal, compacting the journal if that is due. A
+        song that was playing and never finished goes back to the head of the queue.
+
+        Returns:
+            Union[Song, None]: The song that was playing, if it never finished.
+        """
+        if self.journal is None:
+            return None
+
+        entries = {}
+        playing = None
+        for record in self.journal.load():
+            operation = record.get("op")
+            if operation == "state":
+                entries.clear()
+                self._finish = {int(key): tag for key, tag in record["finish"].items()}
+                self._virtual = record["virtual"]
+                self.weights = {
+                    int(key): weight for key, weight in record["weights"].items()
+                }
+
+            elif operation == "put":
+                *key, start = record["key"]
+                entries[tuple(key)] = (start, record["song"])
+                if record.get("tagged"):
+                    self._finish[record["song"]["requester"]] = key[1]
+
+            elif operation == "requeue":
+                *key, start = record["key"]
+                entries[tuple(key)] = (start, record["song"])
+                playing = None
+
+            elif operation in ("get", "pop"):
+                start, song = entries.pop(tuple(record["key"]), (None, None))
+                if operation == "get" and song is not None:
+                    self._virtual = max(self._virtual, start)
+                    playing = song
+
+            elif operation == "current":
+                playing = record["song"]
+
+            elif operation == "done":
+                playing = None
+
+            elif operation == "weight":
+                self.weights[record["requester"]] = record["weight"]
+
+        requeued = None
+        if playing is not None:
+            if entries:
+                lane, finish, sequence = min(entries)
+                start = entries[lane, finish, sequence][0]
+                requeued = (lane, finish, sequence - 1, start)
+            else:
+                requeued = (playing["priority"], self._virtual, 0, self._virtual)
+
+            entries[requeued[:3]] = (requeued[3], playing)
+
+        self._queue = IndexedSortedList(  # type: ignore
+            (*key, start, Song.from_dict(song))
+            for key, (start, song) in entries.items()
+        )
+        self._playing = None
+        if requeued is not None:
+            self._log({"op": "requeue", "key": list(requeued), "song": playing})
+
+        if self.journal.due(len(entries)):
+            self.journal.compact(self.snapshot())
+
+        if not entries:
+            return None
+
+        self._sequence = itertools.count(
+            int(max(sequence for _, _, sequence in entries)) + 1
+        )
+        self._unfinished_tasks += len(entries)  # type: ignore
+        self._finished.clear()  # type: ignore
+        self._changed()
+
+        return self[0] if playing is not None else None
+
+    ####################################################################################
+    def set_weight(self, requester: int, weight: float) -> None:
+        """Set a requester's scheduling weight.
+
+        Args:
+            requester (int): Discord id of the requester.
+            weight (float): The weight, 1.0 being an equal share.
+        """
+        self.weights[requester] = weight
+        self._log({"op": "weight", "requester": requester, "weight": weight})
 
     ####################################################################################
     def shuffle(self):
-        random.shuffle(self._queue)  # type: ignore
+        """Shuffle the queue, then share it out again as if the songs had been queued
+        in the shuffled order.
+        """
+        songs = [entry[-1] for entry in self._queue]  # type: ignore
+        random.shuffle(songs)
+        self._queue.clear()  # type: ignore
+        self._finish.clear()
+        self._log(self._state())
+        for song in songs:
+            self._insert(song)
+
+        self._changed()
+
+    ####################################################################################
+    def snapshot(self) -> list:
+        """Get journal records that rebuild the queue as it is now.
+
+        Returns:
+            list: The records, empty if there is nothing to restore.
+        """
+        if not self._queue and self._playing is None and not self.weights:  # type: ignore
+            return []
+
+        records = [self._state()]
+        records.extend(
+            {"op": "put", "key": list(entry[:4]), "song": entry[-1].to_dict()}
+            for entry in self._queue  # type: ignore
+        )
+        if self._playing is not None:
+            records.append({"op": "current", "song": self._playing.to_dict()})
+
+        return records
+
+    ####################################################################################
+    def _add(self, *entries: tuple, tagged: bool = False) -> None:
+        """Add entries to the queue and journal them.
+
+        Args:
+            *entries (tuple): The entries.
+            tagged (bool, optional): Whether the entries' finish tags are their
+                requesters' latest. Defaults to False.
+        """
+        if len(entries) == 1:
+            self._queue.add(entries[0])  # type: ignore
+        else:
+            self._queue.update(entries)  # type: ignore
+
+        if self.journal is not None:
+            extra = {"tagged": True} if tagged else {}
+            self._log(
+                *(
+                    {
+                        "op": "put",
+                        "key": list(entry[:4]),
+                        "song": entry[-1].to_dict(),
+                        **extra,
+                    }
+                    for entry in entries
+                )
+            )
+
+    ####################################################################################
+    def _changed(self) -> None:
+        """Notify the on_change callback, if any."""
+        if self.on_change is not None:
+            self.on_change()
+
+    ####################################################################################
+    def _get(self) -> Song:
+        *key, start, song = self._queue.pop(0)  # type: ignore
+        self._playing = song
+        self._virtual = max(self._virtual, start)
+        self._log({"op": "get", "key": key})
+
+        # Requesters whose last tag has passed get nothing out of it, so they are
+        # forgotten to keep the table from growing with every requester ever seen.
+        if len(self._finish) > 64:
+            self._finish = {
+                requester: finish
+                for requester, finish in self._finish.items()
+                if finish > self._virtual
+            }
+
+        return song
+
+    ####################################################################################
+    def _init(self, maxsize: int) -> None:
+        self._finish = {}
+        self._queue = IndexedSortedList()
+        self._sequence = itertools.count()
+        self._virtual = 0.0
+
+    ####################################################################################
+    def _insert(self, song: Song) -> None:
+        """Tag a song and insert it at its place in the queue.
+
+        Args:
+            song (Song): The song.
+        """
+        self._add(self._tag(song), tagged=True)
+
+    ####################################################################################
+    def _place(self, index: int, song: Song) -> None:
+        """Insert a song at a position of a non-empty queue, keyed between the entries
+        that will be before and after it. The song takes its lane and tags from the
+        entry after it, or the last entry when it goes last.
+
+        Args:
+            index (int): Position to insert at, clamped to the queue.
+            song (Song): The song.
+        """
+        index = min(max(index, 0), len(self._queue))  # type: ignore
+        if index == len(self._queue):  # type: ignore
+            # A fresh sequence number sorts after every entry, and unlike the last
+            # entry's number plus one is never handed out to another entry.
+            lane, finish, _, start, _ = self._queue[-1]  # type: ignore
+            sequence = next(self._sequence)
+        else:
+            lane, finish, sequence, start, _ = self._queue[index]  # type: ignore
+            previous = self._queue[index - 1] if index else None  # type: ignore
+            if previous is None or previous[:2] != (lane, finish):
+                sequence -= 1
+            else:
+                sequence = (previous[2] + sequence) / 2
+                if not previous[2] < sequence < self._queue[index][2]:  # type: ignore
+                    # Halved down to float precision, so number the entries afresh.
+                    self._renumber()
+                    self._place(index, song)
+                    return
+
+        self._add((lane, finish, sequence, start, song))
+
+    ####################################################################################
+    def _log(self, *records: dict) -> None:
+        """Append records to the journal, compacting it once that is due.
+
+        Args:
+            *records (dict): The records.
+        """
+        if self.journal is None:
+            return
+
+        self.journal.append(*records)
+        if self.journal.due(len(self._queue)):  # type: ignore
+            self.journal.compact(self.snapshot())
+
+    ####################################################################################
+    def _pop(self, index: int) -> tuple:
+        """Take an entry out of the queue and journal it.
+
+        Args:
+            index (int): Position of the entry.
+
+        Raises:
+            IndexError: Raised if there is no entry at index.
+
+        Returns:
+            tuple: The entry.
+        """
+        entry = self._queue.pop(index)  # type: ignore
+        self._log({"op": "pop", "key": list(entry[:3])})
+
+        return entry
+
+    ####################################################################################
+    def _put(self, item: Song) -> None:
+        self._insert(item)
+        self._changed()
+
+    ####################################################################################
+    def _renumber(self) -> None:
+        """Give every entry a fresh sequence number, keeping their order."""
+        self._queue = IndexedSortedList(  # type: ignore
+            (lane, finish, next(self._sequence), start, song)
+            for lane, finish, _, start, song in self._queue  # type: ignore
+        )
+        if self.journal is not None:
+            self.journal.compact(self.snapshot())
+
+    ####################################################################################
+    def _tag(self, song: Song) -> tuple:
+        """Give a song the virtual tags of its fair share position, as the latest song
+        of its requester.
+
+        Args:
+            song (Song): The song.
+
+        Returns:
+            tuple: The song's queue entry.
+        """
+        start = max(self._virtual, self._finish.get(song.requester, 0.0))
+        finish = start + 1.0 / self.weights.get(song.requester, 1.0)
+        self._finish[song.requester] = finish
+
+        # The sequence number is unique, so entries never compare further than it.
+        return (song.priority, finish, next(self._sequence), start, song)
+
+    ####################################################################################
+    def _state(self) -> dict:
+        """Get the journal record that resets the queue to empty with the current
+        scheduling state.
+
+        Returns:
+            dict: The record.
+        """
+        return {
+            "op": "state",
+            "finish": self._finish,
+            "virtual": self._virtual,
+            "weights": self.weights,
+        }
@@ -9,6 +9,10 @@ class PuckBotClientError(Exception):
     """PuckBotClient exception."""
 
 
+class QuotaError(Exception):
+    """YouTube API quota exception."""
+
+
 class VoiceError(Exception):
     """Voice exception."""
 
@@ -0,0 +1,238 @@
+# Standard library imports.
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Union
+
+from music_bot.common.exceptions import YTDLError
+from music_bot.common.track import TrackInfo
+
+# The YoutubeDL instance owned by the current worker process.
+_ytdl = None
+
+
+########################################################################################
+#                         Worker process function definitions.                         #
+########################################################################################
+def _init_worker(options: dict, started: multiprocessing.SimpleQueue) -> None:
+    """Report the worker's process id and build its own YoutubeDL instance.
+
+    Args:
+        options (dict): YoutubeDL options.
+        started (multiprocessing.SimpleQueue): Queue the process id is reported on, so
+            the parent can kill the worker if it gets stuck.
+    """
+    global _ytdl  # pylint: disable=global-statement
+
+    started.put(os.getpid())
+
+    # Third party imports.
+    import youtube_dl  # pylint: disable=import-outside-toplevel
+
+    _ytdl = youtube_dl.YoutubeDL(options)
+
+
+########################################################################################
+def _extract(url: str) -> Union[TrackInfo, None]:
+    """Extract the info for a url in the worker process. Only the compact track record
+    is sent back, not the full info dict.
+
+    Args:
+        url (str): Url of the video.
+
+    Raises:
+        YTDLError: Raised if extraction failed. youtube_dl errors carry tracebacks that
+            can not be sent back to the parent process, so only the message is kept.
+
+    Returns:
+        Union[TrackInfo, None]: The track info, or None if nothing was found.
+    """
+    try:
+        info = _ytdl.extract_info(url, download=False)  # type: ignore
+
+        return TrackInfo.from_dict(info) if info else None
+
+    except Exception as err:
+        raise YTDLError(str(err)) from None
+
+
+########################################################################################
+def _warm(delay: float) -> int:
+    """Job used to force a worker to start and run its initializer. It holds the worker
+    for a moment so the other warm up jobs land on other workers.
+
+    Args:
+        delay (float): Seconds to hold the worker.
+
+    Returns:
+        int: Worker process id.
+    """
+    time.sleep(delay)
+
+    return os.getpid()
+
+
+########################################################################################
+class ExtractorPool:
+    """Size-bounded process pool for youtube_dl extraction. Extraction is CPU-heavy
+    Python parsing, so running it in processes keeps it off the GIL shared with the
+    event loop and voice threads. Every worker owns a YoutubeDL instance, is retired
+    after max_tasks jobs, and a job running past the timeout recycles the whole pool.
+    """
+
+    def __init__(
+        self,
+        options: dict,
+        workers: int = 0,
+        timeout: float = 30.0,
+        max_tasks: int = 50,
+    ):
+        self.max_tasks = max_tasks
+        self.options = options
+        self.timeout = timeout
+        self.workers = workers or max((os.cpu_count() or 2) - 1, 1)
+
+        self._pids = set()
+        self._pool = None
+        self._started = None
+        self._stats = {"failures": 0, "jobs": 0, "recycles": 0, "timeouts": 0}
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        """The process pool, created on first use.
+
+        Returns:
+            ProcessPoolExecutor: The process pool.
+        """
+        if self._pool is None:
+            context = multiprocessing.get_context("spawn")
+            self._pids = set()
+            self._started = context.SimpleQueue()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=context,
+                initializer=_init_worker,
+                initargs=(self.options, self._started),
+                max_tasks_per_child=self.max_tasks,
+            )
+
+        return self._pool
+
+    ####################################################################################
+    @property
+    def stats(self) -> dict:
+        """Pool counters.
+
+        Returns:
+            dict: Job, failure, timeout and recycle counters, plus the worker count.
+        """
+        return {**self._stats, "workers": self.workers}
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    async def extract(self, url: str) -> Union[TrackInfo, None]:
+        """Extract the info for a url on one of the workers.
+
+        Args:
+            url (str): Url of the video.
+
+        Raises:
+            YTDLError: Raised if extraction failed or timed out.
+
+        Returns:
+            Union[TrackInfo, None]: The track info, or None if nothing was found.
+        """
+        loop = asyncio.get_running_loop()
+        pool = self.pool
+        self._stats["jobs"] += 1
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(pool, _extract, url), self.timeout
+            )
+
+        except asyncio.TimeoutError as err:
+            self._stats["timeouts"] += 1
+            self.recycle(pool)
+            raise YTDLError(f"Timed out extracting {url}.") from err
+
+        except BrokenProcessPool as err:
+            self._stats["failures"] += 1
+            self.recycle(pool)
+            raise YTDLError(f"Extractor worker died extracting {url}.") from err
+
+        except YTDLError:
+            self._stats["failures"] += 1
+            raise
+
+    ####################################################################################
+    def recycle(self, pool: Union[ProcessPoolExecutor, None] = None) -> None:
+        """Kill every worker and let the pool be rebuilt on the next job. A worker
+        stuck on a job can not be interrupted any other way.
+
+        Args:
+            pool (Union[ProcessPoolExecutor, None], optional): The pool a failed job
+                ran on. Nothing is done if it has already been replaced, so the other
+                jobs that broke with it do not recycle the new pool. Defaults to None,
+                which recycles the current pool.
+        """
+        if self._pool is None or (pool is not None and pool is not self._pool):
+            return
+
+        # Only live children are matched, so a recycled process id is never killed.
+        pids = self._worker_pids()
+        self._stats["recycles"] += 1
+        for process in multiprocessing.active_children():
+            if process.pid in pids:
+                process.terminate()
+
+        self.shutdown()
+
+    ####################################################################################
+    def shutdown(self) -> None:
+        """Shut the pool down."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+        if self._started is not None:
+            self._started.close()
+            self._started = None
+
+    ####################################################################################
+    async def warm_up(self) -> None:
+        """Start every worker ahead of time so the first extractions do not pay for
+        process start up and the youtube_dl import.
+        """
+        loop = asyncio.get_running_loop()
+        pids = set()
+        for _ in range(3):
+            pids.update(
+                await asyncio.gather(
+                    *(
+                        loop.run_in_executor(self.pool, _warm, 0.1)
+                        for _ in range(self.workers)
+                    )
+                )
+            )
+            if len(pids) >= self.workers:
+                break
+
+    ####################################################################################
+    def _worker_pids(self) -> set:
+        """Collect the process ids the workers of the current pool have reported.
+
+        Returns:
+            set: Process ids of every worker started so far, including retired ones.
+        """
+        if self._started is not None:
+            while not self._started.empty():
+                self._pids.add(self._started.get())
+
+        return self._pids
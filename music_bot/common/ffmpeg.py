@@ -0,0 +1,346 @@
+# Standard library imports.
+import asyncio
+import collections
+import logging
+import re
+import statistics
+import subprocess
+import time
+from typing import Union
+
+# Third party imports.
+import discord
+from discord.oggparse import OggStream
+
+logger = logging.getLogger(__name__)
+
+
+########################################################################################
+def _ffmpeg_version() -> tuple:
+    """Get the version of the installed FFmpeg.
+
+    Returns:
+        tuple: Major and minor version, (0, 0) if FFmpeg is missing or unparsable.
+    """
+    try:
+        output = subprocess.run(
+            ["ffmpeg", "-version"], capture_output=True, check=False, text=True
+        ).stdout
+
+    except OSError:
+        return (0, 0)
+
+    match = re.search(r"version n?(\d+)\.(\d+)", output)
+
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+########################################################################################
+class FFmpegProcessAudio(discord.AudioSource):
+    """Audio source reading an FFmpeg process's output pipe, either as Ogg/Opus packets
+    or as 20ms PCM frames. The process is spawned and ended here rather than through
+    discord.FFmpegAudio, whose stdin handling only allows a pipe it feeds itself.
+    """
+
+    def __init__(self, args: list, opus: bool, stdin: bool = False):
+        try:
+            self._process = subprocess.Popen(
+                ["ffmpeg", *args],
+                stdin=subprocess.PIPE if stdin else subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+            )
+
+        except FileNotFoundError:
+            raise discord.ClientException("ffmpeg was not found.") from None
+
+        except subprocess.SubprocessError as err:
+            raise discord.ClientException(f"Popen failed: {err}") from err
+
+        self._opus = opus
+        self._packets = (
+            OggStream(self._process.stdout).iter_packets()  # type: ignore
+            if opus
+            else None
+        )
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def cleanup(self) -> None:
+        """Kill the process if it is still running and reap it."""
+        if self._process.poll() is None:
+            self._process.kill()
+
+        self._process.wait()
+        for pipe in (self._process.stdin, self._process.stdout):
+            if pipe is not None:
+                pipe.close()
+
+    ####################################################################################
+    def is_opus(self) -> bool:
+        return self._opus
+
+    ####################################################################################
+    def read(self) -> bytes:
+        if self._packets is not None:
+            return next(self._packets, b"")
+
+        data = self._process.stdout.read(  # type: ignore
+            discord.opus.Encoder.FRAME_SIZE
+        )
+        if len(data) != discord.opus.Encoder.FRAME_SIZE:
+            return b""
+
+        return data
+
+    ####################################################################################
+    def wait(self, timeout: float) -> Union[int, None]:
+        """Wait for the process to exit on its own, e.g. to finish another output once
+        its last packet has been read.
+
+        Args:
+            timeout (float): Seconds to wait.
+
+        Returns:
+            Union[int, None]: The return code, or None if the process is still running.
+        """
+        try:
+            return self._process.wait(timeout)
+
+        except subprocess.TimeoutExpired:
+            return None
+
+
+########################################################################################
+class PooledFFmpegAudio(FFmpegProcessAudio):
+    """FFmpeg audio source spawned before its input is known. The process starts on a
+    concat demuxer script read from stdin, so it loads and initialises right away and
+    then blocks until start() writes the script naming the input.
+    """
+
+    # Protocols the concat demuxer may open for the inputs it is given.
+    PROTOCOLS = "file,http,https,tcp,tls,crypto,pipe"
+
+    def __init__(self, args: list, opus: bool):
+        super().__init__(
+            [
+                *("-f", "concat", "-safe", "0", "-protocol_whitelist", self.PROTOCOLS),
+                *("-i", "pipe:0", *args, "-loglevel", "warning", "pipe:1"),
+            ],
+            opus,
+            stdin=True,
+        )
+
+        self.spawned = time.monotonic()
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def alive(self) -> bool:
+        """Check if the process is still waiting for its input.
+
+        Returns:
+            bool: True if the process is running, else False.
+        """
+        return self._process.poll() is None
+
+    ####################################################################################
+    def start(self, url: str, position: float = 0.0, options: tuple = ()) -> None:
+        """Give the process its input.
+
+        Args:
+            url (str): Stream url or local path.
+            position (float, optional): Seconds into the input to start from. Defaults
+                to 0.0.
+            options (tuple, optional): (key, value) options used to open the input.
+                Defaults to ().
+        """
+        quoted = url.replace("'", "'\\''")
+        script = ["ffconcat version 1.0", f"file '{quoted}'"]
+        script.extend(f"option {key} {value}" for key, value in options)
+        if position:
+            script.append(f"inpoint {position:.3f}")
+
+        self._process.stdin.write(("\n".join(script) + "\n").encode())  # type: ignore
+        self._process.stdin.close()  # type: ignore
+
+
+########################################################################################
+class PooledPCMAudio(PooledFFmpegAudio):
+    """Pooled FFmpeg process producing signed 16-bit 48kHz stereo PCM."""
+
+    ARGS = ["-vn", "-f", "s16le", "-ar", "48000", "-ac", "2"]
+
+    def __init__(self):
+        super().__init__(self.ARGS, opus=False)
+
+
+########################################################################################
+class PooledOpusAudio(PooledFFmpegAudio):
+    """Pooled FFmpeg process copying an Opus input into Ogg packets."""
+
+    ARGS = ["-vn", "-map_metadata", "-1", "-f", "opus", "-c:a", "copy"]
+
+    def __init__(self):
+        super().__init__(self.ARGS, opus=True)
+
+
+########################################################################################
+class FFmpegPool:
+    """Keeps FFmpeg processes spawned ahead of time so starting a song skips process
+    start up. One pool is kept per output kind, PCM and Opus copy, and refilled in the
+    background each time a process is taken. Processes left idle for idle_timeout
+    seconds are reaped, so an idle bot keeps none around. Per-url input options such
+    as reconnects need the concat option directive, which requires FFmpeg 5.0.
+    """
+
+    KINDS = {"opus": PooledOpusAudio, "pcm": PooledPCMAudio}
+
+    def __init__(self, size: int = 1, idle_timeout: float = 120.0, samples: int = 100):
+        self.idle_timeout = idle_timeout
+        self.size = size
+
+        self._idle = {kind: collections.deque() for kind in self.KINDS}
+        self._reaper = None
+        self._stats = {"hits": 0, "misses": 0, "reaped": 0, "spawned": 0}
+        self._timings = {
+            "cold": collections.deque(maxlen=samples),
+            "pooled": collections.deque(maxlen=samples),
+        }
+        self._version = None
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def options_supported(self) -> bool:
+        """Check if the installed FFmpeg accepts per-input options in concat scripts.
+
+        Returns:
+            bool: True for FFmpeg 5.0 and newer, else False.
+        """
+        if self._version is None:
+            self._version = _ffmpeg_version()
+
+        return self._version >= (5, 0)
+
+    ####################################################################################
+    @property
+    def stats(self) -> dict:
+        """Pool counters and time-to-first-packet medians.
+
+        Returns:
+            dict: Hit, miss, spawn and reap counters, the idle process count, and the
+                median seconds to the first packet of pooled and cold sources.
+        """
+        return {
+            **self._stats,
+            "idle": sum(len(idle) for idle in self._idle.values()),
+            **{
+                f"{name}_ttfp": statistics.median(timings) if timings else None
+                for name, timings in self._timings.items()
+            },
+        }
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def acquire(self, kind: str) -> Union[PooledFFmpegAudio, None]:
+        """Take a spawned process and schedule a replacement.
+
+        Args:
+            kind (str): Output kind, opus or pcm.
+
+        Returns:
+            Union[PooledFFmpegAudio, None]: A process waiting for its input, or None if
+                none was ready.
+        """
+        idle = self._idle[kind]
+        source = None
+        while idle and source is None:
+            candidate = idle.popleft()
+            if candidate.alive():
+                source = candidate
+            else:
+                candidate.cleanup()
+
+        self._stats["hits" if source else "misses"] += 1
+        asyncio.get_running_loop().call_soon(self.fill, kind)
+
+        return source
+
+    ####################################################################################
+    def fill(self, kind: str) -> None:
+        """Spawn processes until the pool of a kind is full.
+
+        Args:
+            kind (str): Output kind, opus or pcm.
+        """
+        idle = self._idle[kind]
+        while len(idle) < self.size:
+            try:
+                idle.append(self.KINDS[kind]())
+
+            except discord.ClientException as err:
+                logger.warning(f"Unable to spawn pooled FFmpeg: {err}")
+                return
+
+            self._stats["spawned"] += 1
+
+        self._start_reaper()
+
+    ####################################################################################
+    def record(self, pooled: bool, seconds: float) -> None:
+        """Record the time a source took to produce its first packet.
+
+        Args:
+            pooled (bool): True if the source came from the pool.
+            seconds (float): Seconds from starting the source to its first packet.
+        """
+        self._timings["pooled" if pooled else "cold"].append(seconds)
+
+    ####################################################################################
+    def reap(self) -> int:
+        """Kill the processes that have been idle for longer than idle_timeout.
+
+        Returns:
+            int: Number of processes reaped.
+        """
+        reaped = 0
+        cutoff = time.monotonic() - self.idle_timeout
+        for idle in self._idle.values():
+            while idle and (idle[0].spawned < cutoff or not idle[0].alive()):
+                idle.popleft().cleanup()
+                reaped += 1
+
+        self._stats["reaped"] += reaped
+
+        return reaped
+
+    ####################################################################################
+    def shutdown(self) -> None:
+        """Kill every idle process and stop the reaper."""
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+
+        for idle in self._idle.values():
+            while idle:
+                idle.popleft().cleanup()
+
+    ####################################################################################
+    async def _reap_forever(self) -> None:
+        """Reap idle processes until the pool is empty."""
+        while True:
+            await asyncio.sleep(self.idle_timeout / 4)
+            self.reap()
+            if not any(self._idle.values()):
+                break
+
+        self._reaper = None
+
+    ####################################################################################
+    def _start_reaper(self) -> None:
+        """Start the reaper task if it is not running."""
+        if self._reaper is None:
+            self._reaper = asyncio.get_running_loop().create_task(self._reap_forever())
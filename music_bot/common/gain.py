@@ -0,0 +1,153 @@
+# Third party imports.
+import discord
+import numpy as np
+
+# 20ms of 48kHz stereo signed 16-bit PCM, as produced by FFmpegPCMAudio.
+FRAME_SAMPLES = discord.opus.Encoder.SAMPLES_PER_FRAME * discord.opus.Encoder.CHANNELS
+FRAME_SIZE = discord.opus.Encoder.FRAME_SIZE
+
+
+########################################################################################
+class GainTransformer(discord.AudioSource):
+    """Volume stage for PCM sources, replacing PCMVolumeTransformer's per-frame
+    audioop.mul. Frames are scaled with NumPy into buffers allocated once per source.
+    Volume changes ramp over ramp_frames frames instead of jumping, and a peak limiter
+    pulls frames that would clip under the ceiling and releases over release_frames.
+    """
+
+    def __init__(
+        self,
+        original: discord.AudioSource,
+        volume: float = 1.0,
+        *,
+        ceiling: float = 0.98,
+        ramp_frames: int = 5,
+        release_frames: int = 25,
+    ):
+        if original.is_opus():
+            raise discord.ClientException("AudioSource must not be Opus encoded.")
+
+        self.ceiling = ceiling * np.iinfo(np.int16).max
+        self.original = original
+        self.ramp_frames = max(ramp_frames, 1)
+        self.release = 1.0 / max(release_frames, 1)
+
+        self._gain = max(volume, 0.0)
+        self._reduction = 1.0
+        self._step = 0.0
+        self._target = self._gain
+
+        # Working buffers, plus the per-sample position within a frame used to
+        # interpolate ramps. Samples are interleaved, so both channels share a step.
+        self._output = np.empty(FRAME_SAMPLES, dtype=np.int16)
+        self._ramp = np.empty(FRAME_SAMPLES, dtype=np.float32)
+        self._samples = np.empty(FRAME_SAMPLES, dtype=np.float32)
+        self._scratch = np.empty(FRAME_SAMPLES, dtype=np.float32)
+        self._steps = np.repeat(
+            np.arange(FRAME_SAMPLES // 2, dtype=np.float32) / (FRAME_SAMPLES // 2), 2
+        )
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def volume(self) -> float:
+        """Target volume, 1.0 being the original level. Setting it starts a ramp from
+        the current gain.
+
+        Returns:
+            float: Target volume.
+        """
+        return self._target
+
+    @volume.setter
+    def volume(self, volume: float):
+        self._target = max(volume, 0.0)
+        self._step = (self._target - self._gain) / self.ramp_frames
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def cleanup(self) -> None:
+        """Clean up the wrapped source."""
+        self.original.cleanup()
+
+    ####################################################################################
+    def read(self) -> bytes:
+        """Read and scale the next PCM frame.
+
+        Returns:
+            bytes: A 20ms PCM frame, empty once the source has ended.
+        """
+        data = self.original.read()
+        if not data:
+            return data
+
+        start = self._gain
+        if self._step:
+            self._gain += self._step
+            if (self._step > 0) == (self._gain >= self._target):
+                self._gain = self._target
+                self._step = 0.0
+
+        if start == self._gain == 1.0 and self._reduction == 1.0:
+            return data
+
+        if len(data) != FRAME_SIZE:
+            return self._scale_partial(data)
+
+        pcm = np.frombuffer(data, dtype=np.int16)
+        if start == self._gain:
+            np.multiply(pcm, self._gain, out=self._samples)
+        else:
+            np.multiply(self._steps, self._gain - start, out=self._ramp)
+            self._ramp += start
+            np.multiply(pcm, self._ramp, out=self._samples)
+
+        # Below unity gain nothing can clip, so the limiter only runs above it.
+        if max(start, self._gain) > 1.0 or self._reduction < 1.0:
+            self._limit(self._samples, self._scratch)
+
+        np.copyto(self._output, self._samples, casting="unsafe")
+
+        return self._output.tobytes()
+
+    ####################################################################################
+    def _limit(self, samples: np.ndarray, scratch: np.ndarray) -> None:
+        """Apply the peak limiter to a scaled frame in place.
+
+        Args:
+            samples (np.ndarray): Scaled samples.
+            scratch (np.ndarray): Buffer of the same size to compute the peak in.
+        """
+        np.abs(samples, out=scratch)
+        peak = float(scratch.max())
+        if peak * self._reduction > self.ceiling:
+            # Instant attack down to the level that keeps the frame under the ceiling.
+            self._reduction = self.ceiling / peak
+
+        elif self._reduction < 1.0:
+            self._reduction = min(
+                self._reduction + self.release,
+                self.ceiling / peak if peak else 1.0,
+                1.0,
+            )
+
+        if self._reduction < 1.0:
+            samples *= self._reduction
+
+    ####################################################################################
+    def _scale_partial(self, data: bytes) -> bytes:
+        """Scale a short final frame. This only happens once per track, so it is
+        allowed to allocate.
+
+        Args:
+            data (bytes): PCM frame shorter than FRAME_SIZE.
+
+        Returns:
+            bytes: The scaled frame.
+        """
+        samples = np.frombuffer(data, dtype=np.int16) * np.float32(self._gain)
+        self._limit(samples, np.empty_like(samples))
+
+        return samples.astype(np.int16).tobytes()
@@ -0,0 +1,242 @@
+# Standard library imports.
+import json
+import logging
+import os
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+########################################################################################
+def _encode(records) -> str:
+    """Encode records as JSON lines.
+
+    Args:
+        records (Iterable[dict]): The records.
+
+    Returns:
+        str: One compact JSON record per line.
+    """
+    return "".join(
+        json.dumps(record, separators=(",", ":")) + "\n" for record in records
+    )
+
+
+########################################################################################
+class QueueJournal:
+    """Append-only log of the changes to one guild's song queue, so the queue survives a
+    restart or crash. Each change is one JSON record per line. A line cut short by a
+    crash is skipped on load.
+
+    Once enough records have been appended the log is compacted: a snapshot of the queue
+    is written to a temporary file, synced, and swapped in for the log.
+
+    Records are encoded by the caller, so later changes to the queue cannot leak into
+    them, and written by a writer thread of its own, so the event loop never waits on
+    the disk. The writer flushes whenever it runs out of records, which keeps
+    everything up to the last change if the process dies.
+    """
+
+    def __init__(self, path: str, compact_every: int = 1000):
+        self.compact_every = compact_every
+        self.path = path
+
+        self._file = None
+        self._jobs = queue.SimpleQueue()
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._writer = None
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def pending(self) -> int:
+        """Records appended since the log was last compacted.
+
+        Returns:
+            int: Number of records.
+        """
+        return self._pending
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def append(self, *records: dict) -> None:
+        """Queue records to be appended to the log.
+
+        Args:
+            *records (dict): The records.
+        """
+        if not records:
+            return
+
+        self._submit(False, _encode(records))
+        self._pending += len(records)
+
+    ####################################################################################
+    def close(self) -> None:
+        """Wait for the writer thread to finish the queued writes and close the log
+        file. The log is reopened by the next append.
+        """
+        with self._lock:
+            writer, self._writer = self._writer, None
+
+        if writer is not None:
+            self._jobs.put(None)
+            writer.join()
+
+    ####################################################################################
+    def compact(self, records: list) -> None:
+        """Queue replacing the log with a snapshot. An empty snapshot removes the file.
+
+        Args:
+            records (list): Records that rebuild the queue as it is now.
+        """
+        self._submit(True, _encode(records))
+        self._pending = 0
+
+    ####################################################################################
+    def due(self, live: int = 0) -> bool:
+        """Check if the log should be compacted. Compaction waits for at least
+        compact_every records, and for more records than twice the live entries, so
+        its cost stays proportional to the appends.
+
+        Args:
+            live (int, optional): Entries a snapshot would hold. Defaults to 0.
+
+        Returns:
+            bool: True if the log should be compacted, else False.
+        """
+        return self._pending >= max(self.compact_every, 2 * live)
+
+    ####################################################################################
+    def load(self) -> list:
+        """Read the records in the log, once the queued writes are done.
+
+        Returns:
+            list: The records in the order they were written, empty if there is no log.
+        """
+        self.close()
+        try:
+            with open(self.path, mode="r", encoding="utf-8") as fp:
+                lines = fp.read().splitlines()
+
+        except FileNotFoundError:
+            lines = []
+
+        except OSError as err:
+            logger.warning(f"Unable to read queue journal {self.path}: {err}")
+            lines = []
+
+        # Decoding the whole log as one array is several times faster than line by
+        # line, which is only needed to skip a torn record.
+        try:
+            records = json.loads(f"[{','.join(lines)}]")
+
+        except ValueError:
+            records = []
+            for line in lines:
+                try:
+                    records.append(json.loads(line))
+
+                except ValueError:
+                    logger.warning(f"Skipping torn record in {self.path}")
+
+        self._pending = len(records)
+
+        return records
+
+    ####################################################################################
+    def _compact(self, text: str) -> None:
+        """Swap a snapshot in for the log. Runs on the writer thread.
+
+        Args:
+            text (str): The encoded snapshot, empty to remove the log.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+        if not text:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+            return
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(f"{self.path}.tmp", mode="w", encoding="utf-8") as fp:
+            fp.write(text)
+            fp.flush()
+            os.fsync(fp.fileno())
+
+        os.replace(f"{self.path}.tmp", self.path)
+
+    ####################################################################################
+    def _drain(self) -> None:
+        """Carry out queued writes until close() sends None. Runs on the writer thread."""
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+
+            compact, text = job
+            try:
+                if compact:
+                    self._compact(text)
+                    continue
+
+                if self._file is None:
+                    os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                    self._file = open(self.path, mode="a", encoding="utf-8")
+
+                self._file.write(text)
+                if self._jobs.empty():
+                    self._file.flush()
+
+            except OSError as err:
+                action = "compact" if compact else "write"
+                logger.warning(f"Unable to {action} queue journal {self.path}: {err}")
+
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    ####################################################################################
+    def _submit(self, compact: bool, text: str) -> None:
+        """Queue a write for the writer thread, starting it if it is not running.
+
+        Args:
+            compact (bool): True to replace the log with text, False to append it.
+            text (str): Encoded records.
+        """
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._drain, name="journal-writer", daemon=True
+                )
+                self._writer.start()
+
+            self._jobs.put((compact, text))
+
+    ####################################################################################
+    #                               Static Methods                                     #
+    ####################################################################################
+    @staticmethod
+    def waiting(directory: str) -> list:
+        """Find the journals left in a directory, e.g. by the previous run.
+
+        Args:
+            directory (str): Directory the journals are kept in.
+
+        Returns:
+            list: Names of the journals without their .jsonl extension, sorted.
+        """
+        try:
+            names = os.listdir(directory)
+
+        except OSError:
+            return []
+
+        return sorted(name[:-6] for name in names if name.endswith(".jsonl"))
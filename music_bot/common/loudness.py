@@ -0,0 +1,207 @@
+# Standard library imports.
+import asyncio
+import logging
+import re
+import shutil
+from typing import Awaitable, Callable, Union
+
+from music_bot.common.store import LoudnessStore
+
+logger = logging.getLogger(__name__)
+
+
+########################################################################################
+class LoudnessAnalyzer:
+    """Measures the EBU R128 integrated loudness of each track once, in the background,
+    with FFmpeg's ebur128 filter at low CPU priority. Tracks are measured from their
+    copy in the track cache when there is one, so measuring costs no extra download.
+    The resulting gain towards the target loudness is stored per video id and applied
+    as a static volume when a source is created, so no loudness filter runs during
+    playback. Tracks that have not been analysed yet play at unity gain.
+
+    Store lookups run through run_blocking and their results, misses included, are kept
+    in memory, so each track is looked up at most once per run. The stored count is
+    read once at start up and kept up to date from there.
+    """
+
+    INTEGRATED_REGEX = re.compile(r"I:\s+(-?[\d.]+|-inf) LUFS")
+    PEAK_REGEX = re.compile(r"Peak:\s+(-?[\d.]+|-inf) dBFS")
+
+    def __init__(
+        self,
+        store: LoudnessStore,
+        target: float = -14.0,
+        ceiling: float = -1.0,
+        tolerance: float = 1.0,
+        workers: int = 1,
+        run_blocking: Union[Callable[..., Awaitable], None] = None,
+    ):
+        self.ceiling = ceiling
+        self.run_blocking = run_blocking or asyncio.to_thread
+        self.store = store
+        self.target = target
+        self.tolerance = tolerance
+
+        # Stored gain per video id, None for tracks not analysed yet.
+        self._gains = {}
+        self._pending = {}
+
+        # FFmpeg is started through nice rather than renicing in a preexec_fn, which
+        # is not safe to run in a process with threads.
+        self._nice = ["nice", "-n", "10"] if shutil.which("nice") else []
+        self._semaphore = asyncio.Semaphore(workers)
+        self._stats = {"analysed": 0, "failures": 0}
+        self._stored = store.count()
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def stats(self) -> dict:
+        """Analyzer counters.
+
+        Returns:
+            dict: Analysed and failure counters for this run, the number of tracks
+                waiting for analysis and the number of tracks stored.
+        """
+        return {
+            **self._stats,
+            "pending": len(self._pending),
+            "stored": self._stored,
+        }
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    async def gain(self, video_id: str) -> float:
+        """Get the linear gain to play a track at. Gains within the tolerance of unity
+        are rounded to it, so Opus passthrough can still copy those tracks.
+
+        Args:
+            video_id (str): YouTube id of the video.
+
+        Returns:
+            float: Linear gain, 1.0 if the track has not been analysed.
+        """
+        gain = await self._stored_gain(video_id)
+        if gain is None or abs(gain) < self.tolerance:
+            return 1.0
+
+        return 10 ** (gain / 20)
+
+    ####################################################################################
+    async def schedule(self, video_id: str, url: str) -> None:
+        """Analyse a track in the background, unless it has already been analysed or is
+        waiting to be.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            url (str): Stream url or local path of the track.
+        """
+        # The pending check comes last, the track may be scheduled during the lookup.
+        if await self._stored_gain(video_id) is not None or video_id in self._pending:
+            return
+
+        task = asyncio.create_task(self._analyse(video_id, url))
+        self._pending[video_id] = task
+        task.add_done_callback(lambda _: self._pending.pop(video_id, None))
+
+    ####################################################################################
+    async def _analyse(self, video_id: str, url: str) -> None:
+        """Measure a track and store its gain.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            url (str): Stream url or local path of the track.
+        """
+        async with self._semaphore:
+            try:
+                measured = await self._measure(url)
+
+            except OSError as err:
+                self._stats["failures"] += 1
+                logger.warning(f"Unable to analyse loudness of {video_id}: {err}")
+                return
+
+        if measured is None:
+            self._stats["failures"] += 1
+            logger.warning(f"No loudness measured for {video_id}.")
+            return
+
+        integrated, peak = measured
+
+        # Aim for the target loudness without pushing the peak over the ceiling.
+        gain = min(self.target - integrated, self.ceiling - peak)
+        await self.run_blocking(self.store.put, video_id, integrated, peak, gain)
+        self._gains[video_id] = gain
+        self._stats["analysed"] += 1
+        self._stored += 1
+
+    ####################################################################################
+    async def _measure(self, url: str) -> Union[tuple, None]:
+        """Run the ebur128 filter over a track.
+
+        Args:
+            url (str): Stream url or local path of the track.
+
+        Raises:
+            OSError: Raised if FFmpeg could not be run or failed.
+
+        Returns:
+            Union[tuple, None]: Integrated loudness in LUFS and peak in dBFS, or None if
+                the track was silent.
+        """
+        before_options = []
+        if url.startswith(("http://", "https://")):
+            before_options = ["-reconnect", "1", "-reconnect_streamed", "1"]
+
+        process = await asyncio.create_subprocess_exec(
+            *self._nice,
+            "ffmpeg",
+            "-nostdin",
+            "-nostats",
+            "-hide_banner",
+            *before_options,
+            *("-i", url, "-vn", "-af", "ebur128=peak=sample", "-f", "null", "-"),
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            _, stderr = await process.communicate()
+
+        except asyncio.CancelledError:
+            if process.returncode is None:
+                process.kill()
+
+            raise
+
+        output = stderr.decode(errors="replace")
+        if process.returncode != 0:
+            raise OSError(output.strip().splitlines()[-1] if output.strip() else "")
+
+        # The summary printed at the end holds the values for the whole track.
+        summary = output[output.rfind("Summary:") :]
+        integrated = self.INTEGRATED_REGEX.search(summary)
+        peak = self.PEAK_REGEX.search(summary)
+        if not integrated or not peak or "inf" in integrated.group(1):
+            return None
+
+        return float(integrated.group(1)), float(peak.group(1).replace("-inf", "-99"))
+
+    ####################################################################################
+    async def _stored_gain(self, video_id: str) -> Union[float, None]:
+        """Get the stored gain of a track, looking it up once per run.
+
+        Args:
+            video_id (str): YouTube id of the video.
+
+        Returns:
+            Union[float, None]: Gain in dB, or None if the track has not been analysed.
+        """
+        if video_id not in self._gains:
+            gain = await self.run_blocking(self.store.gain, video_id)
+
+            # An analysis that finished during the lookup has the newer value.
+            self._gains.setdefault(video_id, gain)
+
+        return self._gains[video_id]
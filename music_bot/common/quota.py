@@ -0,0 +1,249 @@
+# Standard library imports.
+import asyncio
+import logging
+import sqlite3
+import time
+from datetime import datetime, timedelta, timezone, tzinfo
+from typing import Awaitable, Callable, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from music_bot.common.exceptions import QuotaError
+from music_bot.common.store import QuotaStore
+
+logger = logging.getLogger(__name__)
+
+
+########################################################################################
+def _quota_timezone() -> tzinfo:
+    """YouTube Data API quota resets at midnight Pacific time.
+
+    Returns:
+        tzinfo: Pacific time, or a fixed UTC-8 offset if tz data is unavailable.
+    """
+    try:
+        return ZoneInfo("America/Los_Angeles")
+
+    except ZoneInfoNotFoundError:
+        return timezone(timedelta(hours=-8))
+
+
+########################################################################################
+class QuotaTracker:
+    """Accounts for the quota units spent on each YouTube Data API endpoint against a
+    daily budget. Once the remaining budget drops into the reserve, requests are paced
+    by a token bucket that refills at the rate spreading what is left over the rest of
+    the quota day, and holds up to burst units so a multi-page load goes through at
+    once. Requests that would have to wait longer than max_delay, or that would
+    overrun the budget, raise QuotaError so callers can fall back to cached data
+    instead. Unit costs are documented here:
+    https://developers.google.com/youtube/v3/determine_quota_cost
+
+    With a store the spend is persisted per quota day, so a restart does not hand out
+    the day's budget again.
+    """
+
+    COSTS = {
+        "youtube.playlistItems.list": 1,
+        "youtube.playlists.list": 1,
+        "youtube.videos.list": 1,
+    }
+
+    TIMEZONE = _quota_timezone()
+
+    def __init__(
+        self,
+        budget: int = 10000,
+        reserve: float = 0.1,
+        max_delay: float = 30.0,
+        burst: int = 50,
+        store: Union[QuotaStore, None] = None,
+        run_blocking: Union[Callable[..., Awaitable], None] = None,
+    ):
+        self.budget = budget
+        self.burst = burst
+        self.max_delay = max_delay
+        self.reserve = reserve
+        self.run_blocking = run_blocking or asyncio.to_thread
+        self.store = store
+
+        self._day = self._today()
+        self._loaded = ""
+        self._lock = asyncio.Lock()
+        self._refilled = time.monotonic()
+        self._spent = {}
+        self._throttled = 0
+        self._tokens = float(burst)
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def remaining(self) -> int:
+        """Quota units left for the current quota day.
+
+        Returns:
+            int: Quota units left for the current quota day.
+        """
+        self._roll_over()
+
+        return max(self.budget - self.spent, 0)
+
+    ####################################################################################
+    @property
+    def resets_in(self) -> float:
+        """Seconds until the quota day rolls over.
+
+        Returns:
+            float: Seconds until the quota day rolls over.
+        """
+        now = datetime.now(self.TIMEZONE)
+        midnight = datetime.combine(
+            now.date() + timedelta(days=1), datetime.min.time(), tzinfo=self.TIMEZONE
+        )
+
+        return (midnight - now).total_seconds()
+
+    ####################################################################################
+    @property
+    def spent(self) -> int:
+        """Quota units spent during the current quota day.
+
+        Returns:
+            int: Quota units spent during the current quota day.
+        """
+        self._roll_over()
+
+        return sum(self._spent.values())
+
+    ####################################################################################
+    @property
+    def throttled(self) -> bool:
+        """Check if requests are currently being paced.
+
+        Returns:
+            bool: True if the remaining budget is within the reserve, else False.
+        """
+        return self.remaining <= self.budget * self.reserve
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    async def acquire(self, endpoint: str) -> None:
+        """Reserve the quota for a single request, waiting for the bucket to refill if
+        the budget is running low and the burst has been used up.
+
+        Args:
+            endpoint (str): API method id, e.g. youtube.videos.list.
+
+        Raises:
+            QuotaError: Raised if the request would exceed the budget or would have to
+                wait longer than max_delay.
+        """
+        cost = self.COSTS.get(endpoint, 1)
+        delay = 0.0
+        async with self._lock:
+            await self._load()
+            if cost > self.remaining:
+                raise QuotaError(
+                    f"Daily YouTube quota exhausted, resets in "
+                    f"{self.resets_in / 3600:.1f} hours."
+                )
+
+            if self.throttled:
+                # The bucket goes negative for requests waiting on it, so the ones
+                # after them wait for their own units on top.
+                rate = self.remaining / self.resets_in
+                now = time.monotonic()
+                self._tokens = min(
+                    self._tokens + (now - self._refilled) * rate, self.burst
+                )
+                self._refilled = now
+                delay = max(cost - self._tokens, 0.0) / rate
+                if delay > self.max_delay:
+                    raise QuotaError("YouTube quota is low, request deferred.")
+
+                self._tokens -= cost
+                self._throttled += 1
+
+            self._spent[endpoint] = self._spent.get(endpoint, 0) + cost
+            day = self._day
+
+        # The units and the bucket's tokens are reserved under the lock, the wait is
+        # not, so other requests can reserve theirs meanwhile.
+        if self.store is not None:
+            try:
+                await self.run_blocking(self.store.add, day, endpoint, cost)
+
+            except sqlite3.Error as err:
+                logger.warning(f"Unable to save quota spend: {err}")
+
+        await asyncio.sleep(delay)
+
+    ####################################################################################
+    async def load(self) -> None:
+        """Load the spend saved for the current quota day, if it has not been loaded
+        yet. acquire() does this itself, reports call it first.
+        """
+        async with self._lock:
+            await self._load()
+
+    ####################################################################################
+    def report(self) -> dict:
+        """Summarise the current quota day.
+
+        Returns:
+            dict: Budget, spend per endpoint, remaining units, throttled request count,
+                and seconds until reset.
+        """
+        self._roll_over()
+
+        return {
+            "budget": self.budget,
+            "endpoints": dict(self._spent),
+            "remaining": self.remaining,
+            "resets_in": self.resets_in,
+            "spent": self.spent,
+            "throttled": self._throttled,
+        }
+
+    ####################################################################################
+    async def _load(self) -> None:
+        """Load the spend saved for the current quota day once per day, dropping the
+        spend of earlier days. Must be called with the lock held.
+        """
+        self._roll_over()
+        if self.store is None or self._loaded == self._day:
+            return
+
+        day = self._day
+        try:
+            await self.run_blocking(self.store.prune, day)
+            spent = await self.run_blocking(self.store.spent, day)
+
+        except sqlite3.Error as err:
+            logger.warning(f"Unable to load quota spend: {err}")
+            return
+
+        self._loaded = day
+        for endpoint, units in spent.items():
+            self._spent[endpoint] = self._spent.get(endpoint, 0) + units
+
+    ####################################################################################
+    def _roll_over(self) -> None:
+        """Reset the spend counters when a new quota day starts."""
+        today = self._today()
+        if today != self._day:
+            self._day = today
+            self._refilled = time.monotonic()
+            self._spent = {}
+            self._throttled = 0
+            self._tokens = float(self.burst)
+
+    ####################################################################################
+    def _today(self) -> str:
+        """Current quota day.
+
+        Returns:
+            str: ISO date of the current quota day in Pacific time.
+        """
+        return datetime.now(self.TIMEZONE).date().isoformat()
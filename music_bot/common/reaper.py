@@ -0,0 +1,235 @@
+# Standard library imports.
+import asyncio
+import logging
+import os
+import signal
+from typing import Union
+
+# Third party imports.
+from discord.ext import commands
+
+from music_bot.common.classes import AudioStateRegistry, YTDLSource
+
+logger = logging.getLogger(__name__)
+
+
+########################################################################################
+def _pipes(pid: Union[int, str], fds: Union[tuple, None] = None) -> set:
+    """Get the pipes a process has open.
+
+    Args:
+        pid (Union[int, str]): Process id, or "self".
+        fds (Union[tuple, None], optional): Only look at these descriptors. Defaults to
+            None, which looks at all of them.
+
+    Returns:
+        set: pipe:[inode] links of the open pipes.
+    """
+    directory = f"/proc/{pid}/fd"
+    pipes = set()
+    try:
+        names = os.listdir(directory) if fds is None else [str(fd) for fd in fds]
+
+    except OSError:
+        return pipes
+
+    for name in names:
+        try:
+            link = os.readlink(f"{directory}/{name}")
+
+        except OSError:
+            continue
+
+        if link.startswith("pipe:"):
+            pipes.add(link)
+
+    return pipes
+
+
+########################################################################################
+def process_usage() -> dict:
+    """Get the resident memory and open file descriptors of this process.
+
+    Returns:
+        dict: Resident set size in bytes and descriptor count, None where /proc is not
+            available.
+    """
+    usage = {"fds": None, "rss": None}
+    try:
+        usage["fds"] = len(os.listdir("/proc/self/fd"))
+        with open("/proc/self/statm", mode="r", encoding="utf-8") as statm:
+            usage["rss"] = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    except (OSError, ValueError):
+        pass
+
+    return usage
+
+
+########################################################################################
+class ResourceReaper:
+    """Periodically reclaims what a long running bot would otherwise leak. Each run
+    tears down guild states idle for longer than their timeout, disconnects voice
+    clients no guild state owns, kills orphaned FFmpeg children, drops dead player
+    tasks and finished sources, and purges expired stream urls. The memory and
+    descriptor counts after each run are kept so leaks show up as growth in stats.
+
+    FFmpeg children are found through /proc. One is orphaned when this process no
+    longer holds any of the pipes on its standard streams, so nothing will read its
+    output or feed its input. On systems without /proc that check is skipped.
+    """
+
+    def __init__(
+        self, bot: commands.Bot, audio_states: AudioStateRegistry, interval=60.0
+    ):
+        self.audio_states = audio_states
+        self.bot = bot
+        self.interval = interval
+
+        self._last = {}
+        self._task = None
+        self._totals = {
+            "ffmpeg": 0,
+            "guilds": 0,
+            "runs": 0,
+            "sources": 0,
+            "streams": 0,
+            "tasks": 0,
+            "voice_clients": 0,
+        }
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def stats(self) -> dict:
+        """Reaper counters.
+
+        Returns:
+            dict: Totals reclaimed per kind since start up, and the report of the last
+                run under "last".
+        """
+        return {**self._totals, "last": dict(self._last)}
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    async def reap(self) -> dict:
+        """Run every reclaim step once.
+
+        Returns:
+            dict: Count reclaimed per kind, plus the resident memory and descriptor
+                count afterwards.
+        """
+        report = {
+            "ffmpeg": await self.bot.run_blocking(self.reap_ffmpeg),  # type: ignore
+            "guilds": await self.audio_states.reap(),
+            "sources": 0,
+            "streams": YTDLSource.streams.purge() if YTDLSource.streams else 0,
+            "tasks": 0,
+            "voice_clients": await self.reap_voice_clients(),
+        }
+        for state in self.audio_states:
+            reclaimed = state.reclaim()
+            report["sources"] += reclaimed["sources"]
+            report["tasks"] += reclaimed["tasks"]
+
+        self._totals["runs"] += 1
+        for kind, count in report.items():
+            self._totals[kind] += count
+
+        self._last = {
+            **report,
+            **await self.bot.run_blocking(process_usage),  # type: ignore
+        }
+        if any(report.values()):
+            logger.info(f"Reaper reclaimed {report}")
+
+        return dict(self._last)
+
+    ####################################################################################
+    def reap_ffmpeg(self) -> int:
+        """Kill the FFmpeg children that are no longer connected to this process. This
+        scans /proc, so reap() runs it through the bot's run_blocking.
+
+        Returns:
+            int: Number of processes killed.
+        """
+        if not os.path.isdir("/proc/self/fd"):
+            return 0
+
+        ours = _pipes("self")
+        pid = os.getpid()
+        killed = 0
+        for child in os.listdir("/proc"):
+            if not child.isdigit():
+                continue
+
+            try:
+                with open(f"/proc/{child}/stat", mode="r", encoding="utf-8") as stat:
+                    comm, fields = stat.read().rsplit(")", 1)
+
+            except OSError:
+                continue
+
+            state, ppid = fields.split()[:2]
+            if int(ppid) != pid or not comm.endswith("(ffmpeg") or state == "Z":
+                continue
+
+            pipes = _pipes(child, (0, 1, 2))
+            if not pipes or pipes & ours:
+                continue
+
+            try:
+                os.kill(int(child), signal.SIGKILL)
+                killed += 1
+
+            except OSError:
+                continue
+
+        return killed
+
+    ####################################################################################
+    async def reap_voice_clients(self) -> int:
+        """Disconnect the voice clients no guild state owns, e.g. ones left behind by
+        a state that was torn down while its voice client was reconnecting.
+
+        Returns:
+            int: Number of voice clients disconnected.
+        """
+        disconnected = 0
+        for voice in list(self.bot.voice_clients):
+            state = self.audio_states.get(voice.guild.id)  # type: ignore
+
+            # A state without a voice client may be connecting right now.
+            if state is not None and (state.voice is None or state.voice is voice):
+                continue
+
+            await voice.disconnect(force=True)
+            disconnected += 1
+
+        return disconnected
+
+    ####################################################################################
+    def start(self) -> None:
+        """Start reaping every interval seconds."""
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._reap_forever())
+
+    ####################################################################################
+    def stop(self) -> None:
+        """Stop reaping."""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    ####################################################################################
+    async def _reap_forever(self) -> None:
+        """Reap every interval seconds until stopped."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reap()
+
+            except Exception as err:  # pylint: disable=broad-except
+                logger.warning(f"Reaper run failed: {err}")
@@ -0,0 +1,286 @@
+# Standard library imports.
+import bisect
+import itertools
+from typing import Any, Iterable, Iterator, Union
+
+
+########################################################################################
+class IndexedSortedList:
+    """Sorted list with logarithmic positional access. Items are kept in sorted blocks
+    of between load / 2 and 2 * load items, so inserting or removing only shifts the
+    items of one block. A Fenwick tree over the block lengths finds the block holding
+    a position in O(log blocks), and is rebuilt in O(blocks) whenever a block is split
+    or merged, which happens at most once every load / 2 changes.
+    """
+
+    def __init__(self, iterable: Iterable = (), load: int = 256):
+        self.load = load
+
+        self._blocks = []
+        self._len = 0
+        self._maxes = []
+        self._tree = [0]
+        self.update(iterable)
+
+    def __bool__(self) -> bool:
+        return self._len > 0
+
+    def __delitem__(self, index: int) -> None:
+        self.pop(index)
+
+    def __getitem__(self, index: Union[int, slice]) -> Any:
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._len)
+            if step == 1:
+                return list(self.islice(start, stop))
+
+            return [self[position] for position in range(start, stop, step)]
+
+        block, offset = self._locate(index)
+
+        return self._blocks[block][offset]
+
+    def __iter__(self) -> Iterator:
+        return itertools.chain.from_iterable(self._blocks)
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __repr__(self):
+        return f"IndexedSortedList({list(self)!r})"
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def add(self, item: Any) -> None:
+        """Insert an item at its sorted position.
+
+        Args:
+            item (Any): The item.
+        """
+        if not self._blocks:
+            self._blocks.append([item])
+            self._maxes.append(item)
+            self._len = 1
+            self._rebuild()
+            return
+
+        block = bisect.bisect_left(self._maxes, item)
+        if block == len(self._blocks):
+            block -= 1
+
+        bisect.insort(self._blocks[block], item)
+        self._maxes[block] = self._blocks[block][-1]
+        self._len += 1
+        if len(self._blocks[block]) > 2 * self.load:
+            self._split(block)
+        else:
+            self._grow(block, 1)
+
+    ####################################################################################
+    def bisect_left(self, item: Any) -> int:
+        """Find the position an item would be inserted at, before any equal items.
+
+        Args:
+            item (Any): The item.
+
+        Returns:
+            int: The position.
+        """
+        block = bisect.bisect_left(self._maxes, item)
+        if block == len(self._blocks):
+            return self._len
+
+        return self._prefix(block) + bisect.bisect_left(self._blocks[block], item)
+
+    ####################################################################################
+    def clear(self) -> None:
+        """Remove every item."""
+        self._blocks.clear()
+        self._len = 0
+        self._maxes.clear()
+        self._rebuild()
+
+    ####################################################################################
+    def islice(self, start: int = 0, stop: Union[int, None] = None) -> Iterator:
+        """Iterate over a range of positions without copying the items before it.
+
+        Args:
+            start (int, optional): First position. Defaults to 0.
+            stop (Union[int, None], optional): Position to stop before. Defaults to
+                None, which is the end.
+
+        Returns:
+            Iterator: The items in the range.
+        """
+        start, stop, _ = slice(start, stop).indices(self._len)
+        if start >= stop:
+            return iter(())
+
+        block, offset = self._locate(start)
+
+        return itertools.islice(
+            itertools.chain(
+                itertools.islice(self._blocks[block], offset, None),
+                *self._blocks[block + 1 :],
+            ),
+            stop - start,
+        )
+
+    ####################################################################################
+    def pop(self, index: int = -1) -> Any:
+        """Remove and return the item at a position.
+
+        Args:
+            index (int, optional): The position. Defaults to -1, the last item.
+
+        Raises:
+            IndexError: Raised if the position is out of range.
+
+        Returns:
+            Any: The item.
+        """
+        block, offset = self._locate(index)
+        item = self._blocks[block].pop(offset)
+        self._len -= 1
+        if not self._blocks[block]:
+            del self._blocks[block]
+            del self._maxes[block]
+            self._rebuild()
+
+        else:
+            self._maxes[block] = self._blocks[block][-1]
+            if len(self._blocks[block]) < self.load // 2 and len(self._blocks) > 1:
+                self._merge(block)
+            else:
+                self._grow(block, -1)
+
+        return item
+
+    ####################################################################################
+    def update(self, iterable: Iterable) -> None:
+        """Insert many items at once, re-sorting in bulk when that is cheaper.
+
+        Args:
+            iterable (Iterable): The items.
+        """
+        items = list(iterable)
+        if len(items) < self._len // 8 + 8:
+            for item in items:
+                self.add(item)
+
+            return
+
+        items.extend(self)
+        items.sort()
+        self._blocks = [
+            items[start : start + self.load]
+            for start in range(0, len(items), self.load)
+        ]
+        self._len = len(items)
+        self._maxes = [block[-1] for block in self._blocks]
+        self._rebuild()
+
+    ####################################################################################
+    def _grow(self, block: int, delta: int) -> None:
+        """Update the Fenwick tree for a change in a block's length.
+
+        Args:
+            block (int): Index of the block.
+            delta (int): Change in length.
+        """
+        node = block + 1
+        while node < len(self._tree):
+            self._tree[node] += delta
+            node += node & -node
+
+    ####################################################################################
+    def _locate(self, index: int) -> tuple:
+        """Find the block and offset of a position.
+
+        Args:
+            index (int): The position, negative counting from the end.
+
+        Raises:
+            IndexError: Raised if the position is out of range.
+
+        Returns:
+            tuple: Block index and offset within the block.
+        """
+        if index < 0:
+            index += self._len
+
+        if not 0 <= index < self._len:
+            raise IndexError("IndexedSortedList index out of range")
+
+        # Descend the Fenwick tree to the last block whose prefix is <= index.
+        block = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            node = block + step
+            if node < len(self._tree) and self._tree[node] <= index:
+                block = node
+                index -= self._tree[node]
+
+            step >>= 1
+
+        return block, index
+
+    ####################################################################################
+    def _merge(self, block: int) -> None:
+        """Merge a block that has become too small into a neighbour.
+
+        Args:
+            block (int): Index of the block.
+        """
+        if block == len(self._blocks) - 1:
+            block -= 1
+
+        self._blocks[block].extend(self._blocks.pop(block + 1))
+        del self._maxes[block + 1]
+        self._maxes[block] = self._blocks[block][-1]
+        if len(self._blocks[block]) > 2 * self.load:
+            self._split(block)
+        else:
+            self._rebuild()
+
+    ####################################################################################
+    def _prefix(self, block: int) -> int:
+        """Count the items in the blocks before a block.
+
+        Args:
+            block (int): Index of the block.
+
+        Returns:
+            int: Number of items.
+        """
+        total = 0
+        while block > 0:
+            total += self._tree[block]
+            block -= block & -block
+
+        return total
+
+    ####################################################################################
+    def _rebuild(self) -> None:
+        """Build the Fenwick tree over the block lengths."""
+        tree = [0] + [len(block) for block in self._blocks]
+        for node in range(1, len(tree)):
+            parent = node + (node & -node)
+            if parent < len(tree):
+                tree[parent] += tree[node]
+
+        self._tree = tree
+
+    ####################################################################################
+    def _split(self, block: int) -> None:
+        """Split a block that has grown too large in half.
+
+        Args:
+            block (int): Index of the block.
+        """
+        items = self._blocks[block]
+        half = len(items) // 2
+        self._blocks[block : block + 1] = [items[:half], items[half:]]
+        self._maxes[block : block + 1] = [items[half - 1], items[-1]]
+        self._rebuild()
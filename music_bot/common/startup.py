@@ -0,0 +1,101 @@
+# Standard library imports.
+import time
+from typing import Union
+
+
+########################################################################################
+class StartupTimer:
+    """Times the phases of bringing the bot up, from the first line of the script to the
+    gateway reporting ready. Phases are marked in order and each one takes the time
+    since the previous mark. Work started in the background, such as warming up the
+    extractor workers, overlaps the phases and is recorded separately.
+    """
+
+    def __init__(self, started: Union[float, None] = None):
+        self.started = time.perf_counter() if started is None else started
+
+        self._background = []
+        self._finished = False
+        self._last = self.started
+        self._phases = []
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def finished(self) -> bool:
+        """Whether the last phase has been marked.
+
+        Returns:
+            bool: True once finish() has been called, else False.
+        """
+        return self._finished
+
+    ####################################################################################
+    @property
+    def phases(self) -> list:
+        """The phases marked so far.
+
+        Returns:
+            list: (name, seconds) tuples in the order they were marked.
+        """
+        return list(self._phases)
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def finish(self, name: str) -> str:
+        """Mark the last phase.
+
+        Args:
+            name (str): Name of the phase that just ended.
+
+        Returns:
+            str: The startup report.
+        """
+        self.mark(name)
+        self._finished = True
+
+        return self.report()
+
+    ####################################################################################
+    def mark(self, name: str) -> None:
+        """End a phase.
+
+        Args:
+            name (str): Name of the phase that just ended.
+        """
+        now = time.perf_counter()
+        self._phases.append((name, now - self._last))
+        self._last = now
+
+    ####################################################################################
+    def record(self, name: str, seconds: float) -> None:
+        """Record background work that ran alongside the phases.
+
+        Args:
+            name (str): Name of the work.
+            seconds (float): Seconds the work took.
+        """
+        self._background.append((name, seconds))
+
+    ####################################################################################
+    def report(self) -> str:
+        """Format the phases for logging.
+
+        Returns:
+            str: One line per phase and background job, plus the total.
+        """
+        width = max(
+            (len(name) for name, _ in self._phases + self._background), default=0
+        )
+        lines = [f"Startup took {self._last - self.started:.3f}s:"]
+        lines.extend(
+            f"  {name:<{width}}  {seconds:7.3f}s" for name, seconds in self._phases
+        )
+        lines.extend(
+            f"  {name:<{width}}  {seconds:7.3f}s (background)"
+            for name, seconds in self._background
+        )
+
+        return "\n".join(lines)
@@ -0,0 +1,381 @@
+# Standard library imports.
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Union
+
+
+########################################################################################
+class Store:
+    """Thread safe wrapper around the on-disk SQLite database shared by the bot caches.
+    Subclasses provide their tables through the SCHEMA class member.
+    """
+
+    SCHEMA = ""
+
+    def __init__(self, path: str):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.executescript(self.SCHEMA)
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+########################################################################################
+class PlaylistStore(Store):
+    """Persistent cache of raw playlistItems pages keyed by playlist id. Each page is
+    stored with the ETag it was served with so a refresh can request it conditionally
+    and only rewrite the pages that changed.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS playlists (
+            playlist_id TEXT PRIMARY KEY,
+            refreshed REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS playlist_pages (
+            playlist_id TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            page_token TEXT NOT NULL,
+            next_token TEXT,
+            etag TEXT NOT NULL,
+            PRIMARY KEY (playlist_id, page)
+        );
+        CREATE TABLE IF NOT EXISTS playlist_items (
+            playlist_id TEXT NOT NULL,
+            page INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            item TEXT NOT NULL,
+            PRIMARY KEY (playlist_id, page, position)
+        );
+    """
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def finish_refresh(self, playlist_id: str, page_count: int) -> None:
+        """Mark a playlist as refreshed and drop any pages past the new last page.
+
+        Args:
+            playlist_id (str): YouTube playlist id.
+            page_count (int): Number of pages the playlist now has.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM playlist_pages WHERE playlist_id = ? AND page >= ?",
+                (playlist_id, page_count),
+            )
+            self._conn.execute(
+                "DELETE FROM playlist_items WHERE playlist_id = ? AND page >= ?",
+                (playlist_id, page_count),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlists (playlist_id, refreshed) VALUES (?, ?)",
+                (playlist_id, time.time()),
+            )
+
+    ####################################################################################
+    def page_items(self, playlist_id: str, page: int) -> list:
+        """Get the cached items of a single page.
+
+        Args:
+            playlist_id (str): YouTube playlist id.
+            page (int): Zero based page number.
+
+        Returns:
+            list: Raw playlistItems resources.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT item FROM playlist_items WHERE playlist_id = ? AND page = ? "
+                "ORDER BY position",
+                (playlist_id, page),
+            ).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+    ####################################################################################
+    def pages(self, playlist_id: str) -> dict:
+        """Get the cached page index of a playlist.
+
+        Args:
+            playlist_id (str): YouTube playlist id.
+
+        Returns:
+            dict: Page number -> dict with the page_token, next_token and etag.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page, page_token, next_token, etag FROM playlist_pages "
+                "WHERE playlist_id = ?",
+                (playlist_id,),
+            ).fetchall()
+
+        return {
+            page: {"page_token": page_token, "next_token": next_token, "etag": etag}
+            for page, page_token, next_token, etag in rows
+        }
+
+    ####################################################################################
+    def refreshed(self, playlist_id: str) -> Union[float, None]:
+        """Get the time a playlist was last refreshed.
+
+        Args:
+            playlist_id (str): YouTube playlist id.
+
+        Returns:
+            Union[float, None]: Unix timestamp of the last refresh, or None if the
+                playlist has never been cached.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT refreshed FROM playlists WHERE playlist_id = ?", (playlist_id,)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    ####################################################################################
+    def replace_page(
+        self,
+        playlist_id: str,
+        page: int,
+        page_token: str,
+        next_token: Union[str, None],
+        etag: str,
+        items: list,
+    ) -> None:
+        """Replace a single cached page with a freshly fetched one.
+
+        Args:
+            playlist_id (str): YouTube playlist id.
+            page (int): Zero based page number.
+            page_token (str): Token used to request the page.
+            next_token (Union[str, None]): Token of the following page, if any.
+            etag (str): ETag the page was served with.
+            items (list): Raw playlistItems resources on the page.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM playlist_items WHERE playlist_id = ? AND page = ?",
+                (playlist_id, page),
+            )
+            self._conn.executemany(
+                "INSERT INTO playlist_items (playlist_id, page, position, item) "
+                "VALUES (?, ?, ?, ?)",
+                (
+                    (playlist_id, page, position, json.dumps(item))
+                    for position, item in enumerate(items)
+                ),
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO playlist_pages "
+                "(playlist_id, page, page_token, next_token, etag) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (playlist_id, page, page_token, next_token, etag),
+            )
+
+
+########################################################################################
+class LoudnessStore(Store):
+    """Persistent table of per-track loudness measurements keyed by video id."""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS loudness (
+            video_id TEXT PRIMARY KEY,
+            integrated REAL NOT NULL,
+            peak REAL NOT NULL,
+            gain REAL NOT NULL,
+            analysed REAL NOT NULL
+        );
+    """
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def count(self) -> int:
+        """Get the number of analysed tracks.
+
+        Returns:
+            int: Number of analysed tracks.
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM loudness").fetchone()[0]
+
+    ####################################################################################
+    def gain(self, video_id: str) -> Union[float, None]:
+        """Get the stored gain of a track.
+
+        Args:
+            video_id (str): YouTube id of the video.
+
+        Returns:
+            Union[float, None]: Gain in dB, or None if the track was never analysed.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT gain FROM loudness WHERE video_id = ?", (video_id,)
+            ).fetchone()
+
+        return row[0] if row else None
+
+    ####################################################################################
+    def put(self, video_id: str, integrated: float, peak: float, gain: float) -> None:
+        """Store the measurements of a track.
+
+        Args:
+            video_id (str): YouTube id of the video.
+            integrated (float): Integrated loudness in LUFS.
+            peak (float): Peak level in dBFS.
+            gain (float): Gain to apply in dB.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO loudness "
+                "(video_id, integrated, peak, gain, analysed) VALUES (?, ?, ?, ?, ?)",
+                (video_id, integrated, peak, gain, time.time()),
+            )
+
+
+########################################################################################
+class QuotaStore(Store):
+    """Persistent YouTube API quota spend per quota day and endpoint, so the spend
+    survives restarts within the day.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS quota_spend (
+            day TEXT NOT NULL,
+            endpoint TEXT NOT NULL,
+            units INTEGER NOT NULL,
+            PRIMARY KEY (day, endpoint)
+        );
+    """
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def add(self, day: str, endpoint: str, units: int) -> None:
+        """Add to the spend of an endpoint.
+
+        Args:
+            day (str): ISO date of the quota day.
+            endpoint (str): API method id, e.g. youtube.videos.list.
+            units (int): Quota units spent.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO quota_spend (day, endpoint, units) VALUES (?, ?, ?) "
+                "ON CONFLICT (day, endpoint) DO UPDATE SET units = units + ?",
+                (day, endpoint, units, units),
+            )
+
+    ####################################################################################
+    def prune(self, day: str) -> None:
+        """Drop the spend of the quota days before a day.
+
+        Args:
+            day (str): ISO date of the first quota day to keep.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM quota_spend WHERE day < ?", (day,))
+
+    ####################################################################################
+    def spent(self, day: str) -> dict:
+        """Get the spend of a quota day.
+
+        Args:
+            day (str): ISO date of the quota day.
+
+        Returns:
+            dict: Endpoint -> quota units spent.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT endpoint, units FROM quota_spend WHERE day = ?", (day,)
+            ).fetchall()
+
+        return dict(rows)
+
+
+########################################################################################
+class ResumeStore(Store):
+    """Persistent resume point of the song each guild was last playing, with the info
+    it was resolved to, so playback can continue where it stopped after a restart.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS resume_points (
+            guild_id INTEGER PRIMARY KEY,
+            video_id TEXT NOT NULL,
+            position REAL NOT NULL,
+            info TEXT NOT NULL,
+            saved REAL NOT NULL
+        );
+    """
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def clear(self, guild_id: int) -> None:
+        """Drop the resume point of a guild.
+
+        Args:
+            guild_id (int): Discord guild id.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM resume_points WHERE guild_id = ?", (guild_id,)
+            )
+
+    ####################################################################################
+    def get(self, guild_id: int) -> Union[dict, None]:
+        """Get the resume point of a guild.
+
+        Args:
+            guild_id (int): Discord guild id.
+
+        Returns:
+            Union[dict, None]: Dict with the video_id, position in seconds and info
+                dict, or None if the guild has no resume point.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT video_id, position, info FROM resume_points WHERE guild_id = ?",
+                (guild_id,),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {"video_id": row[0], "position": row[1], "info": json.loads(row[2])}
+
+    ####################################################################################
+    def put(self, guild_id: int, video_id: str, position: float, info: dict) -> None:
+        """Save the resume point of a guild.
+
+        Args:
+            guild_id (int): Discord guild id.
+            video_id (str): YouTube id of the song playing.
+            position (float): Playback position in seconds.
+            info (dict): Info dict the song was resolved to.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO resume_points "
+                "(guild_id, video_id, position, info, saved) VALUES (?, ?, ?, ?, ?)",
+                (guild_id, video_id, position, json.dumps(info), time.time()),
+            )
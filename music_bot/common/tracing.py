@@ -0,0 +1,406 @@
+# Standard library imports.
+from __future__ import annotations
+
+import collections
+import contextlib
+import contextvars
+import json
+import logging
+import math
+import os
+import queue
+import secrets
+import threading
+import time
+from typing import Iterator, Union
+
+logger = logging.getLogger(__name__)
+
+# The span the running code belongs to. asyncio tasks copy it when they are created,
+# executor jobs only when submitted through contextvars.copy_context().run.
+_current = contextvars.ContextVar("span", default=None)
+
+
+########################################################################################
+def _otlp_value(value) -> dict:
+    """Wrap an attribute value the way OTLP/JSON types it.
+
+    Args:
+        value (Any): The attribute value.
+
+    Returns:
+        dict: The typed value.
+    """
+    if isinstance(value, bool):
+        return {"boolValue": value}
+
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+
+    if isinstance(value, float):
+        return {"doubleValue": value}
+
+    return {"stringValue": str(value)}
+
+
+########################################################################################
+class Span:
+    """One timed stage of the play pipeline. Spans of one request share a trace id and
+    point at the span they ran under through parent_id.
+    """
+
+    __slots__ = (
+        "attributes",
+        "end",
+        "name",
+        "parent_id",
+        "span_id",
+        "start",
+        "trace_id",
+    )
+
+    def __init__(self, name: str, parent: Union[Span, None] = None, **attributes):
+        self.attributes = attributes
+        self.end = None
+        self.name = name
+        self.parent_id = parent.span_id if parent is not None else ""
+        self.span_id = secrets.token_hex(8)
+        self.start = time.time_ns()
+        self.trace_id = parent.trace_id if parent is not None else secrets.token_hex(16)
+
+    def __repr__(self):
+        return f"Span(name={self.name!r}, trace_id={self.trace_id!r})"
+
+    ####################################################################################
+    #                                  Properties                                      #
+    ####################################################################################
+    @property
+    def duration(self) -> Union[float, None]:
+        """Seconds the span took.
+
+        Returns:
+            Union[float, None]: Duration in seconds, or None if it has not ended.
+        """
+        return (self.end - self.start) / 1e9 if self.end is not None else None
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def to_dict(self) -> dict:
+        """Convert the span to the OTLP/JSON span layout.
+
+        Returns:
+            dict: The span.
+        """
+        record = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": str(self.start),
+            "endTimeUnixNano": str(self.end),
+            "attributes": [
+                {"key": key, "value": _otlp_value(value)}
+                for key, value in sorted(self.attributes.items())
+            ],
+        }
+        if "error" in self.attributes:
+            record["status"] = {"code": 2, "message": str(self.attributes["error"])}
+
+        return record
+
+
+########################################################################################
+class Tracer:
+    """Records spans across the play pipeline, from the command that queued a song to
+    its first voice packet. The current span lives in a context variable, so spans
+    started in tasks and executor jobs nest under the span that spawned them. Ended
+    spans are appended to a JSONL file, one OTLP/JSON span per line, and the most
+    recent ones are kept in memory for percentile reports.
+
+    Spans end on the voice client's audio thread too, so the file is written by a
+    writer thread of its own and ending a span never waits on the disk.
+    """
+
+    def __init__(self):
+        self.max_bytes = 0
+        self.path = ""
+
+        self._file = None
+        self._file_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._pending = queue.SimpleQueue()
+        self._spans = collections.deque(maxlen=5000)
+        self._writer = None
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def close(self) -> None:
+        """Write the spans still waiting for the writer thread and close the file."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+
+        if writer is not None:
+            self._pending.put(None)
+            writer.join()
+
+        with self._file_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    ####################################################################################
+    def configure(
+        self, path: str = "", max_spans: int = 5000, max_bytes: int = 16 << 20
+    ) -> None:
+        """Set where spans are written and how many are kept in memory. The newest
+        spans already in the file are loaded, so reports survive restarts.
+
+        Args:
+            path (str, optional): JSONL file to append spans to. Defaults to "", which
+                only keeps spans in memory.
+            max_spans (int, optional): Spans kept in memory. Defaults to 5000.
+            max_bytes (int, optional): Size at which the file is rotated to path.1.
+                Defaults to 16 MiB.
+        """
+        self.close()
+        with self._lock, self._file_lock:
+            self.max_bytes = max_bytes
+            self.path = path
+            self._spans = collections.deque(maxlen=max_spans)
+            if not path:
+                return
+
+            if os.path.exists(path):
+                self._load(path)
+
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._file = open(path, mode="a", encoding="utf-8")
+
+    ####################################################################################
+    def current(self) -> Union[Span, None]:
+        """Get the span the running code belongs to.
+
+        Returns:
+            Union[Span, None]: The current span, or None outside of any span.
+        """
+        return _current.get()
+
+    ####################################################################################
+    def end_span(self, span: Span, **attributes) -> None:
+        """End a span started with start_span and record it. Ending a span twice has
+        no effect.
+
+        Args:
+            span (Span): The span.
+            **attributes: Attributes to add to the span.
+        """
+        if span.end is not None:
+            return
+
+        span.attributes.update(attributes)
+        span.end = time.time_ns()
+        self._write(span)
+
+    ####################################################################################
+    def percentiles(
+        self, names: Union[tuple, None] = None, quantiles: tuple = (50, 90, 99)
+    ) -> dict:
+        """Compute nearest-rank percentiles of the recent span durations.
+
+        Args:
+            names (Union[tuple, None], optional): Span names to report, in this order.
+                Defaults to None, which reports every name seen.
+            quantiles (tuple, optional): Percentiles to compute. Defaults to
+                (50, 90, 99).
+
+        Returns:
+            dict: Span name -> {"count": n, "p50": seconds, ...}.
+        """
+        with self._lock:
+            spans = list(self._spans)
+
+        durations = collections.defaultdict(list)
+        for name, seconds in spans:
+            durations[name].append(seconds)
+
+        report = {}
+        for name in names or sorted(durations):
+            values = sorted(durations.get(name, ()))
+            if not values:
+                continue
+
+            report[name] = {"count": len(values)}
+            for quantile in quantiles:
+                rank = max(math.ceil(quantile / 100 * len(values)), 1)
+                report[name][f"p{quantile}"] = values[rank - 1]
+
+        return report
+
+    ####################################################################################
+    def record(
+        self,
+        name: str,
+        start: int,
+        end: Union[int, None] = None,
+        parent: Union[Span, None] = None,
+        **attributes,
+    ) -> Span:
+        """Record a span after the fact, for stages measured without a live span such
+        as the time a song waited in the queue.
+
+        Args:
+            name (str): Name of the span.
+            start (int): Start time in Unix nanoseconds.
+            end (Union[int, None], optional): End time in Unix nanoseconds. Defaults
+                to None, which is now.
+            parent (Union[Span, None], optional): Parent span. Defaults to None, which
+                is the current span.
+            **attributes: Span attributes.
+
+        Returns:
+            Span: The recorded span.
+        """
+        span = Span(
+            name, parent if parent is not None else _current.get(), **attributes
+        )
+        span.start = start
+        span.end = end if end is not None else time.time_ns()
+        self._write(span)
+
+        return span
+
+    ####################################################################################
+    @contextlib.contextmanager
+    def span(
+        self, name: str, parent: Union[Span, None] = None, **attributes
+    ) -> Iterator[Span]:
+        """Time a block as a span that is current within the block. Exceptions leaving
+        the block are recorded on the span.
+
+        Args:
+            name (str): Name of the span.
+            parent (Union[Span, None], optional): Parent span. Defaults to None, which
+                is the current span.
+            **attributes: Span attributes.
+
+        Yields:
+            Span: The span.
+        """
+        span = self.start_span(name, parent, **attributes)
+        with self.use(span):
+            try:
+                yield span
+
+            except BaseException as err:
+                span.attributes["error"] = repr(err)
+                raise
+
+            finally:
+                self.end_span(span)
+
+    ####################################################################################
+    def start_span(
+        self, name: str, parent: Union[Span, None] = None, **attributes
+    ) -> Span:
+        """Start a span that is ended explicitly with end_span, for stages that end in
+        another task or thread. The span does not become current.
+
+        Args:
+            name (str): Name of the span.
+            parent (Union[Span, None], optional): Parent span. Defaults to None, which
+                is the current span.
+            **attributes: Span attributes.
+
+        Returns:
+            Span: The span.
+        """
+        return Span(
+            name, parent if parent is not None else _current.get(), **attributes
+        )
+
+    ####################################################################################
+    @contextlib.contextmanager
+    def use(self, span: Union[Span, None]) -> Iterator[None]:
+        """Make a span current within a block without ending it.
+
+        Args:
+            span (Union[Span, None]): The span.
+        """
+        token = _current.set(span)
+        try:
+            yield
+
+        finally:
+            _current.reset(token)
+
+    ####################################################################################
+    def _load(self, path: str) -> None:
+        """Load the durations of the newest spans in a span file.
+
+        Args:
+            path (str): JSONL span file.
+        """
+        with open(path, mode="r", encoding="utf-8") as fp:
+            for line in collections.deque(fp, maxlen=self._spans.maxlen):
+                try:
+                    record = json.loads(line)
+                    start = int(record["startTimeUnixNano"])
+                    end = int(record["endTimeUnixNano"])
+
+                except (KeyError, ValueError):
+                    continue
+
+                self._spans.append((record["name"], (end - start) / 1e9))
+
+    ####################################################################################
+    def _drain(self) -> None:
+        """Append queued spans to the file until close() sends None. Runs on the
+        writer thread.
+        """
+        while True:
+            span = self._pending.get()
+            if span is None:
+                return
+
+            with self._file_lock:
+                if self._file is None:
+                    continue
+
+                try:
+                    self._file.write(json.dumps(span.to_dict()) + "\n")
+                    if self._pending.empty():
+                        self._file.flush()
+
+                    if self.max_bytes and self._file.tell() >= self.max_bytes:
+                        self._file.close()
+                        os.replace(self.path, f"{self.path}.1")
+                        self._file = open(self.path, mode="a", encoding="utf-8")
+
+                except OSError as err:
+                    logger.warning(f"Unable to write span {span.name}: {err}")
+
+    ####################################################################################
+    def _write(self, span: Span) -> None:
+        """Keep an ended span for reports and queue it for the writer thread.
+
+        Args:
+            span (Span): The ended span.
+        """
+        with self._lock:
+            self._spans.append((span.name, span.duration))
+            if not self.path:
+                return
+
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._drain, name="tracer-writer", daemon=True
+                )
+                self._writer.start()
+
+            self._pending.put(span)
+
+
+# Tracer shared by the whole bot, configured from bot.py.
+tracer = Tracer()
@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+# Standard library imports.
+from typing import Union
+
+from music_bot.common.exceptions import YTDLError
+
+
+########################################################################################
+class TrackInfo:
+    """Compact record of the parts of a youtube_dl info dict that playback and the now
+    playing embed use. The info dict also carries every format, thumbnail and subtitle
+    track, often 100+ KB, so it is dropped as soon as this record is built.
+    """
+
+    # Record attribute -> youtube_dl info dict key.
+    FIELDS = {
+        "acodec": "acodec",
+        "description": "description",
+        "dislikes": "dislike_count",
+        "duration": "duration",
+        "likes": "like_count",
+        "tags": "tags",
+        "thumbnail": "thumbnail",
+        "title": "title",
+        "upload_date": "upload_date",
+        "uploader": "uploader",
+        "uploader_url": "uploader_url",
+        "url": "url",
+        "video_id": "id",
+        "views": "view_count",
+        "webpage_url": "webpage_url",
+    }
+
+    __slots__ = tuple(FIELDS)
+
+    def __init__(
+        self,
+        *,
+        title: str,
+        url: str,
+        acodec: str = "",
+        description: str = "",
+        dislikes: Union[int, None] = None,
+        duration: int = 0,
+        likes: Union[int, None] = None,
+        tags: tuple = (),
+        thumbnail: str = "",
+        upload_date: str = "",
+        uploader: str = "",
+        uploader_url: str = "",
+        video_id: str = "",
+        views: Union[int, None] = None,
+        webpage_url: str = "",
+    ):
+        self.acodec = acodec
+        self.description = description
+        self.dislikes = dislikes
+        self.duration = duration
+        self.likes = likes
+        self.tags = tags
+        self.thumbnail = thumbnail
+        self.title = title
+        self.upload_date = upload_date
+        self.uploader = uploader
+        self.uploader_url = uploader_url
+        self.url = url
+        self.video_id = video_id
+        self.views = views
+        self.webpage_url = webpage_url
+
+    def __repr__(self):
+        return f"TrackInfo(video_id={self.video_id!r}, title={self.title!r})"
+
+    ####################################################################################
+    #                             Instance Methods                                     #
+    ####################################################################################
+    def replace(self, **changes) -> TrackInfo:
+        """Copy the record with some fields changed.
+
+        Returns:
+            TrackInfo: The new record.
+        """
+        return TrackInfo(
+            **{**{field: getattr(self, field) for field in self.FIELDS}, **changes}
+        )
+
+    ####################################################################################
+    def to_dict(self) -> dict:
+        """Convert the record back to youtube_dl info dict keys, for JSON storage.
+
+        Returns:
+            dict: The record as an info dict.
+        """
+        record = {key: getattr(self, field) for field, key in self.FIELDS.items()}
+        record["tags"] = list(self.tags)
+
+        return record
+
+    ####################################################################################
+    #                                Class Methods                                     #
+    ####################################################################################
+    @classmethod
+    def from_dict(cls, info: dict) -> TrackInfo:
+        """Build the record from a youtube_dl info dict.
+
+        Args:
+            info (dict): youtube_dl info dict.
+
+        Raises:
+            YTDLError: Raised if the info has no title or stream url.
+
+        Returns:
+            TrackInfo: The record.
+        """
+        for key in ("title", "url"):
+            if not info.get(key):
+                raise YTDLError(f"Unable to get field {key} from YTDL.")
+
+        record = {
+            field: info[key]
+            for field, key in cls.FIELDS.items()
+            if info.get(key) is not None
+        }
+        record["duration"] = int(record.get("duration", 0))
+        record["tags"] = tuple(record.get("tags", ()))
+
+        return cls(**record)
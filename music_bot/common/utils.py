@@ -131,6 +131,7 @@ def get_config(args: argparse.Namespace) -> dict:
         "guild": guild,
         "playlist_regex": re.compile(r"[&?]list=(?P<playlist_id>[^&]+)"),
         "token": token,
+        "video_id_regex": re.compile(r"^[\w-]{11}$"),
         "video_regex": re.compile(
             r"^.*((youtu.be\/)|(v\/)|(\/u\/\w\/)|(embed\/)|(watch\?))\??v?=?(?P<video_id>[^#\&\?]*).*"
         ),
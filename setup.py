@@ -40,6 +40,7 @@ requirements = [
     "google-api-python-client==2.63.0",
     "google-auth-oauthlib==0.5.3",
     "google-auth-httplib2==0.1.0",
+    "numpy==1.23.4",
     "python-dotenv==0.21.0",
     "PyNaCl==1.5.0",
     "youtube_dl==2021.12.17",
@@ -49,6 +50,7 @@ setup(
     name="music-bot",
     description="Music bot for Discord.",
     packages=find_packages(),
+    python_requires=">=3.11",
     install_requires=requirements,
     setup_requires=requirements,
     version=find_version("__version__.py"),
@@ -0,0 +1,245 @@
+# Standard library imports.
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from music_bot.common.cache import StreamCache, TrackCache
+from music_bot.common.track import TrackInfo
+
+
+########################################################################################
+def make_info(expire: float, duration: int = 200) -> TrackInfo:
+    """Build the info of a track whose stream url expires at a time."""
+    return TrackInfo(
+        title="track",
+        url=f"https://r1.googlevideo.com/videoplayback?expire={int(expire)}&itag=251",
+        duration=duration,
+    )
+
+
+########################################################################################
+class TestStreamCache(unittest.TestCase):
+    """Tests for StreamCache expiry and eviction."""
+
+    def test_expiry_from_query(self):
+        self.assertEqual(
+            StreamCache.expiry(
+                "https://r1.googlevideo.com/videoplayback?ei=x&expire=1700000000&id=o"
+            ),
+            1700000000.0,
+        )
+
+    ####################################################################################
+    def test_expiry_from_path(self):
+        self.assertEqual(
+            StreamCache.expiry(
+                "https://manifest.googlevideo.com/api/manifest/dash/expire/1700000123/"
+                "ei/x/ip/1.2.3.4"
+            ),
+            1700000123.0,
+        )
+
+    ####################################################################################
+    def test_expiry_default_ttl(self):
+        for url in (
+            "https://example.com/track.webm",
+            "https://r1.googlevideo.com/videoplayback?expire=soon",
+        ):
+            with mock.patch("time.time", return_value=5000.0):
+                self.assertEqual(
+                    StreamCache.expiry(url), 5000.0 + StreamCache.DEFAULT_TTL
+                )
+
+    ####################################################################################
+    def test_served_only_while_url_outlives_the_track(self):
+        cache = StreamCache(margin=60.0)
+        now = time.time()
+        cache.put("fresh", make_info(now + 3600))
+        cache.put("short", make_info(now + 200))
+        self.assertIsNotNone(cache.get("fresh"))
+
+        # The url would expire before the track and its margin have played.
+        self.assertIsNone(cache.get("short"))
+        self.assertNotIn("short", cache)
+        self.assertIsNone(cache.get("unknown"))
+        self.assertEqual(
+            cache.stats,
+            {"evictions": 0, "expired": 1, "hits": 1, "misses": 2, "entries": 1},
+        )
+
+    ####################################################################################
+    def test_lru_eviction(self):
+        cache = StreamCache(max_entries=2)
+        expire = time.time() + 3600
+        cache.put("a", make_info(expire))
+        cache.put("b", make_info(expire))
+        cache.get("a")
+        cache.put("c", make_info(expire))
+        self.assertEqual(sorted(cache._entries), ["a", "c"])
+        self.assertEqual(cache.stats["evictions"], 1)
+
+    ####################################################################################
+    def test_purge(self):
+        cache = StreamCache()
+        now = time.time()
+        cache.put("old", make_info(now - 1))
+        cache.put("new", make_info(now + 3600))
+        self.assertEqual(cache.purge(), 1)
+        self.assertEqual(len(cache), 1)
+        self.assertIn("new", cache)
+
+
+########################################################################################
+class TestTrackCache(unittest.IsolatedAsyncioTestCase):
+    """Tests for the on-disk TrackCache index and its LRU eviction."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    ####################################################################################
+    def path(self, name: str) -> str:
+        """Path of a file in the cache directory."""
+        return os.path.join(self.directory.name, name)
+
+    ####################################################################################
+    def write_track(self, video_id: str, size: int, played: float) -> None:
+        """Put a track and its sidecar on disk, last played at a time."""
+        with open(self.path(f"{video_id}.opus"), mode="wb") as fp:
+            fp.write(b"\0" * size)
+
+        with open(self.path(f"{video_id}.json"), mode="w", encoding="utf-8") as fp:
+            json.dump({"title": video_id, "url": self.path(f"{video_id}.opus")}, fp)
+
+        os.utime(self.path(f"{video_id}.opus"), (played, played))
+
+    ####################################################################################
+    def test_load_orders_by_mtime_and_evicts_oldest(self):
+        now = time.time()
+        for video_id, played in (("b", now - 10), ("a", now - 30), ("c", now - 20)):
+            self.write_track(video_id, 1000, played)
+
+        # A track without its sidecar and a partial write are cleaned up.
+        with open(self.path("orphan.opus"), mode="wb") as fp:
+            fp.write(b"\0")
+
+        with open(self.path("d.123.opus.tmp"), mode="wb") as fp:
+            fp.write(b"\0")
+
+        cache = TrackCache(self.directory.name, max_bytes=10**6)
+        self.assertEqual([video_id for video_id, _ in cache.recent()], ["b", "c", "a"])
+        self.assertEqual(len(cache), 3)
+        self.assertFalse(os.path.exists(self.path("orphan.opus")))
+        self.assertFalse(os.path.exists(self.path("d.123.opus.tmp")))
+
+        # Over budget at start up, the least recently played tracks go first.
+        size = cache.recent(1)[0][1]
+        cache = TrackCache(self.directory.name, max_bytes=2 * size)
+        self.assertEqual([video_id for video_id, _ in cache.recent()], ["b", "c"])
+        self.assertEqual(cache.stats["evictions"], 1)
+        self.assertFalse(os.path.exists(self.path("a.opus")))
+        self.assertFalse(os.path.exists(self.path("a.json")))
+
+    ####################################################################################
+    async def test_get_marks_track_played(self):
+        now = time.time()
+        self.write_track("old", 1000, now - 100)
+        self.write_track("new", 1000, now - 50)
+        cache = TrackCache(self.directory.name, max_bytes=10**6)
+
+        path, info = await cache.get("old")  # type: ignore
+        self.assertEqual(path, self.path("old.opus"))
+        self.assertEqual(info.title, "old")
+        self.assertGreater(os.path.getmtime(path), now - 50)
+        self.assertIsNone(await cache.get("missing"))
+        self.assertEqual(cache.stats["hits"], 1)
+        self.assertEqual(cache.stats["misses"], 1)
+
+        # The touched track now outlives the other one, in memory and on disk.
+        self.assertEqual(cache._evict(), [])
+        cache.max_bytes = 1500
+        self.assertEqual(cache._evict(), ["new"])
+        reloaded = TrackCache(self.directory.name, max_bytes=10**6)
+        self.assertEqual(
+            [video_id for video_id, _ in reloaded.recent()], ["old", "new"]
+        )
+
+    ####################################################################################
+    async def test_unreadable_sidecar_is_dropped(self):
+        self.write_track("bad", 1000, time.time())
+        with open(self.path("bad.json"), mode="w", encoding="utf-8") as fp:
+            fp.write("{")
+
+        cache = TrackCache(self.directory.name)
+        self.assertIsNone(await cache.get("bad"))
+        self.assertNotIn("bad", cache)
+        self.assertFalse(os.path.exists(self.path("bad.opus")))
+
+    ####################################################################################
+    async def settle(self, cache: TrackCache) -> None:
+        """Let the cache's background writes finish."""
+        await asyncio.sleep(0)
+        while cache._writing:
+            await asyncio.gather(*(t for t in cache._writing.values() if t))
+
+    ####################################################################################
+    async def test_tee_keeps_complete_track(self):
+        stored = []
+
+        async def on_stored(*args):
+            stored.append(args)
+
+        cache = TrackCache(self.directory.name, on_stored=on_stored)
+        info = TrackInfo(title="t", url="https://example.com/t", acodec="opus")
+        output = cache.tee("t", info)
+        self.assertEqual(output[-1], cache._tmp("t"))  # type: ignore
+        self.assertIn("copy", output)  # type: ignore
+
+        # Reserved tracks are neither teed again nor downloaded separately.
+        self.assertIsNone(cache.tee("t", info))
+        with mock.patch.object(cache, "_write") as write:
+            cache.schedule("t", info)
+            write.assert_not_called()
+
+        with open(cache._tmp("t"), mode="wb") as fp:
+            fp.write(b"\0" * 100)
+
+        cache.tee_done("t", info, complete=True, fallback=False)
+        await self.settle(cache)
+        self.assertIn("t", cache)
+        self.assertEqual(stored, [("t", self.path("t.opus"))])
+        self.assertEqual(cache.stats["teed"], 1)
+        path, cached = await cache.get("t")  # type: ignore
+        self.assertEqual((path, cached.url), (self.path("t.opus"), info.url))
+
+    ####################################################################################
+    async def test_tee_incomplete_track(self):
+        cache = TrackCache(self.directory.name)
+        info = TrackInfo(title="t", url="https://example.com/t")
+        self.assertIsNone(cache.tee("t", info.replace(url=self.path("t.opus"))))
+        self.assertIn("libopus", cache.tee("t", info))  # type: ignore
+
+        # A skipped track is dropped.
+        with open(cache._tmp("t"), mode="wb") as fp:
+            fp.write(b"\0")
+
+        cache.tee_done("t", info, complete=False, fallback=False)
+        await self.settle(cache)
+        self.assertFalse(os.path.exists(cache._tmp("t")))
+        self.assertNotIn("t", cache)
+
+        # A restarted process falls back to downloading the track.
+        cache.tee("t", info)
+        with mock.patch.object(cache, "_write", mock.AsyncMock()) as write:
+            cache.tee_done("t", info, complete=False, fallback=True)
+            await self.settle(cache)
+
+        write.assert_awaited_once_with("t", info)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# Standard library imports.
+import unittest
+
+# Third party imports.
+import discord
+import numpy as np
+
+from music_bot.common.gain import FRAME_SAMPLES, FRAME_SIZE, GainTransformer
+
+
+########################################################################################
+class FakePCM(discord.AudioSource):
+    """PCM source playing a list of frames."""
+
+    def __init__(self, frames: list):
+        self.cleaned = False
+        self.frames = list(frames)
+
+    def cleanup(self) -> None:
+        self.cleaned = True
+
+    def read(self) -> bytes:
+        return self.frames.pop(0) if self.frames else b""
+
+
+########################################################################################
+def frame(level: int, samples: int = FRAME_SAMPLES) -> bytes:
+    """Build a PCM frame holding a constant level."""
+    return np.full(samples, level, dtype=np.int16).tobytes()
+
+
+########################################################################################
+def levels(data: bytes) -> np.ndarray:
+    """Decode a PCM frame."""
+    return np.frombuffer(data, dtype=np.int16)
+
+
+########################################################################################
+class TestGainTransformer(unittest.TestCase):
+    """Tests for the GainTransformer ramps and peak limiter."""
+
+    def test_unity_gain_passes_frames_through(self):
+        data = frame(1234)
+        gain = GainTransformer(FakePCM([data]))
+        self.assertIs(gain.read(), data)
+        self.assertEqual(gain.read(), b"")
+
+    ####################################################################################
+    def test_static_gain(self):
+        gain = GainTransformer(FakePCM([frame(1000)] * 2), 0.5)
+        for _ in range(2):
+            data = gain.read()
+            self.assertEqual(len(data), FRAME_SIZE)
+            self.assertTrue((levels(data) == 500).all())
+
+    ####################################################################################
+    def test_ramp_up_and_down(self):
+        gain = GainTransformer(FakePCM([frame(1000)] * 12), ramp_frames=4)
+        gain.volume = 0.5
+        self.assertEqual(gain.volume, 0.5)
+
+        # Each frame ramps smoothly from the last frame's gain to its own.
+        previous = 1000
+        for expected in (875, 750, 625, 500):
+            samples = levels(gain.read())
+            self.assertAlmostEqual(int(samples[0]), previous, delta=1)
+            self.assertAlmostEqual(int(samples[-1]), expected, delta=1)
+            self.assertTrue((np.diff(samples[::2].astype(int)) <= 0).all())
+            previous = expected
+
+        # The ramp stops at the target instead of overshooting it.
+        for _ in range(2):
+            self.assertTrue((levels(gain.read()) == 500).all())
+
+        gain.volume = 1.0
+        for _ in range(4):
+            gain.read()
+
+        self.assertTrue((levels(gain.read()) == 1000).all())
+
+    ####################################################################################
+    def test_limiter_holds_peaks_under_ceiling(self):
+        loud, quiet = frame(30000), frame(1000)
+        gain = GainTransformer(
+            FakePCM([loud, loud, *[quiet] * 30]), 2.0, release_frames=10
+        )
+        ceiling = 0.98 * np.iinfo(np.int16).max
+        for _ in range(2):
+            samples = levels(gain.read())
+            self.assertLessEqual(int(np.abs(samples).max()), ceiling)
+            self.assertGreater(int(np.abs(samples).max()), ceiling - 2)
+
+        # The reduction is released gradually once the peaks are gone.
+        released = [int(levels(gain.read())[0]) for _ in range(12)]
+        self.assertEqual(released, sorted(released))
+        self.assertLess(released[0], 2000)
+        self.assertEqual(released[-1], 2000)
+
+    ####################################################################################
+    def test_partial_frame(self):
+        gain = GainTransformer(FakePCM([frame(20000, samples=100)]), 3.0)
+        samples = levels(gain.read())
+        self.assertEqual(len(samples), 100)
+        self.assertLessEqual(int(samples.max()), 0.98 * np.iinfo(np.int16).max)
+
+    ####################################################################################
+    def test_cleans_up_original(self):
+        source = FakePCM([])
+        GainTransformer(source).cleanup()
+        self.assertTrue(source.cleaned)
+
+
+if __name__ == "__main__":
+    unittest.main()
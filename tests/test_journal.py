@@ -0,0 +1,168 @@
+# Standard library imports.
+import os
+import tempfile
+import unittest
+
+from music_bot.common.classes import Song, SongQueue
+from music_bot.common.journal import QueueJournal
+
+
+########################################################################################
+def make_song(title: str, requester: int = 0) -> Song:
+    """Build a song as queued from a videos resource."""
+    return Song({"id": f"{title:>11}", "snippet": {"title": title}}, requester)
+
+
+########################################################################################
+class TestQueueJournal(unittest.TestCase):
+    """Tests for QueueJournal and replaying it into a SongQueue."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "guild.jsonl")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    ####################################################################################
+    def journaled(self, compact_every: int = 1000) -> SongQueue:
+        """Build a queue that journals to the test's log."""
+        queue = SongQueue(journal=QueueJournal(self.path, compact_every))
+        self.addCleanup(queue.close_journal)
+
+        return queue
+
+    ####################################################################################
+    def restored(self) -> SongQueue:
+        """Rebuild a queue from the journal, as a restarted bot would."""
+        queue = self.journaled()
+        queue.restore()
+
+        return queue
+
+    ####################################################################################
+    def titles(self, queue: SongQueue) -> list:
+        """Get the titles of the queued songs in play order."""
+        return [song.title for song in queue]
+
+    ####################################################################################
+    def test_append_and_load(self):
+        journal = QueueJournal(self.path)
+        journal.append({"op": "done"}, {"op": "weight", "requester": 1, "weight": 2})
+        journal.close()
+        self.assertEqual(
+            journal.load(),
+            [{"op": "done"}, {"op": "weight", "requester": 1, "weight": 2}],
+        )
+        self.assertEqual(journal.pending, 2)
+
+    ####################################################################################
+    def test_append_batches_on_writer_thread(self):
+        journal = QueueJournal(os.path.join(self.directory.name, "new", "guild.jsonl"))
+        for number in range(100):
+            journal.append({"op": "weight", "requester": number, "weight": 1.0})
+        journal.compact([{"op": "done"}])
+        journal.append({"op": "done"})
+
+        # Loading waits for the queued writes, and the writer is restarted after.
+        self.assertEqual(journal.load(), [{"op": "done"}] * 2)
+        journal.append({"op": "done"})
+        journal.close()
+        self.assertEqual(journal.load(), [{"op": "done"}] * 3)
+        self.assertEqual(journal.pending, 3)
+
+    ####################################################################################
+    def test_compact_empty_removes_file(self):
+        journal = QueueJournal(self.path)
+        journal.append({"op": "done"})
+        journal.compact([])
+        journal.close()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(journal.load(), [])
+
+    ####################################################################################
+    def test_journals_waiting(self):
+        for name in ("2.jsonl", "1.jsonl", "other.txt", "3.jsonl.tmp"):
+            with open(os.path.join(self.directory.name, name), mode="w"):
+                pass
+
+        self.assertEqual(QueueJournal.waiting(self.directory.name), ["1", "2"])
+        self.assertEqual(QueueJournal.waiting(self.path), [])
+
+    ####################################################################################
+    def test_load_skips_torn_last_record(self):
+        journal = QueueJournal(self.path)
+        journal.append({"op": "done"})
+        journal.close()
+        with open(self.path, mode="a", encoding="utf-8") as fp:
+            fp.write('{"op":"put","key":[1,')
+
+        with self.assertLogs("music_bot.common.journal", level="WARNING"):
+            self.assertEqual(journal.load(), [{"op": "done"}])
+
+    ####################################################################################
+    def test_replay_after_compaction(self):
+        queue = self.journaled(compact_every=5)
+        for number in range(16):
+            queue.put_nowait(make_song(f"s{number}", number % 3))
+
+        # Playing most of the queue leaves few live entries, so the log is compacted.
+        for _ in range(10):
+            queue.get_nowait()
+            queue.played()
+
+        queue.set_weight(2, 2.0)
+        queue.move(4, 0)
+        queue.remove(2)
+        expected = self.titles(queue)
+        queue.journal.close()  # type: ignore
+        with open(self.path, mode="r", encoding="utf-8") as fp:
+            self.assertLess(len(fp.readlines()), 16)
+
+        restored = self.restored()
+        self.assertEqual(self.titles(restored), expected)
+        self.assertEqual(restored.weights, {2: 2.0})
+
+        # Songs put after the restart are scheduled as they would have been.
+        queue.put_nowait(make_song("late", 1))
+        restored.put_nowait(make_song("late", 1))
+        self.assertEqual(self.titles(restored), self.titles(queue))
+
+    ####################################################################################
+    def test_replay_requeues_interrupted_song(self):
+        queue = self.journaled()
+        for number in range(4):
+            queue.put_nowait(make_song(f"s{number}"))
+
+        self.assertEqual(queue.get_nowait().title, "s0")
+        queue.close_journal()
+
+        restored = self.journaled()
+        self.assertEqual(restored.restore().title, "s0")  # type: ignore
+        self.assertEqual(self.titles(restored), ["s0", "s1", "s2", "s3"])
+
+        # Once played it is not restored again.
+        restored.get_nowait()
+        restored.played()
+        restored.close_journal()
+        self.assertEqual(self.titles(self.restored()), ["s1", "s2", "s3"])
+
+    ####################################################################################
+    def test_replay_with_torn_last_record(self):
+        queue = self.journaled()
+        for number in range(3):
+            queue.put_nowait(make_song(f"s{number}"))
+
+        queue.close_journal()
+        with open(self.path, mode="a", encoding="utf-8") as fp:
+            fp.write('{"op":"put","key":[1,4.0,3,3.0],"song":{"id":"')
+
+        with self.assertLogs("music_bot.common.journal", level="WARNING"):
+            restored = self.restored()
+
+        self.assertEqual(self.titles(restored), ["s0", "s1", "s2"])
+        self.assertEqual(restored.qsize(), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
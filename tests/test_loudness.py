@@ -0,0 +1,92 @@
+# Standard library imports.
+import asyncio
+import unittest
+from unittest import mock
+
+from music_bot.common.loudness import LoudnessAnalyzer
+from music_bot.common.store import LoudnessStore
+
+
+########################################################################################
+class TestLoudnessAnalyzer(unittest.IsolatedAsyncioTestCase):
+    """Tests for loudness gains and scheduling analysis off the event loop."""
+
+    async def asyncSetUp(self):
+        self.store = LoudnessStore(":memory:")
+        self.store.put("loud", -8.0, -0.5, -6.0)
+        self.store.put("near", -14.5, -3.0, 0.5)
+        self.blocking = []
+        self.analyzer = LoudnessAnalyzer(self.store, run_blocking=self.run_blocking)
+
+    async def asyncTearDown(self):
+        self.store.close()
+
+    ####################################################################################
+    async def run_blocking(self, func, *args):
+        """Record the store calls made through run_blocking."""
+        self.blocking.append(func.__name__)
+
+        return await asyncio.to_thread(func, *args)
+
+    ####################################################################################
+    async def test_gain(self):
+        self.assertAlmostEqual(await self.analyzer.gain("loud"), 10 ** (-6.0 / 20))
+
+        # Gains within the tolerance play at unity, as do tracks never analysed.
+        self.assertEqual(await self.analyzer.gain("near"), 1.0)
+        self.assertEqual(await self.analyzer.gain("new"), 1.0)
+        self.assertEqual(self.blocking, ["gain"] * 3)
+
+        # Hits and misses are both looked up once.
+        for video_id in ("loud", "near", "new"):
+            await self.analyzer.gain(video_id)
+        self.assertEqual(self.blocking, ["gain"] * 3)
+
+    ####################################################################################
+    async def test_schedule_stores_gain(self):
+        with mock.patch.object(
+            self.analyzer, "_measure", return_value=(-20.0, -10.0)
+        ) as measure:
+            await asyncio.gather(
+                self.analyzer.schedule("new", "/tracks/new.opus"),
+                self.analyzer.schedule("new", "/tracks/new.opus"),
+                self.analyzer.schedule("loud", "/tracks/loud.opus"),
+            )
+            await asyncio.gather(*self.analyzer._pending.values())
+
+        measure.assert_called_once_with("/tracks/new.opus")
+        self.assertEqual(self.store.gain("new"), 6.0)
+        self.assertAlmostEqual(await self.analyzer.gain("new"), 10 ** (6.0 / 20))
+        self.assertEqual(
+            self.analyzer.stats,
+            {"analysed": 1, "failures": 0, "pending": 0, "stored": 3},
+        )
+        self.assertIn("put", self.blocking)
+
+        # Analysed tracks are not scheduled again.
+        await self.analyzer.schedule("new", "/tracks/new.opus")
+        self.assertEqual(self.analyzer.stats["pending"], 0)
+
+    ####################################################################################
+    async def test_schedule_gain_capped_by_ceiling(self):
+        with mock.patch.object(self.analyzer, "_measure", return_value=(-20.0, -4.0)):
+            await self.analyzer.schedule("quiet", "/tracks/quiet.opus")
+            await asyncio.gather(*self.analyzer._pending.values())
+
+        self.assertEqual(self.store.gain("quiet"), 3.0)
+
+    ####################################################################################
+    async def test_schedule_failure(self):
+        with mock.patch.object(
+            self.analyzer, "_measure", side_effect=OSError("bad input")
+        ):
+            await self.analyzer.schedule("bad", "/tracks/bad.opus")
+            with self.assertLogs("music_bot.common.loudness", level="WARNING"):
+                await asyncio.gather(*self.analyzer._pending.values())
+
+        self.assertEqual(self.analyzer.stats["failures"], 1)
+        self.assertEqual(await self.analyzer.gain("bad"), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+# Standard library imports.
+import logging
+import unittest
+
+# Third party imports.
+import discord
+
+from music_bot.client import PuckBotClient
+from music_bot.common.exceptions import QuotaError
+
+
+########################################################################################
+class FakeResource:
+    """Stand-in for the YouTube API resource. Requests are the list call arguments."""
+
+    def playlists(self):
+        return self
+
+    def list(self, **kwargs) -> dict:
+        return kwargs
+
+
+########################################################################################
+class TestPlaylistCatalog(unittest.IsolatedAsyncioTestCase):
+    """Tests for the channel playlist catalog cache of PuckBotClient."""
+
+    def setUp(self):
+        self.bot = PuckBotClient(command_prefix="-", intents=discord.Intents.none())
+        self.bot.config = {"channel_id": "channel", "playlist_cache_ttl": 300}
+        self.bot.logger = logging.getLogger("test_playlist_catalog")
+        self.bot.youtube = FakeResource()
+        self.pages = {
+            "": {
+                "etag": "e0",
+                "items": [self.item("Rock", "p1")],
+                "nextPageToken": "t1",
+            },
+            "t1": {"etag": "e1", "items": [self.item("Jazz", "p2")]},
+        }
+        self.requests = []
+        self.bot.execute = self.execute
+
+    ####################################################################################
+    async def execute(self, request: dict, etag=None):
+        """Serve the fake pages, answering a matching ETag with a 304."""
+        self.requests.append((request["pageToken"], etag))
+        page = self.pages[request["pageToken"]]
+        if isinstance(page, Exception):
+            raise page
+
+        return None if etag == page["etag"] else page
+
+    ####################################################################################
+    @staticmethod
+    def item(title: str, playlist_id: str) -> dict:
+        """Build a playlists resource."""
+        return {"id": playlist_id, "snippet": {"title": title}}
+
+    ####################################################################################
+    async def test_cached_within_ttl(self):
+        playlists = await self.bot.get_playlists()
+        self.assertEqual(dict(playlists), {"Rock": "p1", "Jazz": "p2"})
+        self.assertEqual(playlists["rock"], "p1")
+
+        # A hit makes no requests and returns a copy the caller can not corrupt.
+        playlists["Pop"] = "p3"
+        self.assertEqual(len(await self.bot.get_playlists()), 2)
+        self.assertEqual(self.requests, [("", None), ("t1", None)])
+        self.assertEqual(
+            self.bot.playlist_cache_stats, {"hits": 1, "misses": 1, "not_modified": 0}
+        )
+
+    ####################################################################################
+    async def test_expired_refresh_sends_etags(self):
+        await self.bot.get_playlists()
+        self.requests.clear()
+        self.bot.config["playlist_cache_ttl"] = 0
+
+        # The first page is unchanged and the second page has a new playlist.
+        self.pages["t1"] = {
+            "etag": "e2",
+            "items": [self.item("Jazz", "p2"), self.item("Pop", "p3")],
+        }
+        playlists = await self.bot.get_playlists()
+        self.assertEqual(self.requests, [("", "e0"), ("t1", "e1")])
+        self.assertEqual(dict(playlists), {"Rock": "p1", "Jazz": "p2", "Pop": "p3"})
+        self.assertEqual(self.bot.playlist_cache_stats["not_modified"], 1)
+
+        # The changed page's new ETag is used for the next refresh.
+        self.requests.clear()
+        await self.bot.get_playlists()
+        self.assertEqual(self.requests, [("", "e0"), ("t1", "e2")])
+        self.assertEqual(self.bot.playlist_cache_stats["not_modified"], 3)
+
+    ####################################################################################
+    async def test_quota_error_serves_stale_catalog(self):
+        self.pages[""] = QuotaError("Out of quota.")
+        with self.assertRaises(QuotaError):
+            await self.bot.get_playlists()
+
+        self.pages[""] = {"etag": "e0", "items": [self.item("Rock", "p1")]}
+        await self.bot.get_playlists()
+        self.bot.config["playlist_cache_ttl"] = 0
+        self.pages[""] = QuotaError("Out of quota.")
+        with self.assertLogs("test_playlist_catalog", level="WARNING"):
+            self.assertEqual(dict(await self.bot.get_playlists()), {"Rock": "p1"})
+
+
+if __name__ == "__main__":
+    unittest.main()
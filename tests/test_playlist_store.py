@@ -0,0 +1,150 @@
+# Standard library imports.
+import asyncio
+import logging
+import os
+import tempfile
+import unittest
+
+# Third party imports.
+import discord
+
+from music_bot.client import PuckBotClient
+from music_bot.common.store import PlaylistStore
+
+
+########################################################################################
+def make_item(video_id: str) -> dict:
+    """Build a playlistItems resource."""
+    return {"id": f"item-{video_id}", "contentDetails": {"videoId": video_id}}
+
+
+########################################################################################
+class FakeResource:
+    """Stand-in for the YouTube API resource. Requests are the list call arguments."""
+
+    def playlistItems(self):  # pylint: disable=invalid-name
+        return self
+
+    def list(self, **kwargs) -> dict:
+        return kwargs
+
+
+########################################################################################
+class TestPlaylistStore(unittest.TestCase):
+    """Tests for the on-disk playlist page store."""
+
+    def setUp(self):
+        self.store = PlaylistStore(":memory:")
+        self.addCleanup(self.store.close)
+
+    ####################################################################################
+    def test_pages_round_trip(self):
+        self.assertIsNone(self.store.refreshed("p"))
+        self.store.replace_page(
+            "p", 0, "", "t1", "e0", [make_item("a"), make_item("b")]
+        )
+        self.store.replace_page("p", 1, "t1", None, "e1", [make_item("c")])
+        self.store.finish_refresh("p", 2)
+
+        self.assertIsNotNone(self.store.refreshed("p"))
+        self.assertEqual(
+            self.store.pages("p"),
+            {
+                0: {"page_token": "", "next_token": "t1", "etag": "e0"},
+                1: {"page_token": "t1", "next_token": None, "etag": "e1"},
+            },
+        )
+        self.assertEqual(
+            self.store.page_items("p", 0), [make_item("a"), make_item("b")]
+        )
+        self.assertEqual(self.store.pages("other"), {})
+
+    ####################################################################################
+    def test_replace_page_and_shrink(self):
+        for page in range(3):
+            self.store.replace_page("p", page, f"t{page}", None, "e", [make_item("x")])
+
+        self.store.replace_page("p", 0, "t0", None, "e9", [make_item("y")])
+        self.store.finish_refresh("p", 1)
+        self.assertEqual(list(self.store.pages("p")), [0])
+        self.assertEqual(self.store.page_items("p", 0), [make_item("y")])
+        self.assertEqual(self.store.page_items("p", 1), [])
+
+
+########################################################################################
+class TestPlaylistSongs(unittest.IsolatedAsyncioTestCase):
+    """Tests for streaming playlist songs through the on-disk store."""
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.bot = PuckBotClient(command_prefix="-", intents=discord.Intents.none())
+        self.bot.config = {
+            "cache_db": os.path.join(self.directory.name, "cache.sqlite3"),
+            "playlist_store_ttl": 600,
+        }
+        self.bot.logger = logging.getLogger("test_playlist_store")
+        self.bot.youtube = FakeResource()
+        self.bot.execute = self.execute
+        self.pages = {
+            "": {"etag": "e0", "items": [make_item("a")], "nextPageToken": "t1"},
+            "t1": {"etag": "e1", "items": [make_item("b")]},
+        }
+        self.requests = []
+
+    async def asyncTearDown(self):
+        await self.bot.close()
+
+    ####################################################################################
+    async def execute(self, request: dict, etag=None):
+        """Serve the fake pages, answering a matching ETag with a 304."""
+        self.requests.append((request["pageToken"], etag))
+        page = self.pages[request["pageToken"]]
+
+        return None if etag == page["etag"] else page
+
+    ####################################################################################
+    async def test_first_load_is_stored(self):
+        songs = await self.bot.get_playlist_songs(playlist_id="p")
+        self.assertEqual(songs, [make_item("a"), make_item("b")])
+        self.assertEqual(self.requests, [("", None), ("t1", None)])
+
+        # Served from the store without any request while it is fresh.
+        self.requests.clear()
+        self.assertEqual(await self.bot.get_playlist_songs(playlist_id="p"), songs)
+        self.assertEqual(self.requests, [])
+
+    ####################################################################################
+    async def test_stale_store_refreshes_changed_pages(self):
+        await self.bot.get_playlist_songs(playlist_id="p")
+        self.requests.clear()
+        self.bot.config["playlist_store_ttl"] = 0
+        self.pages["t1"] = {"etag": "e2", "items": [make_item("b"), make_item("c")]}
+
+        # The stale items are served at once and refreshed in the background.
+        songs = await self.bot.get_playlist_songs(playlist_id="p")
+        self.assertEqual(songs, [make_item("a"), make_item("b")])
+        await asyncio.sleep(0)
+        pending = self.bot.flights.get(("playlist", "p"))
+        self.assertIsNotNone(pending)
+        await asyncio.shield(pending)  # type: ignore
+
+        self.assertEqual(self.requests, [("", "e0"), ("t1", "e1")])
+        self.bot.config["playlist_store_ttl"] = 600
+        self.assertEqual(
+            await self.bot.get_playlist_songs(playlist_id="p"),
+            [make_item("a"), make_item("b"), make_item("c")],
+        )
+
+    ####################################################################################
+    async def test_concurrent_first_loads_share_one_fetch(self):
+        first, second = await asyncio.gather(
+            self.bot.get_playlist_songs(playlist_id="p"),
+            self.bot.get_playlist_songs(playlist_id="p"),
+        )
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.requests), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,147 @@
+# Standard library imports.
+import asyncio
+import types
+import unittest
+from unittest import mock
+
+from music_bot.common.exceptions import QuotaError
+from music_bot.common.quota import QuotaTracker
+from music_bot.common.store import QuotaStore
+
+LIST = "youtube.playlistItems.list"
+
+
+########################################################################################
+class TestQuotaTracker(unittest.IsolatedAsyncioTestCase):
+    """Tests for QuotaTracker. The clock, the sleeps and the time to the quota reset
+    are faked, a day of 86400 seconds keeps the paced rates round.
+    """
+
+    def setUp(self):
+        self.now = 1000.0
+        self.sleeps = []
+        self.store = QuotaStore(":memory:")
+        self.addCleanup(self.store.close)
+        for target, replacement in (
+            (
+                "music_bot.common.quota.time",
+                types.SimpleNamespace(monotonic=self.clock),
+            ),
+            ("asyncio.sleep", self.sleep),
+            (
+                "music_bot.common.quota.QuotaTracker.resets_in",
+                mock.PropertyMock(return_value=86400.0),
+            ),
+        ):
+            patcher = mock.patch(target, replacement)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    ####################################################################################
+    def clock(self) -> float:
+        """Fake monotonic clock."""
+        return self.now
+
+    ####################################################################################
+    async def sleep(self, delay: float) -> None:
+        """Record a sleep without waiting."""
+        self.sleeps.append(delay)
+
+    ####################################################################################
+    def tracker(self, spent: int = 0, **kwargs) -> QuotaTracker:
+        """Build a tracker whose store already holds some of today's spend."""
+        tracker = QuotaTracker(store=self.store, **kwargs)
+        if spent:
+            self.store.add(tracker._today(), LIST, spent)
+
+        return tracker
+
+    ####################################################################################
+    async def test_spend_is_counted_per_endpoint(self):
+        tracker = self.tracker()
+        await tracker.acquire(LIST)
+        await tracker.acquire(LIST)
+        await tracker.acquire("youtube.videos.list")
+        report = tracker.report()
+        self.assertEqual(report["endpoints"], {LIST: 2, "youtube.videos.list": 1})
+        self.assertEqual(report["remaining"], 9997)
+        self.assertEqual(report["throttled"], 0)
+        self.assertEqual(self.sleeps, [0.0, 0.0, 0.0])
+
+    ####################################################################################
+    async def test_exhausted_budget_raises(self):
+        tracker = self.tracker(budget=3, reserve=0.0)
+        for _ in range(3):
+            await tracker.acquire(LIST)
+
+        with self.assertRaises(QuotaError):
+            await tracker.acquire(LIST)
+
+        self.assertEqual(tracker.spent, 3)
+
+    ####################################################################################
+    async def test_multi_page_load_while_throttled(self):
+        # 864 units left over a day refill one unit every 100 seconds.
+        tracker = self.tracker(spent=9136)
+        for _ in range(20):
+            await tracker.acquire(LIST)
+
+        self.assertTrue(tracker.throttled)
+        self.assertEqual(self.sleeps, [0.0] * 20)
+        self.assertEqual(tracker.report()["throttled"], 20)
+
+    ####################################################################################
+    async def test_paced_once_burst_is_used(self):
+        tracker = self.tracker(spent=9136, burst=2, max_delay=1000.0)
+        await asyncio.gather(*(tracker.acquire(LIST) for _ in range(5)))
+        self.assertEqual(len(self.sleeps), 5)
+        self.assertEqual(self.sleeps[:2], [0.0, 0.0])
+
+        # Each waiting request reserves the units after the ones already waiting.
+        for delay, expected in zip(self.sleeps[2:], (100.0, 200.0, 300.0)):
+            self.assertAlmostEqual(delay, expected, delta=expected * 0.01)
+
+        # Requests past max_delay are refused and spend nothing.
+        tracker.max_delay = 350.0
+        with self.assertRaises(QuotaError):
+            await tracker.acquire(LIST)
+
+        self.assertEqual(tracker.spent, 9141)
+
+        # The bucket refills with time, up to the burst.
+        self.now += 10000.0
+        self.sleeps.clear()
+        for _ in range(3):
+            await tracker.acquire(LIST)
+
+        self.assertEqual(self.sleeps[:2], [0.0, 0.0])
+        self.assertGreater(self.sleeps[2], 50.0)
+
+    ####################################################################################
+    async def test_roll_over_resets_spend_and_bucket(self):
+        tracker = self.tracker(spent=9136, burst=1)
+        await tracker.acquire(LIST)
+        with self.assertRaises(QuotaError):
+            await tracker.acquire(LIST)
+
+        with mock.patch.object(tracker, "_today", return_value="2999-01-01"):
+            await tracker.acquire(LIST)
+            await tracker.acquire(LIST)
+            self.assertEqual(tracker.spent, 2)
+            self.assertFalse(tracker.throttled)
+
+    ####################################################################################
+    async def test_spend_survives_restart(self):
+        tracker = self.tracker()
+        for _ in range(3):
+            await tracker.acquire(LIST)
+
+        restarted = self.tracker()
+        await restarted.load()
+        self.assertEqual(restarted.spent, 3)
+        await restarted.acquire(LIST)
+        self.assertEqual(self.store.spent(restarted._today()), {LIST: 4})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# Standard library imports.
+import asyncio
+import unittest
+
+from music_bot.common.classes import SingleFlight
+
+
+########################################################################################
+class TestSingleFlight(unittest.IsolatedAsyncioTestCase):
+    """Tests for SingleFlight request coalescing."""
+
+    def setUp(self):
+        self.flights = SingleFlight()
+        self.calls = []
+        self.release = asyncio.Event()
+
+    ####################################################################################
+    async def work(self, result="result"):
+        """Work that counts its calls and finishes once released."""
+        self.calls.append(result)
+        await self.release.wait()
+        if isinstance(result, Exception):
+            raise result
+
+        return result
+
+    ####################################################################################
+    async def test_shared_result_and_key_release(self):
+        waiters = [
+            asyncio.ensure_future(self.flights.do("key", self.work)) for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+        self.assertIn("key", self.flights)
+        self.release.set()
+
+        self.assertEqual(await asyncio.gather(*waiters), ["result"] * 3)
+        self.assertEqual(self.calls, ["result"])
+        self.assertNotIn("key", self.flights)
+
+        # Once released, the next call starts the work again.
+        self.assertEqual(await self.flights.do("key", self.work), "result")
+        self.assertEqual(len(self.calls), 2)
+
+    ####################################################################################
+    async def test_shared_exception(self):
+        error = ValueError("boom")
+        waiters = [
+            asyncio.ensure_future(self.flights.do("key", lambda: self.work(error)))
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0)
+        self.release.set()
+
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+        self.assertEqual(results, [error, error])
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(len(self.flights), 0)
+
+    ####################################################################################
+    async def test_cancelled_caller_does_not_cancel_others(self):
+        first = asyncio.ensure_future(self.flights.do("key", self.work))
+        second = asyncio.ensure_future(self.flights.do("key", self.work))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        self.release.set()
+
+        self.assertEqual(await second, "result")
+        self.assertTrue(first.cancelled())
+
+    ####################################################################################
+    async def test_claim(self):
+        done = self.flights.claim("key")
+        self.assertIs(self.flights.get("key"), done)
+        waiter = asyncio.ensure_future(self.flights.do("key", self.work))
+        await asyncio.sleep(0)
+        done.set_result(True)
+
+        self.assertTrue(await waiter)
+        self.assertEqual(self.calls, [])
+        self.assertIsNone(self.flights.get("key"))
+
+    ####################################################################################
+    async def test_do_many_shares_keys_in_flight(self):
+        batches = []
+
+        async def fetch(keys: list) -> dict:
+            batches.append(keys)
+            await self.release.wait()
+
+            return {key: key.upper() for key in keys if key != "missing"}
+
+        single = asyncio.ensure_future(self.flights.do("a", lambda: self.work("A")))
+        await asyncio.sleep(0)
+        many = asyncio.ensure_future(
+            self.flights.do_many(["a", "b", "b", "missing"], fetch)
+        )
+        await asyncio.sleep(0)
+        self.release.set()
+
+        self.assertEqual(await single, "A")
+        self.assertEqual(await many, {"a": "A", "b": "B", "missing": None})
+        self.assertEqual(batches, [["b", "missing"]])
+        self.assertEqual(len(self.flights), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+# Standard library imports.
+import random
+import unittest
+
+from music_bot.common.classes import Song, SongQueue
+
+
+########################################################################################
+def make_song(title: str, requester: int = 0) -> Song:
+    """Build a song as queued from a videos resource."""
+    return Song({"id": f"{title:>11}", "snippet": {"title": title}}, requester)
+
+
+########################################################################################
+class TestSongQueue(unittest.TestCase):
+    """Tests for the fair-share order and positional operations of SongQueue."""
+
+    def titles(self, queue: SongQueue) -> list:
+        """Get the titles of the queued songs in play order."""
+        return [song.title for song in queue]
+
+    ####################################################################################
+    def test_fair_share_order(self):
+        queue = SongQueue()
+        for title, requester in (("a0", 1), ("a1", 1), ("a2", 1), ("b0", 2)):
+            queue.put_nowait(make_song(title, requester))
+        self.assertEqual(self.titles(queue), ["a0", "b0", "a1", "a2"])
+
+    ####################################################################################
+    def test_insert_at_end_then_put(self):
+        queue = SongQueue()
+        queue.put_nowait(make_song("X", 1))
+        queue.insert(5, make_song("I", 3))
+        queue.put_nowait(make_song("W", 1))
+        self.assertEqual(len(queue), 3)
+        self.assertEqual(self.titles(queue)[:2], ["X", "I"])
+
+    ####################################################################################
+    def test_move_to_end_then_put(self):
+        queue = SongQueue()
+        queue.put_nowait(make_song("X", 1))
+        queue.put_nowait(make_song("Z", 2))
+        queue.put_nowait(make_song("Y", 1))
+        queue.move(0, 5)
+        self.assertEqual(self.titles(queue), ["Z", "Y", "X"])
+
+        # The moved song used to share its key with the next song tagged.
+        queue.put_nowait(make_song("W", 2))
+        self.assertEqual(len(queue), 4)
+        self.assertEqual(self.titles(queue)[:3], ["Z", "Y", "X"])
+
+    ####################################################################################
+    def test_moves_inserts_and_puts_match_a_list(self):
+        rng = random.Random(99)
+        queue = SongQueue()
+        for number in range(20):
+            queue.put_nowait(make_song(f"s{number}", number % 3))
+
+        for number in range(500):
+            choice = rng.random()
+            if choice < 0.4:
+                expected = self.titles(queue)
+                source = rng.randrange(len(expected))
+                destination = rng.randrange(len(expected) + 2)
+                expected.insert(destination, expected.pop(source))
+                queue.move(source, destination)
+                self.assertEqual(self.titles(queue), expected)
+
+            elif choice < 0.6:
+                expected = self.titles(queue)
+                index = rng.randrange(len(expected) + 2)
+                expected.insert(index, f"i{number}")
+                queue.insert(index, make_song(f"i{number}", 5))
+                self.assertEqual(self.titles(queue), expected)
+
+            elif choice < 0.8:
+                queue.put_nowait(make_song(f"p{number}", rng.randrange(4)))
+
+            elif len(queue) > 1:
+                expected = self.titles(queue)
+                index = rng.randrange(len(expected))
+                self.assertEqual(queue.remove(index).title, expected.pop(index))
+                self.assertEqual(self.titles(queue), expected)
+
+        titles = self.titles(queue)
+        self.assertEqual([queue.get_nowait().title for _ in range(len(titles))], titles)
+
+    ####################################################################################
+    def test_put_many_matches_put(self):
+        items = [
+            {"id": f"{number:011d}", "snippet": {"title": f"s{number}"}}
+            for number in range(30)
+        ]
+        one_by_one, batched = SongQueue(), SongQueue()
+        for queue in (one_by_one, batched):
+            queue.put_nowait(make_song("first", 1))
+        for item in items:
+            one_by_one.put_nowait(Song(item, requester=2))
+
+        self.assertEqual(
+            batched.put_many(items, lambda item: Song(item, requester=2)), 30
+        )
+        self.assertEqual(self.titles(batched), self.titles(one_by_one))
+
+
+if __name__ == "__main__":
+    unittest.main()
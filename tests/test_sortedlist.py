@@ -0,0 +1,137 @@
+# Standard library imports.
+import bisect
+import random
+import unittest
+
+from music_bot.common.sortedlist import IndexedSortedList
+
+
+########################################################################################
+class TestIndexedSortedList(unittest.TestCase):
+    """Tests for IndexedSortedList. A load of 4 keeps the blocks between 2 and 8 items,
+    so a few dozen items cross the split and merge boundaries many times.
+    """
+
+    def assert_matches(self, items: IndexedSortedList, expected: list) -> None:
+        """Check a list against a plain sorted list, position by position."""
+        self.assertEqual(len(items), len(expected))
+        self.assertEqual(list(items), expected)
+        for position, item in enumerate(expected):
+            self.assertEqual(items[position], item)
+            self.assertEqual(items[position - len(expected)], item)
+
+        # The Fenwick tree must agree with the blocks it indexes.
+        self.assertEqual(sum(len(block) for block in items._blocks), len(expected))
+        for block, values in enumerate(items._blocks):
+            self.assertTrue(values)
+            self.assertLessEqual(len(values), 2 * items.load)
+            self.assertEqual(items._maxes[block], values[-1])
+            self.assertEqual(
+                items._prefix(block), sum(len(b) for b in items._blocks[:block])
+            )
+
+    ####################################################################################
+    def test_add_splits_blocks(self):
+        items = IndexedSortedList(load=4)
+        expected = []
+        for value in [5, 1, 9, 3, 7, 2, 8, 6, 4, 0, 12, 11, 10, 15, 14, 13]:
+            items.add(value)
+            bisect.insort(expected, value)
+            self.assert_matches(items, expected)
+
+        self.assertGreater(len(items._blocks), 2)
+
+    ####################################################################################
+    def test_add_duplicates(self):
+        items = IndexedSortedList([3, 3, 1], load=4)
+        items.add(3)
+        items.add(1)
+        self.assert_matches(items, [1, 1, 3, 3, 3])
+
+    ####################################################################################
+    def test_bisect_left(self):
+        items = IndexedSortedList(range(0, 100, 2), load=4)
+        for value in range(-1, 102):
+            self.assertEqual(
+                items.bisect_left(value), bisect.bisect_left(range(0, 100, 2), value)
+            )
+
+    ####################################################################################
+    def test_clear(self):
+        items = IndexedSortedList(range(50), load=4)
+        items.clear()
+        self.assert_matches(items, [])
+        self.assertFalse(items)
+        items.add(1)
+        self.assert_matches(items, [1])
+
+    ####################################################################################
+    def test_locate_out_of_range(self):
+        items = IndexedSortedList(range(10), load=4)
+        for index in (10, 11, -11):
+            with self.assertRaises(IndexError):
+                items[index]  # pylint: disable=pointless-statement
+
+        with self.assertRaises(IndexError):
+            IndexedSortedList().pop()
+
+    ####################################################################################
+    def test_pop_merges_blocks(self):
+        items = IndexedSortedList(range(40), load=4)
+        expected = list(range(40))
+        for index in (0, -1, 17, 5, 5, 5, 5, 0, 20, -3):
+            self.assertEqual(items.pop(index), expected.pop(index))
+            self.assert_matches(items, expected)
+
+        while expected:
+            self.assertEqual(
+                items.pop(len(expected) // 2), expected.pop(len(expected) // 2)
+            )
+            self.assert_matches(items, expected)
+
+    ####################################################################################
+    def test_random_operations(self):
+        rng = random.Random(1234)
+        items = IndexedSortedList(load=4)
+        expected = []
+        for _ in range(3000):
+            if expected and rng.random() < 0.45:
+                index = rng.randrange(-len(expected), len(expected))
+                self.assertEqual(items.pop(index), expected.pop(index))
+            else:
+                value = rng.randrange(100)
+                items.add(value)
+                bisect.insort(expected, value)
+
+        self.assert_matches(items, expected)
+
+    ####################################################################################
+    def test_slices(self):
+        items = IndexedSortedList(range(30), load=4)
+        expected = list(range(30))
+        for piece in (
+            slice(None),
+            slice(3, 17),
+            slice(-5, None),
+            slice(25, 40),
+            slice(10, 5),
+            slice(1, 20, 3),
+            slice(None, None, -1),
+        ):
+            self.assertEqual(items[piece], expected[piece])
+
+        self.assertEqual(list(items.islice(7, 12)), expected[7:12])
+
+    ####################################################################################
+    def test_update(self):
+        items = IndexedSortedList([5, 1], load=4)
+        items.update([3, 2])
+        self.assert_matches(items, [1, 2, 3, 5])
+
+        # Large batches are re-sorted in bulk.
+        items.update(range(100, 0, -1))
+        self.assert_matches(items, sorted([1, 2, 3, 5] + list(range(1, 101))))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,150 @@
+# Standard library imports.
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from music_bot.common.tracing import Tracer
+
+
+########################################################################################
+class TestTracer(unittest.IsolatedAsyncioTestCase):
+    """Tests for span nesting and duration percentiles."""
+
+    def setUp(self):
+        self.tracer = Tracer()
+
+    ####################################################################################
+    def record(self, name: str, *seconds: float) -> None:
+        """Record spans of the given durations."""
+        for duration in seconds:
+            self.tracer.record(name, 0, int(duration * 1e9))
+
+    ####################################################################################
+    def test_percentiles_nearest_rank(self):
+        self.record("resolve", *range(1, 11))
+        self.record("connect", 0.5)
+
+        report = self.tracer.percentiles()
+        self.assertEqual(list(report), ["connect", "resolve"])
+        self.assertEqual(
+            report["resolve"], {"count": 10, "p50": 5.0, "p90": 9.0, "p99": 10.0}
+        )
+        self.assertEqual(
+            report["connect"], {"count": 1, "p50": 0.5, "p90": 0.5, "p99": 0.5}
+        )
+
+        # Names are reported in the order asked for, skipping those never seen.
+        report = self.tracer.percentiles(("resolve", "missing"), quantiles=(100,))
+        self.assertEqual(report, {"resolve": {"count": 10, "p100": 10.0}})
+
+    ####################################################################################
+    def test_percentiles_keep_recent_spans(self):
+        self.tracer.configure(max_spans=3)
+        self.record("play", 100, 1, 2, 3)
+
+        self.assertEqual(
+            self.tracer.percentiles(quantiles=(100,)), {"play": {"count": 3, "p100": 3}}
+        )
+
+    ####################################################################################
+    def test_span_nesting(self):
+        self.assertIsNone(self.tracer.current())
+        with self.tracer.span("command", guild=1) as command:
+            self.assertIs(self.tracer.current(), command)
+            with self.tracer.span("resolve") as resolve:
+                self.assertIs(self.tracer.current(), resolve)
+            self.assertIs(self.tracer.current(), command)
+
+            started = self.tracer.start_span("connect")
+            self.assertIs(self.tracer.current(), command)
+
+        self.assertIsNone(self.tracer.current())
+        self.assertEqual(command.parent_id, "")
+        self.assertEqual(command.attributes, {"guild": 1})
+        for child in (resolve, started):
+            self.assertEqual(child.trace_id, command.trace_id)
+            self.assertEqual(child.parent_id, command.span_id)
+
+        self.assertIsNotNone(command.duration)
+        self.assertIsNone(started.duration)
+
+    ####################################################################################
+    async def test_span_nesting_across_tasks(self):
+        async def child():
+            with self.tracer.span("fetch") as span:
+                return span
+
+        with self.tracer.span("command") as command:
+            fetch = await asyncio.create_task(child())
+
+        self.assertEqual(fetch.parent_id, command.span_id)
+        self.assertEqual(fetch.trace_id, command.trace_id)
+
+    ####################################################################################
+    def test_span_records_error(self):
+        with self.assertRaises(ValueError):
+            with self.tracer.span("resolve") as span:
+                raise ValueError("bad url")
+
+        self.assertEqual(span.attributes["error"], "ValueError('bad url')")
+        self.assertEqual(span.to_dict()["status"]["code"], 2)
+        self.assertEqual(self.tracer.percentiles()["resolve"]["count"], 1)
+
+    ####################################################################################
+    def test_end_span_once(self):
+        span = self.tracer.start_span("connect")
+        self.tracer.end_span(span, region="eu")
+        end = span.end
+        self.tracer.end_span(span, region="us")
+
+        self.assertEqual(span.end, end)
+        self.assertEqual(span.attributes, {"region": "eu"})
+        self.assertEqual(self.tracer.percentiles()["connect"]["count"], 1)
+
+    ####################################################################################
+    def test_record_parent(self):
+        with self.tracer.span("command") as command:
+            queued = self.tracer.record("queued", 1_000, 3_000)
+        explicit = self.tracer.record("first_packet", 0, 1, parent=queued)
+
+        self.assertEqual(queued.parent_id, command.span_id)
+        self.assertEqual(queued.duration, 2e-6)
+        self.assertEqual(explicit.parent_id, queued.span_id)
+        self.assertEqual(explicit.trace_id, command.trace_id)
+
+    ####################################################################################
+    def test_file_round_trip(self):
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "traces", "spans.jsonl")
+            self.tracer.configure(path)
+            self.record("resolve", 1, 2)
+            with self.tracer.span("command", guild=1, cached=True):
+                pass
+            self.tracer.close()
+
+            with open(path, encoding="utf-8") as fp:
+                records = [json.loads(line) for line in fp]
+            self.assertEqual(
+                [record["name"] for record in records],
+                ["resolve", "resolve", "command"],
+            )
+            self.assertEqual(
+                records[2]["attributes"],
+                [
+                    {"key": "cached", "value": {"boolValue": True}},
+                    {"key": "guild", "value": {"intValue": "1"}},
+                ],
+            )
+
+            # A new tracer picks the durations back up from the file.
+            restarted = Tracer()
+            restarted.configure(path)
+            restarted.close()
+            report = restarted.percentiles(("resolve",), quantiles=(100,))
+            self.assertEqual(report, {"resolve": {"count": 2, "p100": 2.0}})
+
+
+if __name__ == "__main__":
+    unittest.main()